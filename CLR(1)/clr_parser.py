@@ -1,394 +1,223 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox
-from read_grammar_clr_temp import ReadGrammar
+import os
+import sys
+from collections import deque
+
+# Make the shared lrcore package importable when run from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lrcore.closure import DEFAULT_MAX_SIZE, ClosureCache
+from lrcore.driver import TableDriver, print_trace
+from lrcore.export import render_dfa
+from lrcore.grammar import DOT, ReadGrammar
+from lrcore.incremental import rebuild
+from lrcore.ir import CompiledGrammar
+from lrcore.memory import MemoryProfile
+from lrcore.parallel import build_states
+from lrcore.stats import BuildStats, phase
+from lrcore.tables import build_table, grammar_precedence, group_transitions
+from lrcore.tableexport import BufferedWriter, write_table
 
 class CLR1Parser:
-    def __init__(self, grammar):
+    def __init__(self, grammar, workers=None, stats=False, memory=False, closure_cache_size=DEFAULT_MAX_SIZE):
         self.grammar = grammar
-        self.terminals = self.grammar.get_terminals()
-        self.non_terminals = self.grammar.get_non_terminals()
+        self.workers = workers  # processes for automaton construction (None or 1 = sequential)
+        self.stats = BuildStats() if stats else None  # phase timings and operation counters
+        # Closed states by kernel, least recently used evicted (None: unbounded)
+        self.closure_cache = ClosureCache(self.closure, closure_cache_size, self.stats)
+        self.memory = MemoryProfile() if memory else None  # tracemalloc snapshots per phase
+        self.ir = CompiledGrammar(grammar)  # symbol IDs and indexed productions
+        self.terminals = set(self.ir.terminal_names()[1:])  # without the end marker
+        self.non_terminals = set(self.ir.non_terminal_names())
         self.first_sets = self.compute_first_sets()
         self.follow_sets = self.compute_follow_sets()
         self.compute_closure_goto()
+        self.build_parsing_table()
 
+    @phase
     def compute_first_sets(self):
-        first = {symbol: set() for symbol in self.non_terminals}
-        for terminal in self.terminals:
-            first[terminal] = {terminal}
-        
-        changed = True
-        while changed:
-            changed = False
-            for non_terminal, productions in self.grammar.items():
-                for production in productions:
-                    if not production:
-                        if '' not in first[non_terminal]:
-                            first[non_terminal].add('')
-                            changed = True
-                        continue
-                    
-                    curr_symbol = production[0]
-                    if curr_symbol in self.terminals:
-                        if curr_symbol not in first[non_terminal]:
-                            first[non_terminal].add(curr_symbol)
-                            changed = True
-                    elif curr_symbol in self.non_terminals:
-                        first_of_curr = first[curr_symbol] - {''}
-                        if not first_of_curr.issubset(first[non_terminal]):
-                            first[non_terminal].update(first_of_curr)
-                            changed = True
-                        i = 0
-                        epsilon_in_all = True
-                        while i < len(production) and epsilon_in_all:
-                            curr_symbol = production[i]
-                            if curr_symbol in self.terminals:
-                                if curr_symbol not in first[non_terminal]:
-                                    first[non_terminal].add(curr_symbol)
-                                    changed = True
-                                epsilon_in_all = False
-                            elif curr_symbol in self.non_terminals:
-                                first_of_curr = first[curr_symbol] - {''}
-                                if not first_of_curr.issubset(first[non_terminal]):
-                                    first[non_terminal].update(first_of_curr)
-                                    changed = True
-                                if '' not in first[curr_symbol]:
-                                    epsilon_in_all = False
-                            i += 1
-                        if epsilon_in_all and '' not in first[non_terminal]:
-                            first[non_terminal].add('')
-                            changed = True
-        return first
+        '''
+        FIRST by symbol name, '' marking a nullable nonterminal, from the IR's sets on IDs
+        '''
+        return self.ir.first_names('', range(1, len(self.ir)))  # the end marker has no entry
 
+    @phase
     def compute_follow_sets(self):
-        follow = {nt: set() for nt in self.non_terminals}
-        start_symbol = list(self.grammar.keys())[0]
-        follow[start_symbol].add('#')
-        
-        changed = True
-        while changed:
-            changed = False
-            for non_terminal, productions in self.grammar.items():
-                for production in productions:
-                    for i, symbol in enumerate(production):
-                        if symbol not in self.non_terminals:
-                            continue
-                        if i == len(production) - 1:
-                            if not follow[non_terminal].issubset(follow[symbol]):
-                                old_len = len(follow[symbol])
-                                follow[symbol].update(follow[non_terminal])
-                                if len(follow[symbol]) > old_len:
-                                    changed = True
-                        else:
-                            next_symbol = production[i+1]
-                            if next_symbol in self.terminals:
-                                if next_symbol not in follow[symbol]:
-                                    follow[symbol].add(next_symbol)
-                                    changed = True
-                            elif next_symbol in self.non_terminals:
-                                first_of_next = self.first_sets[next_symbol] - {''}
-                                if not first_of_next.issubset(follow[symbol]):
-                                    old_len = len(follow[symbol])
-                                    follow[symbol].update(first_of_next)
-                                    if len(follow[symbol]) > old_len:
-                                        changed = True
-                                if '' in self.first_sets[next_symbol]:
-                                    if not follow[non_terminal].issubset(follow[symbol]):
-                                        old_len = len(follow[symbol])
-                                        follow[symbol].update(follow[non_terminal])
-                                        if len(follow[symbol]) > old_len:
-                                            changed = True
-                            j = i + 1
-                            while j < len(production):
-                                curr = production[j]
-                                if curr in self.terminals:
-                                    break
-                                if curr in self.non_terminals and '' in self.first_sets[curr]:
-                                    j += 1
-                                    if j == len(production):
-                                        if not follow[non_terminal].issubset(follow[symbol]):
-                                            old_len = len(follow[symbol])
-                                            follow[symbol].update(follow[non_terminal])
-                                            if len(follow[symbol]) > old_len:
-                                                changed = True
-                                    elif production[j] in self.terminals:
-                                        if production[j] not in follow[symbol]:
-                                            follow[symbol].add(production[j])
-                                            changed = True
-                                    elif production[j] in self.non_terminals:
-                                        first_of_next = self.first_sets[production[j]] - {''}
-                                        if not first_of_next.issubset(follow[symbol]):
-                                            old_len = len(follow[symbol])
-                                            follow[symbol].update(first_of_next)
-                                            if len(follow[symbol]) > old_len:
-                                                changed = True
-                                else:
-                                    break
-        return follow
-
-    def first_of_sequence(self, sequence):
-        if not sequence:
-            return {''}
-        first_set = set()
-        i = 0
-        epsilon_in_all = True
-        while i < len(sequence) and epsilon_in_all:
-            symbol = sequence[i]
-            if symbol in self.terminals:
-                first_set.add(symbol)
-                epsilon_in_all = False
-            elif symbol in self.non_terminals:
-                first_set.update(self.first_sets[symbol] - {''})
-                if '' not in self.first_sets[symbol]:
-                    epsilon_in_all = False
-            i += 1
-        if epsilon_in_all:
-            first_set.add('')
-        return first_set
+        '''
+        FOLLOW by nonterminal name, from the IR's sets on IDs
+        '''
+        return self.ir.follow_names()
 
     def closure(self, items):
+        stats = self.stats
+        if stats is not None:
+            stats.closure_calls += 1
+        item_table, start_items = self.ir.items()
+        terminal_count = self.ir.terminal_count
         closure_items = set(items)
-        changed = True
-        while changed:
-            changed = False  # Fix: Corrected 'False36' to 'False'
-            for item in list(closure_items):
-                non_terminal, production, lookahead = item
-                dot_index = production.index('.') if '.' in production else len(production)
-                if dot_index < len(production) - 1:
-                    next_symbol = production[dot_index + 1]
-                    if next_symbol in self.non_terminals:
-                        beta = production[dot_index + 2:] if dot_index + 2 < len(production) else ()
-                        remainder = beta + (lookahead,) if lookahead else beta
-                        first_of_remainder = self.first_of_sequence(remainder)
-                        if '' in first_of_remainder:
-                            first_of_remainder.remove('')  # Fix: Corrected syntax error
-                            first_of_remainder.add(lookahead)
-                        for production_of_next in self.grammar.get(next_symbol, []):
-                            for la in first_of_remainder:
-                                new_item = (next_symbol, ('.',) + production_of_next, la)
-                                if new_item not in closure_items:
-                                    closure_items.add(new_item)
-                                    changed = True
+        # [A -> α.Bβ, a] adds [B -> .γ, b] for b in FIRST(βa); each (B, b) is expanded once
+        expanded = set()
+        work = list(closure_items)
+        while work:
+            if stats is not None:
+                stats.closure_iterations += 1
+            non_terminal, production, lookahead = work.pop()
+            next_symbol, _, first, nullable = item_table[(non_terminal, production)]
+            if next_symbol is None or next_symbol < terminal_count:
+                continue
+            for la in (first | {lookahead} if nullable else first):
+                if (next_symbol, la) in expanded:
+                    continue
+                expanded.add((next_symbol, la))
+                for start_lhs, start_rhs in start_items[next_symbol - terminal_count]:
+                    new_item = (start_lhs, start_rhs, la)
+                    if new_item not in closure_items:
+                        closure_items.add(new_item)
+                        work.append(new_item)
         return frozenset(closure_items)
 
     def goto(self, items, symbol):
+        if self.stats is not None:
+            self.stats.goto_calls += 1
+        item_table = self.ir.items()[0]
+        symbol_id = self.ir.ids.get(symbol)
         goto_items = set()
-        for item in items:
-            non_terminal, production, lookahead = item
-            dot_index = production.index('.') if '.' in production else len(production)
-            if dot_index < len(production) - 1 and production[dot_index + 1] == symbol:
-                new_production = production[:dot_index] + (symbol, '.') + production[dot_index + 2:]
-                goto_items.add((non_terminal, new_production, lookahead))
-        return self.closure(goto_items) if goto_items else frozenset()
+        for non_terminal, production, lookahead in items:
+            next_symbol, advanced, _, _ = item_table[(non_terminal, production)]
+            if next_symbol is not None and next_symbol == symbol_id:
+                goto_items.add(advanced + (lookahead,))
+        return self.closure_cache.get(frozenset(goto_items)) if goto_items else frozenset()
 
+    def kernels(self, items):
+        '''
+        GOTO kernels of a state on every symbol after a dot, in one pass over its items
+        :return: dict symbol -> set of items with the dot moved past it
+        '''
+        if self.stats is not None:
+            self.stats.goto_calls += 1
+        item_table = self.ir.items()[0]
+        names = self.ir.names
+        kernels = {}
+        for non_terminal, production, lookahead in items:
+            next_symbol, advanced, _, _ = item_table[(non_terminal, production)]
+            if next_symbol is not None:
+                kernels.setdefault(names[next_symbol], set()).add(advanced + (lookahead,))
+        return kernels
+
+    @phase
     def compute_closure_goto(self):
         self.states = []
         self.transitions = {}
-        all_symbols = sorted(set(
-            [symbol for non_terminal in self.grammar for production in self.grammar[non_terminal] for symbol in production]
-        ))
         start_symbol = list(self.grammar.keys())[0]
-        initial_item = (start_symbol, ('.',) + self.grammar[start_symbol][0], '#')
+        initial_item = (start_symbol, (DOT,) + self.grammar[start_symbol][0], '#')
         initial_state = self.closure({initial_item})
+        if self.workers and self.workers > 1:
+            # Expand whole BFS frontiers in a process pool; numbering matches the queue below
+            self.states, edges = build_states(initial_state, self.kernels, self.closure_cache.get, self.workers,
+                                              self.stats)
+            for from_index, symbol, to_index in edges:
+                self.transitions[(from_index, symbol)] = to_index
+            return
         self.states.append(initial_state)
-        queue = [initial_state]
+        # A kernel met again gets the cached state object back (an equal one once evicted),
+        # so most of these lookups succeed by identity
+        state_ids = {initial_state: 0}
+        queue = deque([initial_state])
         while queue:
-            current_state = queue.pop(0)
-            for symbol in all_symbols:
-                goto_state = self.goto(current_state, symbol)
-                if goto_state:
-                    if goto_state not in self.states:
-                        self.states.append(goto_state)
-                        queue.append(goto_state)
-                    self.transitions[(self.states.index(current_state), symbol)] = self.states.index(goto_state)
+            current_state = queue.popleft()
+            current_index = state_ids[current_state]
+            kernels = self.kernels(current_state)
+            # In symbol order, as lrcore.parallel numbers them
+            for symbol in sorted(kernels):
+                goto_state = self.closure_cache.get(frozenset(kernels[symbol]))
+                goto_index = state_ids.get(goto_state)
+                if goto_index is None:
+                    goto_index = state_ids[goto_state] = len(self.states)
+                    self.states.append(goto_state)
+                    queue.append(goto_state)
+                elif self.stats is not None:
+                    self.stats.dedup_hits += 1
+                self.transitions[(current_index, symbol)] = goto_index
 
-    def build_parsing_table(self):
-        self.action = {}
-        self.goto_table = {}
-        start_symbol = list(self.grammar.keys())[0]  # S'
-        original_start_symbol = self.grammar[start_symbol][0][0]  # S
-        
-        for i, state in enumerate(self.states):
-            for item in state:
-                non_terminal, production, lookahead = item
-                dot_index = production.index('.') if '.' in production else len(production)
-                
-                # Shift action
-                if dot_index < len(production) - 1:
-                    next_symbol = production[dot_index + 1]
-                    if next_symbol in self.terminals:
-                        if (i, next_symbol) in self.transitions:
-                            next_state = self.transitions[(i, next_symbol)]
-                            self.action[(i, next_symbol)] = f'S{next_state}'
-                
-                # Reduce or Accept action
-                elif dot_index == len(production) - 1:
-                    # Accept: [S' -> S., #]
-                    if non_terminal == start_symbol and production == (original_start_symbol, '.') and lookahead == '#':
-                        self.action[(i, '#')] = 'acc'
-                    else:
-                        # Reduce
-                        prod_without_dot = production[:dot_index] + production[dot_index+1:]
-                        prod_index = self.get_production_index(non_terminal, prod_without_dot)
-                        if prod_index is not None:
-                            self.action[(i, lookahead)] = f'r{prod_index}'
-            
-            # Build GOTO table
-            for non_terminal in self.non_terminals:
-                if (i, non_terminal) in self.transitions:
-                    self.goto_table[(i, non_terminal)] = self.transitions[(i, non_terminal)]
+    def update_grammar(self, grammar, verify=False):
+        '''
+        Switch to an edited grammar, recomputing only what the edit affects (see lrcore.incremental)
+        :param verify: also build from scratch and raise AssertionError if anything differs
+        :return: lrcore.incremental.Rebuild
+        '''
+        return rebuild(self, grammar, verify)
+
+    def table_inputs(self):
+        '''
+        Columns, per-state successors and per-state reductions of the CLR(1) table
+        :return: (terminals, non-terminals, successors, reductions) as build_table takes them
+        '''
+        terminals = sorted(self.terminals) + ['#']  # end marker last
+        non_terminals = sorted(self.non_terminals)
+        production_index = self.ir.production_index
+        successors = group_transitions(self.transitions, len(self.states))
+
+        # CLR(1): a completed item [A -> α., a] reduces on its lookahead a
+        reductions = []
+        for state in self.states:
+            state_reductions = []
+            for non_terminal, production, lookahead in state:
+                dot_index = production.index(DOT)
+                if dot_index == len(production) - 1:
+                    state_reductions.append((production_index[(non_terminal, production[:dot_index])], (lookahead,)))
+            reductions.append(state_reductions)
+        return terminals, non_terminals, successors, reductions
 
-    def get_production_index(self, non_terminal, production):
-        index = 0
-        for nt in self.grammar:
-            for prod in self.grammar[nt]:
-                if nt == non_terminal and prod == production:
-                    return index
-                index += 1
-        return None
+    @phase
+    def build_parsing_table(self):
+        terminals, non_terminals, successors, reductions = self.table_inputs()
+        self.table = build_table(successors, reductions, terminals, non_terminals, self.stats,
+                                 grammar_precedence(self.grammar, self.ir))
+        self.conflicts = self.table.conflicts
+        # Driver for parse_string; steps() gives the same parse as records
+        self.driver = TableDriver(self.table, self.ir, stats=self.stats)
+        self.action = self.table.action
+        self.goto_table = self.table.goto
 
     def print_states(self):
-        print("CLR(1) Parsing States:")
+        out = BufferedWriter(sys.stdout)
+        out.write("CLR(1) Parsing States:\n")
         for i, state in enumerate(self.states):
-            print(f"State {i}:")
-            for item in state:
-                non_terminal, production, lookahead = item
-                prod_str = ' '.join(production).replace(' . ', '.') if production else 'ε'
-                print(f"  [{non_terminal} -> {prod_str}, {lookahead}]")
-            print()
+            lines = [f"State {i}:"]
+            for non_terminal, production, lookahead in state:
+                prod_str = ' '.join('.' if symbol == DOT else symbol for symbol in production)
+                lines.append(f"  [{non_terminal} -> {prod_str}, {lookahead}]")
+            out.write('\n'.join(lines) + '\n\n')
+        out.flush()
 
-    def print_table(self):
-        if not hasattr(self, 'action'):
-            self.build_parsing_table()
-        terminals = sorted(self.terminals)  # Sort terminals directly
-        terminals.append('#')  # Append the end marker
-        non_terminals = sorted(self.non_terminals)
-        print("\nCLR(1) Parsing Table:")
-        header = "State"
-        for terminal in terminals:
-            header += f" | {terminal:^8}"
-        for non_terminal in non_terminals:
-            header += f" | {non_terminal:^8}"
-        print(header)
-        print("-" * len(header))
-        for i in range(len(self.states)):
-            row = f"{i:^5}"
-            for terminal in terminals:
-                if (i, terminal) in self.action:
-                    row += f" | {self.action[(i, terminal)]:^8}"
-                else:
-                    row += f" | {' ':^8}"
-            for non_terminal in non_terminals:
-                if (i, non_terminal) in self.goto_table:
-                    row += f" | {self.goto_table[(i, non_terminal)]:^8}"
-                else:
-                    row += f" | {' ':^8}"
-            print(row)
-        print("-" * len(header))
+    @phase
+    def print_table(self, fmt='text', states=None, symbols=None):
+        '''
+        Print the CLR(1) parsing table through lrcore.tableexport
+        :param fmt, states, symbols: as write_table takes them
+        '''
+        if fmt == 'text':
+            print("\nCLR(1) Parsing Table:")
+        write_table(self.table, sys.stdout, fmt, states, symbols)
 
     def parse_string(self, input_string):
-        if not hasattr(self, 'action'):
-            self.build_parsing_table()
-        input_string += '#'
-        state_stack = [0]
-        symbol_stack = ['#']
-        input_index = 0
-        step = 1
-        start_symbol = list(self.grammar.keys())[0]  # S'
-        
-        while True:
-            current_state = state_stack[-1]
-            current_symbol = input_string[input_index]
-            print(f"Step {step:<4} | State Stack: {str(state_stack):<20} | Symbol Stack: {str(symbol_stack):<30} | "
-                  f"Input: {input_string[input_index:]:<15} | ", end="")
-            
-            if (current_state, current_symbol) not in self.action:
-                print(f"ERROR: No action defined for state {current_state} and symbol '{current_symbol}'")
-                return False
-            
-            action = self.action[(current_state, current_symbol)]
-            print(f"ACTION: {action:<10} | ", end="")
-            
-            if action.startswith('S'):
-                next_state = int(action[1:])
-                state_stack.append(next_state)
-                symbol_stack.append(current_symbol)
-                input_index += 1
-                print("SHIFT")
-            elif action.startswith('r'):
-                production_index = int(action[1:])
-                non_terminal = self.get_non_terminal_by_index(production_index)
-                production = self.get_production_by_index(production_index)
-                for _ in range(len(production)):
-                    state_stack.pop()
-                    symbol_stack.pop()
-                symbol_stack.append(non_terminal)
-                # Check if we've reduced to the start symbol and the stack is in accept state
-                if non_terminal == start_symbol and symbol_stack == ['#', non_terminal] and input_string[input_index:] == '#':
-                    print("ACCEPT")
-                    return True
-                goto_state = self.goto_table.get((state_stack[-1], non_terminal))
-                if goto_state is None:
-                    print(f"ERROR: No GOTO defined for state {state_stack[-1]} and non-terminal {non_terminal}")
-                    return False
-                state_stack.append(goto_state)
-                print(f"REDUCE by {non_terminal} -> {''.join(production)}")
-            elif action == 'acc':
-                print("ACCEPT")
-                return True
-            step += 1
+        return print_trace(self.driver, input_string)
 
     def get_non_terminal_by_index(self, index):
-        current_index = 0
-        for non_terminal in self.grammar:
-            for production in self.grammar[non_terminal]:
-                if current_index == index:
-                    return non_terminal
-                current_index += 1
-        return None
+        return self.ir.production_names(index)[0]
 
     def get_production_by_index(self, index):
-        current_index = 0
-        for non_terminal in self.grammar:
-            for production in self.grammar[non_terminal]:
-                if current_index == index:
-                    return production
-                current_index += 1
-        return None
+        return self.ir.production_names(index)[1]
 
 
-    def draw_dfa(self, output_file='dfa_diagram'):
-        """Generate and render the DFA diagram of parser states using Graphviz"""
-        from graphviz import Digraph
-        dot = Digraph(comment='Parser DFA')
-        dot.attr(rankdir='LR', size='10,8')
-        dot.attr('node', shape='ellipse', fontsize='10')
+    def draw_dfa(self, output_file='dfa_diagram', view=True, render=False):
+        """Write the DFA of parser states as DOT, rendered to PDF with Graphviz if render or view is set"""
+        render_dfa(self, output_file, view, render)
 
-        # Add states with item sets as labels
-        for i, state in enumerate(self.states):
-            label = f'I{i}\\n'
-            for item in sorted(state):
-                if len(item) == 2:
-                    lhs, rhs = item
-                    rhs_str = ' '.join(rhs).replace(' .', '•').replace('.', '•')
-                    label += f'{lhs} → {rhs_str}\\n'
-                elif len(item) == 3:
-                    lhs, rhs, lookahead = item
-                    rhs_str = ' '.join(rhs).replace(' .', '•').replace('.', '•')
-                    label += f'{lhs} → {rhs_str}, {lookahead}\\n'
-            dot.node(str(i), label)
-
-        for (from_state, symbol), to_state in self.transitions.items():
-            if isinstance(from_state, int):
-                dot.edge(str(from_state), str(to_state), label=symbol)
-            else:
-                from_index = self.states.index(from_state)
-                to_index = self.states.index(to_state)
-                dot.edge(str(from_index), str(to_index), label=symbol)
-
-        dot.render(output_file, format='pdf', view=True)
-        print(f"DFA diagram saved as {output_file}.pdf")
 
 if __name__ == '__main__':
+    # The GUI is only needed for the interactive menu, keep it out of library imports
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
+
     root = tk.Tk()
     root.withdraw()
     info_message = """
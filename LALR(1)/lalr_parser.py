@@ -1,203 +1,87 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox
-from read_grammar_lalr_temp import ReadGrammar
+import os
+import sys
+
+# Make the shared lrcore package importable when run from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lrcore.automaton import LR0Automaton, lalr_lookaheads
+from lrcore.driver import TableDriver, print_trace
+from lrcore.export import render_dfa
+from lrcore.grammar import DOT, ReadGrammar
+from lrcore.incremental import rebuild
+from lrcore.ir import CompiledGrammar
+from lrcore.memory import MemoryProfile
+from lrcore.stats import BuildStats, phase
+from lrcore.tables import build_table, grammar_precedence
+from lrcore.tableexport import write_table
 
 class LALR1Parser:
-    def __init__(self, grammar):
+    def __init__(self, grammar, workers=None, stats=False, memory=False, automaton=None):
         self.grammar = grammar
-        self.terminals = set()
-        self.non_terminals = set(self.grammar.keys())
+        if automaton is not None and not automaton.shares(grammar):
+            raise ValueError('The automaton was built for a different grammar')
+        self.automaton = automaton  # LR(0) item collection, possibly shared with LR(0) and SLR(1) parsers
+        self.workers = workers  # processes for automaton construction (None or 1 = sequential)
+        self.stats = BuildStats() if stats else None  # phase timings and operation counters
+        self.memory = MemoryProfile() if memory else None  # tracemalloc snapshots per phase
+        self.ir = CompiledGrammar(grammar) if automaton is None else automaton.ir  # symbol IDs and indexed productions
+        self.terminals = set(self.ir.terminal_names())  # includes the end marker '#'
+        self.non_terminals = set(self.ir.non_terminal_names())
         
-        for lhs, productions in self.grammar.items():
-            for production in productions:
-                for symbol in production:
-                    if symbol not in self.non_terminals:
-                        self.terminals.add(symbol)
-        
-        self.terminals.add('#')
-        
-        self.compute_first_sets()
-        self.compute_follow_sets()
-        self.compute_lr1_items()
-        self.merge_lr1_states()
+        # FIRST and FOLLOW are not needed: lookaheads come from the IR's item table (lalr_lookaheads)
+        self.compute_closure_goto()
+        self.compute_lookaheads()
         self.build_parsing_table()
 
-    def compute_first_sets(self):
-        self.first = {terminal: {terminal} for terminal in self.terminals}
-        self.first.update({non_terminal: set() for non_terminal in self.non_terminals})
-        
-        changed = True
-        while changed:
-            changed = False
-            for lhs, productions in self.grammar.items():
-                for production in productions:
-                    if not production:
-                        if '' not in self.first[lhs]:
-                            self.first[lhs].add('')
-                            changed = True
-                        continue
-                    
-                    first_symbol = production[0]
-                    if first_symbol in self.terminals:
-                        if first_symbol not in self.first[lhs]:
-                            self.first[lhs].add(first_symbol)
-                            changed = True
-                    else:
-                        for symbol in self.first[first_symbol] - {''}:
-                            if symbol not in self.first[lhs]:
-                                self.first[lhs].add(symbol)
-                                changed = True
-                        
-                        if '' in self.first[first_symbol]:
-                            i = 1
-                            while i < len(production) and '' in self.first[production[i-1]]:
-                                if production[i] in self.terminals:
-                                    if production[i] not in self.first[lhs]:
-                                        self.first[lhs].add(production[i])
-                                        changed = True
-                                    break
-                                else:
-                                    for symbol in self.first[production[i]] - {''}:
-                                        if symbol not in self.first[lhs]:
-                                            self.first[lhs].add(symbol)
-                                            changed = True
-                                i += 1
-                            
-                            if i == len(production):
-                                if '' not in self.first[lhs]:
-                                    self.first[lhs].add('')
-                                    changed = True
-
-    def first_of_sequence(self, sequence):
-        if not sequence:
-            return {''}
-        
-        result = set()
-        empty_in_all = True
-        
-        for symbol in sequence:
-            if symbol in self.terminals:
-                if empty_in_all:
-                    result.add(symbol)
-                    empty_in_all = False
-                break
-            else:
-                symbol_first = self.first[symbol]
-                result.update(symbol_first - {''})
-                if '' not in symbol_first:
-                    empty_in_all = False
-                    break
-        
-        if empty_in_all:
-            result.add('')
-        
-        return result
-
-    def compute_follow_sets(self):
-        self.follow = {non_terminal: set() for non_terminal in self.non_terminals}
-        start_symbol = next(iter(self.grammar))
-        self.follow[start_symbol].add('#')
-        
-        changed = True
-        while changed:
-            changed = False
-            for lhs, productions in self.grammar.items():
-                for production in productions:
-                    for i, symbol in enumerate(production):
-                        if symbol in self.non_terminals:
-                            if i < len(production) - 1:
-                                beta_first = self.first_of_sequence(production[i+1:])
-                                for terminal in beta_first - {''}:
-                                    if terminal not in self.follow[symbol]:
-                                        self.follow[symbol].add(terminal)
-                                        changed = True
-                                if '' in beta_first:
-                                    for terminal in self.follow[lhs]:
-                                        if terminal not in self.follow[symbol]:
-                                            self.follow[symbol].add(terminal)
-                                            changed = True
-                            else:
-                                for terminal in self.follow[lhs]:
-                                    if terminal not in self.follow[symbol]:
-                                        self.follow[symbol].add(terminal)
-                                        changed = True
-
-    def closure_lr1(self, items):
-        closure_set = set(items)
-        changed = True
-        
-        while changed:
-            changed = False
-            for item in list(closure_set):
-                lhs, prod, dot_pos, lookahead = item
-                if dot_pos < len(prod):
-                    symbol_after_dot = prod[dot_pos]
-                    if symbol_after_dot in self.non_terminals:
-                        beta = prod[dot_pos+1:] if dot_pos+1 < len(prod) else tuple()
-                        first_beta_lookahead = self.first_of_sequence(beta + (lookahead,))
-                        for p_rhs in self.grammar[symbol_after_dot]:
-                            for la in first_beta_lookahead:
-                                new_item = (symbol_after_dot, p_rhs, 0, la)
-                                if new_item not in closure_set:
-                                    closure_set.add(new_item)
-                                    changed = True
-        
-        return frozenset(closure_set)
-
-    def goto_lr1(self, items, symbol):
-        goto_items = set()
-        for item in items:
-            lhs, prod, dot_pos, lookahead = item
-            if dot_pos < len(prod) and prod[dot_pos] == symbol:
-                new_item = (lhs, prod, dot_pos + 1, lookahead)
-                goto_items.add(new_item)
-        return self.closure_lr1(goto_items) if goto_items else frozenset()
-
-    def compute_lr1_items(self):
-        self.lr1_states = []
-        self.lr1_transitions = {}
-        start_symbol = next(iter(self.grammar))
-        initial_item = (start_symbol, self.grammar[start_symbol][0], 0, '#')
-        initial_state = self.closure_lr1({initial_item})
-        self.lr1_states.append(initial_state)
-        queue = [initial_state]
-        while queue:
-            current_state = queue.pop(0)
-            all_symbols = self.terminals.union(self.non_terminals) - {''}
-            for symbol in all_symbols:
-                goto_state = self.goto_lr1(current_state, symbol)
-                if goto_state and goto_state not in self.lr1_states:
-                    self.lr1_states.append(goto_state)
-                    queue.append(goto_state)
-                if goto_state:
-                    self.lr1_transitions[(self.lr1_states.index(current_state), symbol)] = self.lr1_states.index(goto_state)
-
-    def merge_lr1_states(self):
-        cores = {}
-        for state_idx, state in enumerate(self.lr1_states):
-            core_state = frozenset((lhs, prod, dot_pos) for lhs, prod, dot_pos, _ in state)
-            if core_state not in cores:
-                cores[core_state] = []
-            cores[core_state].append(state_idx)
-        
+    @property
+    def first(self):
+        '''
+        FIRST by symbol name, '' marking a nullable nonterminal, for display; derived when asked for
+        '''
+        return self.ir.first_names('', range(len(self.ir)))
+
+    @property
+    def follow(self):
+        '''
+        FOLLOW by nonterminal name, for display; derived when asked for
+        '''
+        return self.ir.follow_names()
+
+    @phase
+    def compute_closure_goto(self):
+        '''
+        Build the LR(0) item collection (lrcore.automaton), unless a shared one was passed in
+        '''
+        if self.automaton is None:
+            self.automaton = LR0Automaton(self.grammar, self.ir, self.workers, self.stats)
+        self.states = self.automaton.states
+        self.transitions = self.automaton.transitions
+        self.goto_memo = self.automaton.goto_memo
+
+    @phase
+    def compute_lookaheads(self):
+        '''
+        LALR(1) states: the LR(0) states with lookaheads propagated over their items.
+        Same states and transitions as merging the canonical LR(1) states by core, without building them
+        '''
+        lookaheads = lalr_lookaheads(self.automaton)
         self.lalr_states = []
-        self.lr1_to_lalr_map = {}
-        
-        for core, state_indices in cores.items():
+        for state_lookaheads in lookaheads:
             merged_state = set()
-            for state_idx in state_indices:
-                for item in self.lr1_states[state_idx]:
-                    lhs, prod, dot_pos, lookahead = item
+            for (lhs, rhs), terminals in state_lookaheads.items():
+                dot_pos = rhs.index(DOT)
+                prod = rhs[:dot_pos] + rhs[dot_pos + 1:]
+                for lookahead in terminals:
                     merged_state.add((lhs, prod, dot_pos, lookahead))
             self.lalr_states.append(frozenset(merged_state))
-            for state_idx in state_indices:
-                self.lr1_to_lalr_map[state_idx] = len(self.lalr_states) - 1
-        
-        self.lalr_transitions = {}
-        for (from_state, symbol), to_state in self.lr1_transitions.items():
-            lalr_from = self.lr1_to_lalr_map[from_state]
-            lalr_to = self.lr1_to_lalr_map[to_state]
-            self.lalr_transitions[(lalr_from, symbol)] = lalr_to
+        self.lalr_transitions = self.automaton.numbered_transitions()
+
+    def update_grammar(self, grammar, verify=False):
+        '''
+        Switch to an edited grammar, recomputing only what the edit affects (see lrcore.incremental)
+        :param verify: also build from scratch and raise AssertionError if anything differs
+        :return: lrcore.incremental.Rebuild
+        '''
+        return rebuild(self, grammar, verify)
 
     def print_states(self):
         print("LALR(1) Parsing States:")
@@ -208,55 +92,39 @@ class LALR1Parser:
                 prod_str = ' '.join(prod[:dot_pos]) + ' · ' + ' '.join(prod[dot_pos:])
                 print(f"  {lhs} -> {prod_str}, {lookahead}")
 
-    def build_parsing_table(self):
+    def table_inputs(self):
+        '''
+        Columns, per-state successors and per-state reductions of the LALR(1) table
+        :return: (terminals, non-terminals, successors, reductions) as build_table takes them
+        '''
         terminals = sorted(self.terminals)
         non_terminals = sorted(self.non_terminals)
-        all_symbols = terminals + non_terminals
-        self.states_table = [['' for _ in range(len(all_symbols) + 1)] for _ in range(len(self.lalr_states) + 1)]
-        self.states_table[0][0] = 'states'
-        for col, symbol in enumerate(all_symbols, start=1):
-            self.states_table[0][col] = symbol
-        for row in range(1, len(self.lalr_states) + 1):
-            self.states_table[row][0] = row - 1
-        
-        for state_idx, state in enumerate(self.lalr_states):
-            for item in state:
-                lhs, prod, dot_pos, lookahead = item
+        production_index = self.ir.production_index
+        successors = self.automaton.successor_lists()
+
+        # LALR(1): a completed item [A -> α., a] reduces on its merged lookahead a
+        reductions = []
+        for state in self.lalr_states:
+            state_reductions = []
+            for lhs, prod, dot_pos, lookahead in state:
                 if dot_pos == len(prod):
-                    prod_idx = -1
-                    for head, productions in self.grammar.items():
-                        for i, p in enumerate(productions):
-                            if head == lhs and p == prod:
-                                prod_idx = sum(len(self.grammar[h]) for h in list(self.grammar.keys())[:list(self.grammar.keys()).index(head)]) + i
-                                break
-                        if prod_idx != -1:
-                            break
-                    if lhs == next(iter(self.grammar)) and prod == self.grammar[lhs][0] and lookahead == '#':
-                        col = all_symbols.index('#') + 1
-                        self.states_table[state_idx + 1][col] = 'acc'
-                    else:
-                        col = all_symbols.index(lookahead) + 1
-                        if not self.states_table[state_idx + 1][col] or (self.states_table[state_idx + 1][col].startswith('r') and int(self.states_table[state_idx + 1][col][1:]) > prod_idx):
-                            self.states_table[state_idx + 1][col] = f'r{prod_idx}'
-            
-            for symbol in terminals:
-                if (state_idx, symbol) in self.lalr_transitions:
-                    col = all_symbols.index(symbol) + 1
-                    next_state = self.lalr_transitions[(state_idx, symbol)]
-                    if not self.states_table[state_idx + 1][col] or self.states_table[state_idx + 1][col] == 'acc':
-                        self.states_table[state_idx + 1][col] = f'S{next_state}'
-            
-            for symbol in non_terminals:
-                if (state_idx, symbol) in self.lalr_transitions:
-                    col = all_symbols.index(symbol) + 1
-                    next_state = self.lalr_transitions[(state_idx, symbol)]
-                    self.states_table[state_idx + 1][col] = f'{next_state}'
+                    state_reductions.append((production_index[(lhs, prod)], (lookahead,)))
+            reductions.append(state_reductions)
+        return terminals, non_terminals, successors, reductions
 
-    def print_table(self):
-        for row in range(len(self.states_table)):
-            for col in range(len(self.states_table[row])):
-                print(f"{self.states_table[row][col]:<10}", end='|')
-            print()
+    @phase
+    def build_parsing_table(self):
+        terminals, non_terminals, successors, reductions = self.table_inputs()
+        self.table = build_table(successors, reductions, terminals, non_terminals, self.stats,
+                                 grammar_precedence(self.grammar, self.ir))
+        self.conflicts = self.table.conflicts
+        # Driver for parse_string; steps() gives the same parse as records
+        self.driver = TableDriver(self.table, self.ir, stats=self.stats)
+        self.states_table = self.table.grid()
+
+    @phase
+    def print_table(self, fmt='text', states=None, symbols=None):
+        write_table(self.table, sys.stdout, fmt, states, symbols)
 
     def get_action(self, state, symbol):
         try:
@@ -267,88 +135,21 @@ class LALR1Parser:
             return None
 
     def get_production_by_index(self, production_index):
-        index = 0
-        for lhs, productions in self.grammar.items():
-            for production in productions:
-                if index == production_index:
-                    return lhs, production
-                index += 1
-        return None
+        return self.ir.production_names(production_index)
 
     def parse_string(self, input_string):
-        input_string += '#'
-        states_stack = [0]
-        symbol_stack = ['#']
-        input_index = 0
-        step = 1
-
-        while True:
-            current_state = states_stack[-1]
-            current_symbol = input_string[input_index]
-
-            print(f"Step {step:<4} | State Stack: {str(states_stack):<20} | Symbol Stack: {str(symbol_stack):<30} | "
-                  f"Input: {input_string[input_index:]:<15} | ", end="")
-
-            try:
-                action = self.get_action(current_state, current_symbol)
-                if not action:
-                    print(f"ACTION: None       | No action defined for this state/symbol combination")
-                    return False
-                print(f"ACTION: {action:<10} | ", end="")
-            except ValueError:
-                print(f"Error: Symbol '{current_symbol}' not in grammar")
-                return False
+        return print_trace(self.driver, input_string)
 
-            if action.startswith('S'):
-                next_state = int(action[1:])
-                states_stack.append(next_state)
-                symbol_stack.append(current_symbol)
-                input_index += 1
-                print("SHIFT")
-            elif action.startswith('r'):
-                production_index = int(action[1:])
-                production = self.get_production_by_index(production_index)
-                lhs = production[0]
-                rhs_length = len(production[1])
-                for _ in range(rhs_length):
-                    states_stack.pop()
-                    symbol_stack.pop()
-                goto_state = self.get_action(states_stack[-1], lhs)
-                if not goto_state:
-                    print(f"No GOTO for state {states_stack[-1]} and symbol {lhs}")
-                    return False
-                states_stack.append(int(goto_state))
-                symbol_stack.append(lhs)
-                print(f"REDUCE by {production[0]}->{''.join(production[1])}")
-            elif action == 'acc':
-                print("ACCEPT")
-                return True
-            step += 1
+    def draw_dfa(self, output_file='dfa_diagram', view=True, render=False):
+        """Write the DFA of parser states as DOT, rendered to PDF with Graphviz if render or view is set"""
+        render_dfa(self, output_file, view, render)
 
-    def draw_dfa(self, output_file='dfa_diagram'):
-        from graphviz import Digraph
-        dot = Digraph(comment='LALR(1) DFA')
-        dot.attr(rankdir='LR', size='10,8')
-        dot.attr('node', shape='ellipse', fontsize='10')
-        for i, state in enumerate(self.lalr_states):
-            label = f'I{i}\\n'
-            for item in sorted(state):
-                lhs, prod, dot_pos, lookahead = item
-                prod_str = ''
-                for idx, sym in enumerate(prod):
-                    if idx == dot_pos:
-                        prod_str += '• '
-                    prod_str += sym + ' '
-                if dot_pos == len(prod):
-                    prod_str += '• '
-                label += f'{lhs} → {prod_str.strip()}, {lookahead}\\n'
-            dot.node(str(i), label)
-        for (from_state, symbol), to_state in self.lalr_transitions.items():
-            dot.edge(str(from_state), str(to_state), label=symbol)
-        dot.render(output_file, format='pdf', view=True)
-        print(f"DFA diagram with states saved as {output_file}.pdf")
 
 if __name__ == '__main__':
+    # The GUI is only needed for the interactive menu, keep it out of library imports
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
+
     root = tk.Tk()
     root.withdraw()
     info_message = """
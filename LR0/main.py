@@ -1,130 +1,59 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox
-from read_grammar_lr0_temp import ReadGrammar
+import os
+import sys
+
+# Make the shared lrcore package importable when run from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lrcore.automaton import LR0Automaton
+from lrcore.driver import TableDriver, print_trace
+from lrcore.export import render_dfa
+from lrcore.grammar import DOT, ReadGrammar
+from lrcore.incremental import rebuild
+from lrcore.ir import CompiledGrammar
+from lrcore.memory import MemoryProfile
+from lrcore.stats import BuildStats, phase
+from lrcore.tables import build_table, grammar_precedence
+from lrcore.tableexport import write_table
 
 
 class LR0Parser:
-    def __init__(self, grammar):
+    def __init__(self, grammar, workers=None, stats=False, memory=False, automaton=None):
         # Initialize LR(0) parser with the given grammar
         self.grammar = grammar
+        if automaton is not None and not automaton.shares(grammar):
+            raise ValueError('The automaton was built for a different grammar')
+        # LR(0) item collection, possibly shared with SLR(1) and LALR(1) parsers of the same grammar
+        self.automaton = automaton
+        # Integer form of the grammar: symbol IDs and indexed productions
+        self.ir = CompiledGrammar(grammar) if automaton is None else automaton.ir
+        # Number of processes for automaton construction (None or 1 = sequential)
+        self.workers = workers
+        # Phase timings and operation counters, None when instrumentation is off
+        self.stats = BuildStats() if stats else None
+        # tracemalloc snapshots per phase, None when memory profiling is off
+        self.memory = MemoryProfile() if memory else None
         # Compute closures and transitions
         self.compute_closure_goto()
+        # Build the parsing table from the item collection
+        self.build_parsing_table()
 
-    def closure(self, items):
-        '''
-        Compute the closure of a set of items
-        :param items: current set of items
-        :return:
-        '''
-
-        closure_items = set(items)
-        changed = True
-
-        while changed:
-            changed = False
-            for item in closure_items.copy():
-                dot_index = item[1].index('.') if '.' in item[1] else len(item[1])
-
-                if dot_index < len(item[1]) - 1:
-                    next_symbol = item[1][dot_index + 1]
-
-                    if next_symbol in self.grammar:
-                        for production in self.grammar[next_symbol]:
-                            new_item = (next_symbol, ('.',) + production)
-                            if new_item not in closure_items:
-                                closure_items.add(new_item)
-                                changed = True
-
-            for item in closure_items.copy():
-                dot_index = item[1].index('.') if '.' in item[1] else len(item[1])
-                if dot_index == len(item[1]) - 1:
-                    if item not in closure_items:
-                        closure_items.add(item)
-                        changed = True
-
-        return frozenset(sorted(closure_items))
-
-    def goto(self, items, symbol):
-        '''
-        Compute GOTO function
-        :param items: current set of items
-        :param symbol: input symbol
-        :return:
-        '''
-
-        goto_items = set()
-
-        for item in items:
-            dot_index = item[1].index('.') if '.' in item[1] else len(item[1])
-
-            if dot_index < len(item[1]) - 1 and item[1][dot_index + 1] == symbol:
-                new_item = (item[0], item[1][:dot_index] + (symbol, '.') + item[1][dot_index + 2:])
-                goto_items.add(new_item)
-
-        return self.closure(goto_items)
-
+    @phase
     def compute_closure_goto(self):
         '''
-        Compute all closure and GOTO sets in the LR(0) item collection
-        :return:
+        Build the LR(0) item collection (lrcore.automaton), unless a shared one was passed in
         '''
+        if self.automaton is None:
+            self.automaton = LR0Automaton(self.grammar, self.ir, self.workers, self.stats)
+        self.states = self.automaton.states
+        self.transitions = self.automaton.transitions
+        self.goto_memo = self.automaton.goto_memo
 
-        self.states = []
-        self.transitions = {}
-
-        all_symbols = sorted(set(
-            symbol for production_list in self.grammar.values() for production in production_list for symbol in production))
-
-        # initial_item = ('S', ('.', 'E'))
-        start_symbol = list(self.grammar.keys())[0]
-        initial_item = (start_symbol, ('.',) + self.grammar[start_symbol][0])
-
-        initial_state = self.closure({initial_item})
-        self.states.append(initial_state)
-
-        queue = [initial_state]
-
-        while queue:
-            current_state = queue.pop(0)
-
-            for symbol in all_symbols:
-                goto_items = self.goto(current_state, symbol)
-
-                if goto_items:
-                    closure_goto_items = self.closure(goto_items)
-
-                    if closure_goto_items and closure_goto_items not in self.states:
-                        self.states.append(closure_goto_items)
-                        queue.append(closure_goto_items)
-
-                    self.transitions[(current_state, symbol)] = closure_goto_items
-
-    def is_reduce_state(self, state):
+    def update_grammar(self, grammar, verify=False):
         '''
-        Check if the state is a reduce state
+        Switch to an edited grammar, recomputing only what the edit affects (see lrcore.incremental)
+        :param verify: also build from scratch and raise AssertionError if anything differs
+        :return: lrcore.incremental.Rebuild
         '''
-        for item in state:
-            dot_index = item[1].index('.') if '.' in item[1] else len(item[1])
-            if dot_index < len(item[1]) - 1:
-                return False
-        return True
-
-
-    def get_reduce_production_index(self, state):
-        '''
-        Get the (index, production) of the reduction
-        '''
-        index = 0
-        for item in state:
-            dot_index = item[1].index('.') if '.' in item[1] else len(item[1])
-            if dot_index == len(item[1]) - 1:
-                lhs = item[0]
-                rhs = item[1][:dot_index]
-                for head, productions in self.grammar.items():
-                    for prod in productions:
-                        if head == lhs and prod == rhs:
-                            return index, (lhs, rhs)
-                        index += 1
+        return rebuild(self, grammar, verify)
 
     def print_states(self):
         '''
@@ -132,187 +61,56 @@ class LR0Parser:
         '''
         print("LR(0) Parsing States:")
         for i, state in enumerate(self.states):
-            print(f"State {i}: {state}")
+            print(f"State {i}:")
+            for lhs, rhs in state:
+                print(f"  {lhs} -> {' '.join('·' if symbol == DOT else symbol for symbol in rhs)}")
 
-    # def print_table(self):
+    def table_inputs(self):
         '''
-        Print the LR(0) parsing table
+        Columns, per-state successors and per-state reductions of the LR(0) table
+        :return: (terminals, non-terminals, successors, reductions) as build_table takes them
         '''
-        all_symbols = sorted(set(
-            symbol for production_list in self.grammar.values() for production in production_list for symbol in production))
-
-        uppercase_symbols = sorted(set(symbol for symbol in all_symbols if symbol.isupper()))
-        lowercase_symbols = sorted(set(symbol for symbol in all_symbols if symbol.islower()))
-        lowercase_symbols.append('#')
-
-        all_sorted_symbols = lowercase_symbols + uppercase_symbols
-        self.states_table = [[''] * (len(self.states) + 10) for _ in range(len(all_symbols) + 10)]
+        # Terminals (plus the end marker) first, then non-terminals, both sorted
+        terminals = sorted(self.ir.terminal_names())
+        non_terminals = sorted(self.ir.non_terminal_names())
 
-        self.states_table[0][0] = 'states'
+        production_index = self.ir.production_index
+        successors = self.automaton.successor_lists()
 
-        for row in range(len(self.states)):
-            self.states_table[row + 1][0] = row
+        # LR(0): a completed item reduces on every terminal
+        reductions = []
+        for state in self.states:
+            state_reductions = []
+            for lhs, rhs in state:
+                dot_index = rhs.index(DOT)
+                if dot_index == len(rhs) - 1:
+                    state_reductions.append((production_index[(lhs, rhs[:dot_index])], terminals))
+            reductions.append(state_reductions)
+        return terminals, non_terminals, successors, reductions
 
-        for col, symbol in enumerate(all_sorted_symbols, start=1):
-            self.states_table[0][col] = symbol
-
-        for row in range(1, len(self.states) + 1):
-            for col in range(1, len(all_sorted_symbols) + 1):
-                current_states = self.states_table[row][0]
-                current_symbol = self.states_table[0][col]
-
-                if self.is_reduce_state(self.states[current_states]):
-                    production_index = self.get_reduce_production_index(self.states[current_states])
-                    if production_index == 0:
-                        cell_value = 'acc' if current_symbol == '#' else ''
-                    else:
-                        cell_value = 'r' + str(production_index) if current_symbol in lowercase_symbols else ''
-                else:
-                    goto_state = self.goto(self.states[current_states], current_symbol)
-                    if goto_state:
-                        goto_index = self.states.index(goto_state)
-                        cell_value = 'S' + str(goto_index) if current_symbol.islower() else str(goto_index)
-                    else:
-                        cell_value = ''
-                self.states_table[row][col] = cell_value
+    @phase
+    def build_parsing_table(self):
+        '''
+        Build the LR(0) parsing table in one pass over each state's items and transitions
+        '''
+        terminals, non_terminals, successors, reductions = self.table_inputs()
+        self.table = build_table(successors, reductions, terminals, non_terminals, self.stats,
+                                 grammar_precedence(self.grammar, self.ir))
+        self.conflicts = self.table.conflicts
+        # Driver for parse_string; steps() gives the same parse as records
+        self.driver = TableDriver(self.table, self.ir, stats=self.stats)
+        self.states_table = self.table.grid()
 
-        for row in range(len(self.states) + 1):
-            for col in range(len(all_sorted_symbols) + 1):
-                print(f"{self.states_table[row][col]:<10}", end='|')
-            print()
-    def print_table(self):
+    @phase
+    def print_table(self, fmt='text', states=None, symbols=None):
         '''
         Print the LR(0) parsing table
+        :param fmt, states, symbols: as write_table takes them
         '''
-        # Get all symbols from grammar
-        all_symbols = set()
-        for production_list in self.grammar.values():
-            for production in production_list:
-                for symbol in production:
-                    all_symbols.add(symbol)
-        
-        # Separate terminals and non-terminals
-        non_terminals = set(self.grammar.keys())
-        all_symbols = set()
-        for prods in self.grammar.values():
-            for prod in prods:
-                for sym in prod:
-                    all_symbols.add(sym)
-
-        terminals = all_symbols - non_terminals
-
-        # Add end marker
-        terminals.add('#')
-        
-        # Sort them
-        terminals = sorted(terminals)
-        non_terminals = sorted(non_terminals)
-        
-        # Combine them with terminals first
-        all_sorted_symbols = terminals + non_terminals
-        
-        # Initialize table
-        self.states_table = [[''] * (len(all_sorted_symbols) + 1) for _ in range(len(self.states) + 1)]
-        self.states_table[0][0] = 'states'
-        
-        # Fill header row
-        for col, symbol in enumerate(all_sorted_symbols, start=1):
-            self.states_table[0][col] = symbol
-        
-        # Fill state numbers
-        for row in range(1, len(self.states) + 1):
-            self.states_table[row][0] = row - 1
-        
-        # Fill table cells
-        for state_index in range(len(self.states)):
-            for symbol in all_sorted_symbols:
-                col = all_sorted_symbols.index(symbol) + 1
-                row = state_index + 1
-                
-                if self.is_reduce_state(self.states[state_index]):
-                    # production_index = self.get_reduce_production_index(self.states[state_index])
-                    production_index, _ = self.get_reduce_production_index(self.states[state_index])
-
-                    if production_index == 0:
-                        cell_value = 'acc' if symbol == '#' else ''
-                    else:
-                        cell_value = 'r' + str(production_index) if symbol in terminals else ''
-                else:
-                    goto_state = self.goto(self.states[state_index], symbol)
-                    if goto_state:
-                        goto_index = self.states.index(goto_state)
-                        cell_value = 'S' + str(goto_index) if symbol in terminals else str(goto_index)
-                    else:
-                        cell_value = ''
-                
-                self.states_table[row][col] = cell_value
-        
-        # Print the table
-        for row in range(len(self.states_table)):
-            for col in range(len(self.states_table[row])):
-                print(f"{self.states_table[row][col]:<10}", end='|')
-            print()
+        write_table(self.table, sys.stdout, fmt, states, symbols)
     
     def parse_string(self, input_string):
-        input_string += '#'
-        states_stack = [0]
-        symbol_stack = ['#']
-        input_index = 0
-        step = 1
-
-        while True:
-            current_state = states_stack[-1]
-            current_symbol = input_string[input_index]
-
-            print(f"Step {step:<4} | State Stack: {str(states_stack):<20} | Symbol Stack: {str(symbol_stack):<30} | "
-                f"Input: {input_string[input_index:]:<15} | ", end="")
-
-            try:
-                action = self.get_action(current_state, current_symbol)
-            except ValueError:
-                print(f"Error: Symbol '{current_symbol}' not in grammar")
-                return False
-
-            print(f"ACTION: {action:<10} | ", end="")
-
-            if not action:
-                print("No action defined for this state/symbol combination")
-                return False
-
-            if action.startswith('S'):
-                next_state = int(action[1:])
-                states_stack.append(next_state)
-                symbol_stack.append(current_symbol)
-                input_index += 1
-                print("SHIFT")
-
-            elif action.startswith('r'):
-                production_index = int(action[1:])
-                production = self.get_production_by_index(production_index)
-                lhs = production[0]
-                rhs_length = len(production[1])
-                
-                # Pop states and symbols
-                for _ in range(rhs_length):
-                    states_stack.pop()
-                    symbol_stack.pop()
-                
-                # Get new state from GOTO table
-                goto_state = self.get_action(states_stack[-1], lhs)
-                if not goto_state:
-                    print(f"No GOTO for state {states_stack[-1]} and symbol {lhs}")
-                    return False
-                
-                states_stack.append(int(goto_state))
-                symbol_stack.append(lhs)
-                print(f"REDUCE by {production[0]}->{''.join(production[1])}")
-
-            elif action == 'acc':
-                print("ACCEPT")
-                return True
-
-            step += 1
-    
+        return print_trace(self.driver, input_string)
 
     def get_action(self, state, symbol):
         try:
@@ -325,47 +123,18 @@ class LR0Parser:
         '''
         Get production by index
         '''
-        for left_symbol, productions in self.grammar.items():
-            for index, production in enumerate(productions):
-                if production_index == 0:
-                    return left_symbol, production
-                production_index -= 1
+        return self.ir.production_names(production_index)
 
+    def draw_dfa(self, output_file='dfa_diagram', view=True, render=False):
+        """Write the DFA of parser states as DOT, rendered to PDF with Graphviz if render or view is set"""
+        render_dfa(self, output_file, view, render)
 
 
-    def draw_dfa(self, output_file='dfa_diagram'):
-        """Generate and render the DFA diagram of parser states using Graphviz"""
-        from graphviz import Digraph
-        dot = Digraph(comment='Parser DFA')
-        dot.attr(rankdir='LR', size='10,8')
-        dot.attr('node', shape='ellipse', fontsize='10')
-
-        # Add states with item sets as labels
-        for i, state in enumerate(self.states):
-            label = f'I{i}\\n'
-            for item in sorted(state):
-                if len(item) == 2:
-                    lhs, rhs = item
-                    rhs_str = ' '.join(rhs).replace(' .', '•').replace('.', '•')
-                    label += f'{lhs} → {rhs_str}\\n'
-                elif len(item) == 3:
-                    lhs, rhs, lookahead = item
-                    rhs_str = ' '.join(rhs).replace(' .', '•').replace('.', '•')
-                    label += f'{lhs} → {rhs_str}, {lookahead}\\n'
-            dot.node(str(i), label)
-
-        for (from_state, symbol), to_state in self.transitions.items():
-            if isinstance(from_state, int):
-                dot.edge(str(from_state), str(to_state), label=symbol)
-            else:
-                from_index = self.states.index(from_state)
-                to_index = self.states.index(to_state)
-                dot.edge(str(from_index), str(to_index), label=symbol)
-
-        dot.render(output_file, format='pdf', view=True)
-        print(f"DFA diagram saved as {output_file}.pdf")
-
 if __name__ == '__main__':
+    # The GUI is only needed for the interactive menu, keep it out of library imports
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
+
     root = tk.Tk()
     root.withdraw()
 
@@ -0,0 +1,173 @@
+'''
+Construction benchmark: time every build phase of every engine over the corpus.
+
+Usage:
+    python benchmarks/bench_construction.py [--algorithms lr0 slr clr lalr]
+        [--levels 2 4 8] [--random 5 10 20] [--repeat 3] [--memory]
+        [--output results.json]
+
+Phases are timed by wrapping the engine methods that implement them, so the
+engines are built exactly as their constructors build them. Results are
+written as JSON (one record per grammar and algorithm) for later comparison.
+'''
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lrcore.engines import ENGINES, load_engine, parser_states, table_cells
+from corpus import corpus
+
+# Engine methods that make up each phase. Only outermost methods are listed.
+PHASES = {
+    'lr0': {'automaton': ['compute_closure_goto'],
+            'table': ['build_parsing_table']},
+    'slr': {'first_follow': ['compute_first_follow_sets'],
+            'automaton': ['compute_closure_goto'],
+            'table': ['build_parsing_table']},
+    'clr': {'first_follow': ['compute_first_sets', 'compute_follow_sets'],
+            'automaton': ['compute_closure_goto'],
+            'table': ['build_parsing_table']},
+    'lalr': {'automaton': ['compute_closure_goto', 'compute_lookaheads'],
+             'table': ['build_parsing_table']},
+}
+
+
+@contextlib.contextmanager
+def timed_methods(cls, phases, timings):
+    '''
+    Temporarily wrap the phase methods of an engine class with timers
+    '''
+    def wrap(function, phase):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+        return timed
+
+    originals = {}
+    for phase, names in phases.items():
+        for name in names:
+            originals[name] = cls.__dict__[name]
+            setattr(cls, name, wrap(originals[name], phase))
+    try:
+        yield
+    finally:
+        for name, function in originals.items():
+            setattr(cls, name, function)
+
+
+def build(algorithm, grammar_path):
+    '''
+    Load a grammar and build one engine, timing each phase
+    :return: (parser, {phase: seconds})
+    '''
+    parser_class, reader_class = load_engine(algorithm)
+    phases = PHASES[algorithm]
+    timings = {}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        grammar = reader_class(grammar_path)
+        timings['load'] = time.perf_counter() - start
+        # Every engine builds its table in the constructor, so this times all phases
+        with timed_methods(parser_class, phases, timings):
+            parser = parser_class(grammar)
+    return parser, timings
+
+
+def peak_memory(algorithm, grammar_path):
+    '''
+    Peak traced allocation while loading and building one engine
+    '''
+    tracemalloc.start()
+    try:
+        build(algorithm, grammar_path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(algorithms, entries, repeat, memory):
+    '''
+    Benchmark every algorithm on every corpus entry
+    :return: list of result records
+    '''
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, parameters, text in entries:
+            grammar_path = os.path.join(directory, f"{name}.txt")
+            with open(grammar_path, 'w', encoding='utf-8') as file:
+                file.write(text)
+            for algorithm in algorithms:
+                best = None
+                for _ in range(repeat):
+                    parser, timings = build(algorithm, grammar_path)
+                    if best is None or sum(timings.values()) < sum(best.values()):
+                        best = timings
+                filled, total = table_cells(parser)
+                record = {
+                    'grammar': name,
+                    'parameters': parameters,
+                    'algorithm': algorithm,
+                    'productions': sum(len(productions) for productions in parser.grammar.values()),
+                    'nonterminals': len(parser.grammar),
+                    'phases': best,
+                    'total_seconds': sum(best.values()),
+                    'states': len(parser_states(parser)),
+                    'table_cells': total,
+                    'filled_cells': filled,
+                }
+                if memory:
+                    record['peak_bytes'] = peak_memory(algorithm, grammar_path)
+                results.append(record)
+                print_record(record)
+    return results
+
+
+def print_record(record):
+    phases = '  '.join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in record['phases'].items())
+    cells = f"{record['filled_cells']}/{record['table_cells']}"
+    line = f"{record['grammar']:<12} {record['algorithm']:<5} states={record['states']:<6} cells={cells:<14} {phases}"
+    if 'peak_bytes' in record:
+        line += f"  peak={record['peak_bytes'] / 1024:.0f}KiB"
+    print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark LR automaton and table construction')
+    parser.add_argument('--algorithms', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--levels', nargs='*', type=int, default=[2, 4, 8],
+                        help='precedence levels of the synthetic expression grammars')
+    parser.add_argument('--random', nargs='*', type=int, default=[5, 10, 20],
+                        help='nonterminal counts of the random grammars')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random grammars')
+    parser.add_argument('--repeat', type=int, default=1, help='keep the fastest of N builds')
+    parser.add_argument('--memory', action='store_true', help='also measure peak memory (extra build)')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    entries = corpus(levels=args.levels, random_sizes=args.random, seed=args.seed)
+    results = run(args.algorithms, entries, max(1, args.repeat), args.memory)
+
+    if args.output:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+'''
+Parse throughput benchmark: run every engine's driver over generated corpora.
+
+Usage:
+    python benchmarks/bench_parse.py [--algorithms slr clr lalr]
+        [--lengths 8 32 128] [--count 200] [--invalid 0.2] [--driver engine|table|bypass|direct]
+        [--output results.json]
+
+For each grammar a corpus is derived with lrcore.generate (valid sentences
+plus a share of mutated ones) and fed to parse_string of each engine, with
+the step trace discarded, to lrcore.driver built on the engine's table, or
+to the direct-coded parser lrcore.codegen generates from that table (which
+keeps no shift/reduce counters, so red/tok is 0 there).
+Reported per input-length bucket: tokens/sec, accepts/sec, latency
+percentiles and reductions per token.
+'''
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lrcore.codegen import DirectParser
+from lrcore.driver import TableDriver
+from lrcore.engines import ENGINES, load_engine
+from lrcore.generate import SentenceGenerator
+from lrcore.grammar import ReadGrammar
+from lrcore.stats import BuildStats
+from corpus import corpus
+
+
+def percentile(sorted_values, fraction):
+    '''
+    Nearest-rank percentile of an already sorted list
+    '''
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def make_corpus(grammar_path, lengths, count, invalid_ratio, max_depth, seed):
+    '''
+    Generate the input corpus of one grammar
+    :return: dict target length -> list of (input string, token count, mutated)
+    '''
+    generator = SentenceGenerator(ReadGrammar(grammar_path), seed=seed)
+    inputs = {}
+    for length in lengths:
+        inputs[length] = [(''.join(tokens), len(tokens), mutated)
+                          for tokens, mutated in generator.corpus(count, length, max_depth, invalid_ratio)]
+    return inputs
+
+
+def make_parse(parser, driver, stats):
+    '''
+    The parse function to time: the engine's own parse_string, lrcore.driver
+    with or without unit-reduction bypass, or the direct-coded parser
+    :return: function text -> accepted
+    '''
+    if driver == 'engine':
+        parser.driver.stats = stats  # only the shift/reduce counters are touched while parsing
+        return parser.parse_string
+    if driver == 'direct':
+        return DirectParser(parser.table, parser.ir).parse
+    table_driver = TableDriver(parser.table, parser.ir, bypass_units=driver == 'bypass', stats=stats)
+    return lambda text: table_driver.parse(text)[0]
+
+
+def measure(parse, stats, inputs):
+    '''
+    Parse every input once, timing each call
+    :return: dict with throughput and latency figures
+    '''
+    stats.reset_counters()
+    latencies = []
+    tokens = 0
+    accepted = 0
+    rejected_valid = 0
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for text, length, mutated in inputs:
+            start = time.perf_counter()
+            result = parse(text)
+            latencies.append(time.perf_counter() - start)
+            tokens += length
+            accepted += bool(result)
+            rejected_valid += not result and not mutated
+    total = sum(latencies) or 1e-12
+    latencies.sort()
+    return {
+        'inputs': len(inputs),
+        'tokens': tokens,
+        'accepted': accepted,
+        'rejected_valid': rejected_valid,
+        'seconds': total,
+        'tokens_per_second': tokens / total,
+        'accepts_per_second': accepted / total,
+        'latency_p50': percentile(latencies, 0.50),
+        'latency_p90': percentile(latencies, 0.90),
+        'latency_p99': percentile(latencies, 0.99),
+        'reduces_per_token': stats.reduces / tokens if tokens else 0.0,
+    }
+
+
+def run(algorithms, entries, lengths, count, invalid_ratio, max_depth, seed, driver='engine'):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, parameters, text in entries:
+            grammar_path = os.path.join(directory, f"{name}.txt")
+            with open(grammar_path, 'w', encoding='utf-8') as file:
+                file.write(text)
+            inputs = make_corpus(grammar_path, lengths, count, invalid_ratio, max_depth, seed)
+            for algorithm in algorithms:
+                parser_class, reader_class = load_engine(algorithm)
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    parser = parser_class(reader_class(grammar_path))
+                stats = BuildStats()
+                parse = make_parse(parser, driver, stats)
+                for length, bucket in inputs.items():
+                    record = {'grammar': name, 'parameters': parameters, 'algorithm': algorithm,
+                              'driver': driver, 'target_length': length}
+                    record.update(measure(parse, stats, bucket))
+                    results.append(record)
+                    print_record(record)
+    return results
+
+
+def print_record(record):
+    print(f"{record['grammar']:<12} {record['algorithm']:<5} len~{record['target_length']:<5} "
+          f"{record['tokens_per_second']:>10.0f} tok/s {record['accepts_per_second']:>8.0f} acc/s  "
+          f"p50={record['latency_p50'] * 1e6:.0f}us p90={record['latency_p90'] * 1e6:.0f}us "
+          f"p99={record['latency_p99'] * 1e6:.0f}us  red/tok={record['reduces_per_token']:.2f}  accepted={record['accepted']}/{record['inputs']}"
+          + (f"  REJECTED VALID={record['rejected_valid']}" if record['rejected_valid'] else ''))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark parse throughput of the LR drivers')
+    parser.add_argument('--algorithms', nargs='+', choices=list(ENGINES), default=['slr', 'clr', 'lalr'])
+    parser.add_argument('--levels', nargs='*', type=int, default=[4],
+                        help='precedence levels of the synthetic expression grammars')
+    parser.add_argument('--random', nargs='*', type=int, default=[],
+                        help='nonterminal counts of random grammars (usually full of conflicts)')
+    parser.add_argument('--lengths', nargs='+', type=int, default=[8, 32, 128],
+                        help='target sentence lengths, one latency bucket each')
+    parser.add_argument('--count', type=int, default=100, help='sentences per length bucket')
+    parser.add_argument('--invalid', type=float, default=0.2, help='fraction of mutated sentences')
+    parser.add_argument('--max-depth', type=int, default=200, help='derivation depth limit')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--driver', choices=('engine', 'table', 'bypass', 'direct'), default='engine',
+                        help="engine: each parser's parse_string; table: lrcore.driver; "
+                             "bypass: lrcore.driver skipping unit reductions; direct: lrcore.codegen")
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    entries = corpus(levels=args.levels, random_sizes=args.random, seed=args.seed)
+    results = run(args.algorithms, entries, args.lengths, args.count, args.invalid,
+                  args.max_depth, args.seed, args.driver)
+
+    if args.output:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
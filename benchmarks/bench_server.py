@@ -0,0 +1,158 @@
+'''
+Load test for the parse service (lrcore.server).
+
+Usage:
+    python benchmarks/bench_server.py GRAMMAR [--port 7878 | --unix PATH] [--spawn]
+        [--connections 8] [--depth 32] [--requests 10000] [--length 32]
+        [--invalid 0.2] [--algorithm lalr] [--recover] [--output results.json]
+
+Inputs are generated from GRAMMAR with lrcore.generate; the server must
+serve the same file (its ID is the file name without extension). With
+--spawn the script starts `python -m lrcore serve` itself on a temporary
+Unix socket and stops it afterwards. Each connection keeps --depth requests
+in flight, so the figures include pipelining. Reported: requests/sec,
+tokens/sec and latency percentiles from send to response.
+'''
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from lrcore.generate import SentenceGenerator
+from lrcore.grammar import ReadGrammar
+from lrcore.server import DEFAULT_PORT, ParseClient
+from bench_parse import percentile
+
+
+async def run_connection(client, grammar_id, inputs, depth, algorithm, recover, latencies):
+    '''
+    Send inputs over one connection with up to depth requests in flight
+    :return: number of accepted inputs
+    '''
+    slots = asyncio.Semaphore(depth)
+    accepted = 0
+
+    async def one(text):
+        nonlocal accepted
+        async with slots:
+            start = time.perf_counter()
+            response = await client.parse(grammar_id, text, algorithm, recover)
+            latencies.append(time.perf_counter() - start)
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        accepted += response['accepted']
+
+    await asyncio.gather(*(one(text) for text in inputs))
+    return accepted
+
+
+async def load_test(grammar_id, inputs, connections, depth, algorithm, recover, host, port, path):
+    clients = [await ParseClient.connect(host, port, path) for _ in range(connections)]
+    latencies = []
+    shares = [inputs[i::connections] for i in range(connections)]
+    start = time.perf_counter()
+    try:
+        accepted = await asyncio.gather(*(run_connection(client, grammar_id, share, depth, algorithm,
+                                                         recover, latencies)
+                                          for client, share in zip(clients, shares)))
+    finally:
+        for client in clients:
+            await client.close()
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    tokens = sum(len(text) for text in inputs)
+    return {
+        'requests': len(inputs),
+        'accepted': sum(accepted),
+        'tokens': tokens,
+        'seconds': seconds,
+        'requests_per_second': len(inputs) / seconds,
+        'tokens_per_second': tokens / seconds,
+        'latency_p50': percentile(latencies, 0.50),
+        'latency_p90': percentile(latencies, 0.90),
+        'latency_p99': percentile(latencies, 0.99),
+    }
+
+
+def spawn_server(grammar_path, algorithm, path):
+    '''
+    Start `python -m lrcore serve` on a Unix socket and wait until it listens
+    '''
+    command = [sys.executable, '-m', 'lrcore', 'serve', grammar_path, '--unix', path]
+    if algorithm:
+        command += ['-a', algorithm]
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, encoding='utf-8')
+    process.stdout.readline()  # the "serving ..." line is printed once the grammars are built
+    deadline = time.time() + 10
+    while not os.path.exists(path):
+        if process.poll() is not None or time.time() > deadline:
+            process.kill()
+            raise RuntimeError('the parse server did not start')
+        time.sleep(0.01)
+    return process
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the lrcore parse server')
+    parser.add_argument('grammar', help='grammar file the server was started with')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', metavar='PATH', help='connect to this Unix socket instead of TCP')
+    parser.add_argument('--spawn', action='store_true', help='start a server on a temporary Unix socket')
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--depth', type=int, default=32, help='requests in flight per connection')
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--length', type=int, default=32, help='target sentence length')
+    parser.add_argument('--invalid', type=float, default=0.2, help='fraction of mutated sentences')
+    parser.add_argument('--algorithm', help="algorithm to request (default: the server's first)")
+    parser.add_argument('--recover', action='store_true', help='ask for error recovery')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    generator = SentenceGenerator(ReadGrammar(args.grammar), seed=args.seed)
+    inputs = [''.join(tokens) for tokens, _ in generator.corpus(args.requests, args.length, 200, args.invalid)]
+    grammar_id = os.path.splitext(os.path.basename(args.grammar))[0]
+
+    process = None
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.unix
+        if args.spawn:
+            path = os.path.join(directory, 'lrcore.sock')
+            process = spawn_server(os.path.abspath(args.grammar), args.algorithm, path)
+        try:
+            result = asyncio.run(load_test(grammar_id, inputs, args.connections, args.depth, args.algorithm,
+                                           args.recover, args.host, args.port, path))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    result.update({'grammar': grammar_id, 'connections': args.connections, 'depth': args.depth,
+                   'recover': args.recover})
+    print(f"{grammar_id:<12} {args.connections} conn x {args.depth} deep  "
+          f"{result['requests_per_second']:>9.0f} req/s {result['tokens_per_second']:>10.0f} tok/s  "
+          f"p50={result['latency_p50'] * 1e6:.0f}us p90={result['latency_p90'] * 1e6:.0f}us "
+          f"p99={result['latency_p99'] * 1e6:.0f}us  accepted={result['accepted']}/{result['requests']}")
+
+    if args.output:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': [result],
+        }
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+'''
+Grammar corpus for the benchmarks.
+
+Every grammar is written in the lrcore.grammar format: one rule per line,
+symbols separated by spaces, nonterminals start with an uppercase letter and
+terminals are single characters (the drivers read the input one character
+per token). None of them uses epsilon productions.
+'''
+import os
+import random
+import string
+
+GRAMMAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grammars')
+
+# Single-character terminals usable by the synthetic grammars: no '#' (end
+# marker), '|' (alternative separator), '(' / ')' / 'a' (expression operands)
+OPERATORS = [c for c in '+-*/%^&<>=!~?@$;:,.[]{}' + string.ascii_lowercase + string.digits
+             if c != 'a']
+
+
+def static_grammars():
+    '''
+    The hand-written grammars shipped in benchmarks/grammars
+    :return: dict name -> grammar file path
+    '''
+    return {os.path.splitext(name)[0]: os.path.join(GRAMMAR_DIR, name)
+            for name in sorted(os.listdir(GRAMMAR_DIR)) if name.endswith('.txt')}
+
+
+def expression_grammar(levels):
+    '''
+    Left-recursive expression grammar with one binary operator per precedence level
+    :param levels: number of precedence levels
+    :return: grammar text
+    '''
+    if not 1 <= levels <= len(OPERATORS):
+        raise ValueError(f"levels must be between 1 and {len(OPERATORS)}")
+    lines = []
+    for level in range(levels):
+        lines.append(f"E{level} -> E{level} {OPERATORS[level]} E{level + 1} | E{level + 1}")
+    lines.append(f"E{levels} -> ( E0 ) | a")
+    return '\n'.join(lines) + '\n'
+
+
+def random_grammar(nonterminals, terminals=10, alternatives=3, max_length=4, seed=0):
+    '''
+    Random grammar in which every nonterminal is reachable and productive, and
+    which has no unit cycle (a unit production A -> B always has B after A)
+    :param nonterminals: number of nonterminals
+    :param terminals: number of distinct terminals (at most len(OPERATORS))
+    :param alternatives: productions per nonterminal
+    :param max_length: maximum right-hand side length
+    :param seed: random seed, so the same parameters give the same grammar
+    :return: grammar text
+    '''
+    rng = random.Random(seed)
+    terminal_pool = OPERATORS[:terminals]
+    names = [f"N{i}" for i in range(nonterminals)]
+    lines = []
+    for i, name in enumerate(names):
+        later = names[i + 1:]
+        alts = []
+        for alt in range(alternatives):
+            length = rng.randint(1, max_length)
+            rhs = [rng.choice(names) if rng.random() < 0.4 else rng.choice(terminal_pool)
+                   for _ in range(length)]
+            if alt == 0:
+                # First alternative only descends, which keeps every nonterminal productive
+                rhs = [s if s not in names or s in later else rng.choice(terminal_pool) for s in rhs]
+                if later:
+                    # ... and reaches the next nonterminal, which keeps every nonterminal reachable
+                    rhs[rng.randrange(len(rhs))] = later[0]
+            elif len(rhs) == 1 and rhs[0] in names and rhs[0] not in later:
+                # A unit production only descends, so there is no A -> A and no unit cycle
+                rhs = [rng.choice(terminal_pool + later)]
+            alts.append(' '.join(rhs))
+        lines.append(f"{name} -> {' | '.join(dict.fromkeys(alts))}")
+    return '\n'.join(lines) + '\n'
+
+
+def corpus(levels=(2, 4, 8), random_sizes=(5, 10, 20), seed=0):
+    '''
+    Assemble the benchmark corpus
+    :param levels: precedence level counts for the expression grammars
+    :param random_sizes: nonterminal counts for the random grammars
+    :param seed: random seed for the random grammars
+    :return: list of (name, parameters, grammar text)
+    '''
+    entries = []
+    for name, path in static_grammars().items():
+        with open(path, 'r', encoding='utf-8') as file:
+            entries.append((name, {}, file.read()))
+    for count in levels:
+        entries.append((f"expr{count}", {'levels': count}, expression_grammar(count)))
+    for count in random_sizes:
+        entries.append((f"random{count}", {'nonterminals': count, 'seed': seed},
+                        random_grammar(count, seed=seed)))
+    return entries
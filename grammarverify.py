@@ -1,140 +1,355 @@
-import re
-
-def parse_grammar(grammar_lines):
-    grammar = {}
-    non_terminals = set()
-
-    for line in grammar_lines:
-        line = re.sub(r'\s+', ' ', line.strip())  # normalize whitespace
-
-        if "->" not in line:
-            print(f"❌ Invalid production (missing '->'): {line}")
-            return None
-
-        left, right = map(str.strip, line.split("->", 1))
-
-        if not re.fullmatch(r"[A-Z][A-Za-z0-9]*", left):
-            print(f"❌ Invalid non-terminal name: {left}")
-            return None
-
-        productions = [p.strip() for p in right.split('|') if p.strip()]
-        if not productions:
-            print(f"❌ No valid production rules on the right-hand side for: {left}")
-            return None
-
-        for prod in productions:
-            if not re.fullmatch(r"[A-Za-z0-9+\-*/ε() ]+", prod):
-                print(f"⚠️  Warning: Possibly invalid characters in production: {left} -> {prod}")
-
-        if left not in grammar:
-            grammar[left] = []
-
-        # Check for duplicate productions
-        duplicates = set(productions) & set(grammar[left])
-        if duplicates:
-            print(f"⚠️  Warning: Duplicate production(s) for {left}: {', '.join(duplicates)}")
-
-        grammar[left].extend(productions)
-        non_terminals.add(left)
-
-    return grammar, non_terminals
-
-
-def find_undefined_non_terminals(grammar, defined_non_terminals):
-    used_non_terminals = set()
-    for productions in grammar.values():
-        for prod in productions:
-            for symbol in re.findall(r'[A-Z][A-Za-z0-9]*', prod):  # extended to multi-letter NTs
-                used_non_terminals.add(symbol)
-    undefined = used_non_terminals - defined_non_terminals
-    return undefined
-
-
-def detect_left_recursion(grammar):
-    left_recursive = {}
-    for nt, prods in grammar.items():
-        recursives = [p for p in prods if p.startswith(nt)]
-        if recursives:
-            left_recursive[nt] = recursives
-    return left_recursive
-
-
-def remove_immediate_left_recursion(grammar):
-    updated_grammar = {}
-
-    for nt, prods in grammar.items():
-        alpha = []
-        beta = []
-
-        for p in prods:
-            if p.startswith(nt):
-                alpha.append(p[len(nt):])
-            else:
-                beta.append(p)
-
-        if alpha:
-            new_nt = nt + "'"
-            if beta:
-                updated_grammar[nt] = [b + new_nt for b in beta]
-            else:
-                updated_grammar[nt] = [new_nt]
-
-            updated_grammar[new_nt] = [a + new_nt for a in alpha]
-            updated_grammar[new_nt].append('ε')
-        else:
-            updated_grammar[nt] = prods
-
-    return updated_grammar
-
-
-def display_grammar(grammar):
-    for nt, prods in grammar.items():
-        print(f"{nt} -> {' | '.join(prods)}")
-
-
-def grammar_verifier_interface():
-    print("Enter grammar productions (one per line). Type 'done' to finish.")
-    print("Example: E -> E+T | T\n")
-
-    lines = []
-    while True:
-        line = input(">> ").strip()
-        if line.lower() == "done":
-            break
-        if line:
-            lines.append(line)
-
-    result = parse_grammar(lines)
-    if not result:
-        return
-
-    grammar, defined_non_terminals = result
-
-    undefined_nts = find_undefined_non_terminals(grammar, defined_non_terminals)
-    if undefined_nts:
-        print(f"\n❌ Error: Undefined non-terminals used: {', '.join(undefined_nts)}")
-        return
-
-    print("\n✅ Grammar successfully parsed.")
-    print("Original Grammar:")
-    display_grammar(grammar)
-
-    left_recursions = detect_left_recursion(grammar)
-    if left_recursions:
-        print("\n⚠️  Immediate Left Recursion detected in:")
-        for nt, prods in left_recursions.items():
-            print(f"  {nt}: {', '.join(prods)}")
-
-        print("\nNote: Only immediate left recursion is handled. Indirect left recursion is not detected.")
-
-        choice = input("\nDo you want to remove immediate left recursion? (y/n): ").strip().lower()
-        if choice == 'y':
-            grammar = remove_immediate_left_recursion(grammar)
-            print("\n✅ Updated Grammar (Left Recursion Removed):")
-            display_grammar(grammar)
-    else:
-        print("\n✅ No immediate left recursion found.")
-
-
-if __name__ == "__main__":
-    grammar_verifier_interface()
+import re
+import sys
+
+from lrcore.grammar import EPSILON, SYMBOL
+
+NON_TERMINAL = re.compile(r"[A-Z][A-Za-z0-9_]*'*")
+
+
+def tokenize(production):
+    '''
+    Split a right-hand side into symbols, the way lrcore.grammar does: ε is the empty tuple
+    '''
+    symbols = SYMBOL.findall(production)
+    return () if symbols == [EPSILON] else tuple(symbols)
+
+
+def parse_grammar(grammar_lines):
+    '''
+    Parse and check grammar lines
+    :return: (dict nonterminal -> list of rhs tuples, set of defined nonterminals), or None on error
+    '''
+    grammar = {}
+    non_terminals = set()
+
+    for line in grammar_lines:
+        line = re.sub(r'\s+', ' ', line.strip())  # normalize whitespace
+
+        if "->" not in line:
+            print(f"❌ Invalid production (missing '->'): {line}")
+            return None
+
+        left, right = map(str.strip, line.split("->", 1))
+
+        if not NON_TERMINAL.fullmatch(left):
+            print(f"❌ Invalid non-terminal name: {left}")
+            return None
+
+        productions = [p.strip() for p in right.split('|') if p.strip()]
+        if not productions:
+            print(f"❌ No valid production rules on the right-hand side for: {left}")
+            return None
+
+        for prod in productions:
+            if not re.fullmatch(r"[A-Za-z0-9_'+\-*/ε() ]+", prod):
+                print(f"⚠️  Warning: Possibly invalid characters in production: {left} -> {prod}")
+
+        if left not in grammar:
+            grammar[left] = []
+
+        # Check for duplicate productions
+        known = set(grammar[left])
+        for prod in productions:
+            symbols = tokenize(prod)
+            if symbols in known:
+                print(f"⚠️  Warning: Duplicate production for {left}: {prod}")
+                continue
+            known.add(symbols)
+            grammar[left].append(symbols)
+        non_terminals.add(left)
+
+    return grammar, non_terminals
+
+
+def find_undefined_non_terminals(grammar, defined_non_terminals):
+    used_non_terminals = set()
+    for productions in grammar.values():
+        for prod in productions:
+            for symbol in prod:
+                if NON_TERMINAL.fullmatch(symbol):
+                    used_non_terminals.add(symbol)
+    undefined = used_non_terminals - defined_non_terminals
+    return undefined
+
+
+def nullable_symbols(grammar):
+    '''
+    Nonterminals deriving the empty string, in time linear in the grammar size:
+    every production made of nonterminals only counts the symbols not yet known
+    nullable, and a nonterminal becoming nullable decrements the counters of the
+    productions using it
+    :return: set of nonterminals
+    '''
+    remaining = {}  # (lhs, production number) -> symbols not yet known to be nullable
+    uses = {}       # nonterminal -> productions it occurs in (once per occurrence)
+    nullable = set()
+    worklist = []
+
+    for nt, prods in grammar.items():
+        for number, prod in enumerate(prods):
+            if any(symbol not in grammar for symbol in prod):
+                continue  # a terminal is never nullable
+            remaining[(nt, number)] = len(prod)
+            for symbol in prod:
+                uses.setdefault(symbol, []).append((nt, number))
+            if not prod and nt not in nullable:
+                nullable.add(nt)
+                worklist.append(nt)
+
+    while worklist:
+        symbol = worklist.pop()
+        for key in uses.get(symbol, ()):
+            remaining[key] -= 1
+            if remaining[key] == 0 and key[0] not in nullable:
+                nullable.add(key[0])
+                worklist.append(key[0])
+    return nullable
+
+
+def left_corner_graph(grammar, nullable=None):
+    '''
+    Edges A -> B for every production A -> α B β with α nullable
+    :return: dict nonterminal -> list of left-corner nonterminals
+    '''
+    if nullable is None:
+        nullable = nullable_symbols(grammar)
+    graph = {}
+    for nt, prods in grammar.items():
+        corners = []
+        seen = set()
+        for prod in prods:
+            for symbol in prod:
+                if symbol not in grammar:
+                    break
+                if symbol not in seen:
+                    seen.add(symbol)
+                    corners.append(symbol)
+                if symbol not in nullable:
+                    break
+        graph[nt] = corners
+    return graph
+
+
+def strongly_connected_components(graph):
+    '''
+    Tarjan's algorithm, iterative so deep grammars do not hit the recursion limit
+    :return: list of components (lists of nodes), callees before callers
+    '''
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    counter = 0
+
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = low[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph.get(successor, ()))))
+                    advanced = True
+                    break
+                if successor in on_stack:
+                    low[node] = min(low[node], index[successor])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+def detect_left_recursion(grammar):
+    '''
+    Find direct and indirect left recursion through the left-corner graph
+    :return: dict nonterminal -> sorted members of its left-recursive group
+             (just itself for immediate left recursion)
+    '''
+    graph = left_corner_graph(grammar)
+    left_recursive = {}
+    for component in strongly_connected_components(graph):
+        if len(component) > 1 or component[0] in graph[component[0]]:
+            members = sorted(component)
+            for nt in component:
+                left_recursive[nt] = members
+    return left_recursive
+
+
+def fresh_name(taken, nt):
+    new_nt = nt + "'"
+    while new_nt in taken:
+        new_nt += "'"
+    return new_nt
+
+
+def split_immediate_left_recursion(nt, prods, taken):
+    '''
+    Rewrite A -> A α | β as A -> β A', A' -> α A' | ε
+    :param taken: names already in use, for choosing A'
+    :return: (new productions of A, A', productions of A'), or None without immediate left recursion
+    '''
+    alpha = [p[1:] for p in prods if p[:1] == (nt,)]
+    if not alpha:
+        return None
+    beta = [p for p in prods if p[:1] != (nt,)]
+    new_nt = fresh_name(taken, nt)
+    return ([b + (new_nt,) for b in beta] if beta else [(new_nt,)],
+            new_nt, [a + (new_nt,) for a in alpha if a] + [()])
+
+
+def remove_immediate_left_recursion(grammar):
+    '''
+    Remove the immediate left recursion of every nonterminal
+    :return: new grammar dict (the input is not modified)
+    '''
+    updated_grammar = {}
+    for nt, prods in grammar.items():
+        split = split_immediate_left_recursion(nt, prods, grammar.keys() | updated_grammar.keys())
+        if split is None:
+            updated_grammar[nt] = prods
+        else:
+            updated_grammar[nt], new_nt, updated_grammar[new_nt] = split
+    return updated_grammar
+
+
+def remove_left_recursion(grammar):
+    '''
+    Remove direct and indirect left recursion by ordered substitution: with the
+    nonterminals ordered A1..An, every Ai -> Aj γ (j < i) is expanded with the
+    productions of Aj, then the immediate left recursion of Ai is removed.
+    Substitution is limited to nonterminals of the same left-recursive group,
+    the only ones that can close a cycle, so the rest of the grammar is left
+    as written.
+
+    The algorithm assumes no cycles (A =>+ A) and no left recursion hidden
+    behind nullable prefixes; such groups are reported and left alone.
+    :return: (new grammar dict, list of nonterminal groups that could not be handled)
+    '''
+    nullable = nullable_symbols(grammar)
+    graph = left_corner_graph(grammar, nullable)
+    updated_grammar = {nt: list(prods) for nt, prods in grammar.items()}
+    skipped = []
+
+    for component in strongly_connected_components(graph):
+        group = set(component)
+        if len(component) == 1 and component[0] not in graph[component[0]]:
+            continue
+        hidden = any(prod and prod[0] in nullable and any(symbol in group for symbol in prod[1:])
+                     for nt in component for prod in grammar[nt])
+        unit_cycle = any(prod == (other,) for nt in component for prod in grammar[nt] for other in component)
+        if hidden or unit_cycle:
+            skipped.append(sorted(component))
+            continue
+
+        order = {nt: i for i, nt in enumerate(nt for nt in grammar if nt in group)}  # grammar order
+        for nt, position in order.items():
+            # Expand leading earlier members; their productions already start with a
+            # terminal, a later member or a fresh A', so each expansion moves forward
+            prods = []
+            pending = list(reversed(updated_grammar[nt]))
+            while pending:
+                prod = pending.pop()
+                if prod and order.get(prod[0], position) < position:
+                    pending.extend(delta + prod[1:] for delta in reversed(updated_grammar[prod[0]]))
+                else:
+                    prods.append(prod)
+            split = split_immediate_left_recursion(nt, prods, updated_grammar)
+            if split is None:
+                updated_grammar[nt] = prods
+            else:
+                updated_grammar[nt], new_nt, updated_grammar[new_nt] = split
+
+    return updated_grammar, skipped
+
+
+def display_grammar(grammar):
+    for nt, prods in grammar.items():
+        print(f"{nt} -> {' | '.join(' '.join(p) or EPSILON for p in prods)}")
+
+
+def read_lines():
+    print("Enter grammar productions (one per line). Type 'done' to finish.")
+    print("Example: E -> E+T | T\n")
+
+    lines = []
+    while True:
+        line = input(">> ").strip()
+        if line.lower() == "done":
+            break
+        if line:
+            lines.append(line)
+    return lines
+
+
+def grammar_verifier_interface(grammar_file_path=None):
+    if grammar_file_path:
+        with open(grammar_file_path, 'r', encoding='utf-8') as file:
+            lines = [line for line in file if line.strip()]
+    else:
+        lines = read_lines()
+
+    result = parse_grammar(lines)
+    if not result:
+        return
+
+    grammar, defined_non_terminals = result
+
+    undefined_nts = find_undefined_non_terminals(grammar, defined_non_terminals)
+    if undefined_nts:
+        print(f"\n❌ Error: Undefined non-terminals used: {', '.join(sorted(undefined_nts))}")
+        return
+
+    print("\n✅ Grammar successfully parsed.")
+    print("Original Grammar:")
+    display_grammar(grammar)
+
+    nullable = nullable_symbols(grammar)
+    if nullable:
+        print(f"\nNullable non-terminals: {', '.join(sorted(nullable))}")
+
+    left_recursions = detect_left_recursion(grammar)
+    if left_recursions:
+        print("\n⚠️  Left Recursion detected in:")
+        for nt, group in left_recursions.items():
+            kind = 'immediate' if group == [nt] else 'indirect, through ' + ', '.join(g for g in group if g != nt)
+            print(f"  {nt}: {kind}")
+
+        if grammar_file_path:
+            choice = 'y'
+        else:
+            choice = input("\nDo you want to remove left recursion? (y/n): ").strip().lower()
+        if choice == 'y':
+            grammar, skipped = remove_left_recursion(grammar)
+            for group in skipped:
+                print(f"\n⚠️  Not removed (cycle or nullable prefix): {', '.join(group)}")
+            print("\n✅ Updated Grammar (Left Recursion Removed):")
+            display_grammar(grammar)
+    else:
+        print("\n✅ No left recursion found.")
+
+
+if __name__ == "__main__":
+    grammar_verifier_interface(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,3 @@
+'''
+Shared building blocks for the LR(0), SLR(1), CLR(1) and LALR(1) parsers
+'''
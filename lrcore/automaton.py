@@ -0,0 +1,263 @@
+'''
+The LR(0) item collection, built once and shared by the LR(0), SLR(1) and
+LALR(1) engines.
+
+    automaton = LR0Automaton(ReadGrammar('expr.txt'))
+    lr0 = LR0Parser(grammar, automaton=automaton)
+    slr = SLR1Parser(grammar, automaton=automaton)
+    lalr = LALR1Parser(grammar, automaton=automaton)
+
+Items are (lhs, rhs) with the DOT marker inside rhs, states are sorted frozensets
+of items and transitions are keyed by (state, symbol), the layout the LR(0)
+and SLR(1) engines have always used. LR(0) reduces on every terminal and
+SLR(1) on FOLLOW sets, so both only read the collection. LALR(1) lookaheads
+are computed on it by propagation (lalr_lookaheads) instead of building the
+canonical LR(1) collection and merging states with equal cores: the states,
+their numbering and the transitions are those of the LR(0) automaton, and
+each item gets the union of the lookaheads its LR(1) copies would have had.
+
+Closure and GOTO look every item up in the grammar's compiled item table
+(lrcore.ir.CompiledGrammar.items) and follow nonterminal IDs through
+by_lhs, so no item tuple is sliced or scanned for its dot while building.
+Construction computes the GOTO kernels of a state in one pass over its
+items and closes a kernel only the first time it is seen. Every edge is
+recorded once in goto_memo, keyed by (state number, symbol ID); the tables,
+the lookahead pass, DFA export and later queries (successor) read it instead
+of recomputing GOTO or mapping item sets back to numbers.
+'''
+import copy
+from collections import deque
+
+from lrcore.grammar import DOT
+from lrcore.ir import CompiledGrammar
+from lrcore.parallel import build_states
+from lrcore.tables import END_MARKER
+
+
+class LR0Automaton:
+    def __init__(self, grammar, ir=None, workers=None, stats=None):
+        '''
+        :param grammar: ReadGrammar
+        :param ir: CompiledGrammar of the same grammar, compiled here if None
+        :param workers: processes for the construction (None or 1 = sequential)
+        :param stats: BuildStats to count into, or None; the building engine times the phase
+        '''
+        self.grammar = grammar
+        self.ir = CompiledGrammar(grammar) if ir is None else ir
+        self.workers = workers
+        self.stats = stats
+        self.compute_closure_goto()
+
+    def shares(self, grammar):
+        '''
+        Whether this automaton was built for grammar
+        '''
+        return self.grammar is grammar or self.grammar == grammar
+
+    def rebind(self, grammar, ir):
+        '''
+        A copy holding this collection but bound to an edited grammar, for lrcore.incremental to rebuild
+        '''
+        automaton = copy.copy(self)
+        automaton.grammar = grammar
+        automaton.ir = ir
+        return automaton
+
+    def closure(self, items):
+        '''
+        Compute the closure of a set of items
+        :param items: current set of items
+        :return:
+        '''
+        stats = self.stats
+        if stats is not None:
+            stats.closure_calls += 1
+
+        ir = self.ir
+        item_table, start_items = ir.items()
+        terminal_count = ir.terminal_count
+        closure_items = set(items)
+
+        # Walk the nonterminals reachable after a dot by ID; each one adds all its items with the dot first
+        work = [item_table[item][0] for item in items]
+        expanded = set()
+        while work:
+            symbol = work.pop()
+            if symbol is None or symbol < terminal_count or symbol in expanded:
+                continue
+            expanded.add(symbol)
+            if stats is not None:
+                stats.closure_iterations += 1
+            closure_items.update(start_items[symbol - terminal_count])
+            work.extend(production.rhs[0] for production in ir.productions_of(symbol) if production.rhs)
+
+        return frozenset(sorted(closure_items))
+
+    def goto(self, items, symbol):
+        '''
+        Compute GOTO function
+        :param items: current set of items
+        :param symbol: input symbol
+        :return:
+        '''
+        if self.stats is not None:
+            self.stats.goto_calls += 1
+
+        item_table = self.ir.items()[0]
+        symbol_id = self.ir.ids.get(symbol)
+        goto_items = set()
+
+        for item in items:
+            next_symbol, advanced, _, _ = item_table[item]
+            if next_symbol is not None and next_symbol == symbol_id:
+                goto_items.add(advanced)
+
+        return self.closure(goto_items)
+
+    def initial_item(self):
+        start_symbol = next(iter(self.grammar))
+        return start_symbol, (DOT,) + self.grammar[start_symbol][0]
+
+    def kernels(self, items):
+        '''
+        GOTO kernels of a state on every symbol after a dot, in one pass over its items
+        :return: dict symbol -> set of items with the dot moved past it
+        '''
+        if self.stats is not None:
+            self.stats.goto_calls += 1
+
+        item_table = self.ir.items()[0]
+        names = self.ir.names
+        kernels = {}
+
+        for item in items:
+            symbol, advanced, _, _ = item_table[item]
+
+            if symbol is not None:
+                kernels.setdefault(names[symbol], set()).add(advanced)
+
+        return kernels
+
+    def compute_closure_goto(self):
+        '''
+        Compute all closure and GOTO sets of the LR(0) item collection, and the GOTO memo
+        :return:
+        '''
+        self.states = []
+        self.transitions = {}
+        self.goto_memo = {}  # (state number, symbol ID) -> state number
+        symbol_ids = self.ir.ids
+
+        initial_state = self.closure({self.initial_item()})
+
+        if self.workers and self.workers > 1:
+            # Expand whole BFS frontiers in a process pool; numbering matches the loop below
+            self.states, edges = build_states(initial_state, self.kernels, self.closure, self.workers,
+                                              self.stats)
+            for from_index, symbol, to_index in edges:
+                self.transitions[(self.states[from_index], symbol)] = self.states[to_index]
+                self.goto_memo[(from_index, symbol_ids[symbol])] = to_index
+            return
+
+        self.states.append(initial_state)
+        # A state is the closure of its kernel and goto kernels never equal the initial one,
+        # so a kernel seen before is a known state and is not closed again
+        kernel_ids = {}
+
+        # The state list doubles as the FIFO queue: states are expanded in discovery order
+        state_id = 0
+        while state_id < len(self.states):
+            current_state = self.states[state_id]
+            kernels = self.kernels(current_state)
+
+            for symbol in sorted(kernels):
+                kernel = frozenset(kernels[symbol])
+                target_id = kernel_ids.get(kernel)
+
+                if target_id is None:
+                    target_id = kernel_ids[kernel] = len(self.states)
+                    self.states.append(self.closure(kernel))
+                elif self.stats is not None:
+                    self.stats.dedup_hits += 1
+
+                self.goto_memo[(state_id, symbol_ids[symbol])] = target_id
+                self.transitions[(current_state, symbol)] = self.states[target_id]
+            state_id += 1
+
+    def successor(self, state_id, symbol):
+        '''
+        GOTO of a state number on a symbol name, read from the memo
+        :return: the target state number, or None
+        '''
+        return self.goto_memo.get((state_id, self.ir.ids.get(symbol)))
+
+    def successor_lists(self):
+        '''
+        :return: list, per state number, of (symbol, target state number) as build_table takes them
+        '''
+        names = self.ir.names
+        successors = [[] for _ in self.states]
+        for (state_id, symbol_id), target_id in self.goto_memo.items():
+            successors[state_id].append((names[symbol_id], target_id))
+        return successors
+
+    def numbered_transitions(self):
+        '''
+        :return: dict (state number, symbol) -> state number
+        '''
+        names = self.ir.names
+        return {(state_id, names[symbol_id]): target_id
+                for (state_id, symbol_id), target_id in self.goto_memo.items()}
+
+
+def lalr_lookaheads(automaton):
+    '''
+    LALR(1) lookaheads of every item of the LR(0) automaton, by propagation
+
+    The start item gets the end marker. An item A -> α.Bβ with lookahead set L
+    gives each B -> .γ of its state FIRST(β), and all of L when β is nullable;
+    each item passes its lookaheads along to the item with the dot moved past
+    the next symbol, in the GOTO successor on that symbol. The least fixpoint
+    is reached with a worklist of items whose sets grew. FIRST(β) and the
+    moved item come from the grammar's compiled item table.
+    :param automaton: LR0Automaton
+    :return: list per state of dict item -> set of lookahead terminals
+    '''
+    states = automaton.states
+    goto_memo = automaton.goto_memo
+    item_table, start_items = automaton.ir.items()
+    terminal_count = automaton.ir.terminal_count
+    lookaheads = [{item: set() for item in state} for state in states]
+
+    # Per state and item: where its lookaheads flow (state number, item), and what it gives spontaneously
+    channels = [{} for _ in states]
+    for i, state in enumerate(states):
+        for item in state:
+            symbol, advanced, first, nullable = item_table[item]
+            if symbol is None:
+                continue
+            targets = channels[i].setdefault(item, [])
+            targets.append((goto_memo[(i, symbol)], advanced))
+            if symbol >= terminal_count:
+                for closed in start_items[symbol - terminal_count]:
+                    lookaheads[i][closed] |= first
+                    if nullable:
+                        targets.append((i, closed))
+
+    lookaheads[0][automaton.initial_item()].add(END_MARKER)
+    work = deque((i, item) for i, state in enumerate(lookaheads) for item, terminals in state.items() if terminals)
+    queued = set(work)
+    while work:
+        node = work.popleft()
+        queued.discard(node)
+        i, item = node
+        terminals = lookaheads[i][item]
+        for target in channels[i].get(item, ()):
+            j, target_item = target
+            entry = lookaheads[j][target_item]
+            if not terminals <= entry:
+                entry |= terminals
+                if target not in queued:
+                    queued.add(target)
+                    work.append(target)
+    return lookaheads
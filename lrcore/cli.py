@@ -0,0 +1,267 @@
+'''
+Non-interactive command line for the four parsers.
+
+    python -m lrcore build GRAMMAR [-a lalr] [--workers N] [--stats FILE] [--memory]
+    python -m lrcore parse GRAMMAR [INPUT ...] [-f FILE] [--trace | --tree] [--no-bypass]
+    python -m lrcore parse GRAMMAR [INPUT ...] --recover [--repair] [--max-errors N]
+    python -m lrcore table GRAMMAR [--states] [--conflicts]
+    python -m lrcore table GRAMMAR --format csv|jsonl|html|text [-o FILE] [--rows 0-99] [--symbols + E] [--states]
+    python -m lrcore codegen GRAMMAR -o parser.py [--name parse]
+    python -m lrcore compare GRAMMAR [--algorithms lr0 slr clr lalr] [--count 200] [--length 16] [--json FILE]
+    python -m lrcore serve GRAMMAR [GRAMMAR ...] [-a lalr ...] [--port 7878 | --unix PATH] [--workers N]
+    python -m lrcore draw GRAMMAR [-o dfa_diagram] [--render | --view]
+    python -m lrcore draw GRAMMAR -o FILE --format dot|json|svg|pdf [--states 0-99] [--around N] [--kernel]
+
+parse reads the inputs given on the command line, or one input per line from
+FILE or stdin; whitespace inside an input is ignored. Inputs go through
+lrcore.driver with unit reductions bypassed (--tree still shows them), or
+through the engine's own trace with --trace, or with --recover through
+error recovery, which lists every error of an input in one pass. The exit
+status is 1 if any input is rejected. table with --format, --output, --rows
+or --symbols streams the table, or with --states the item sets, row by row
+through lrcore.tableexport. Only the selected engine is imported, and
+tkinter/graphviz are never imported unless a command needs them.
+'''
+import argparse
+import sys
+
+ALGORITHMS = ('lr0', 'slr', 'clr', 'lalr')
+
+
+def load_parser(args, **options):
+    '''
+    Read the grammar and build the parser selected by --algorithm
+    '''
+    from lrcore.engines import load_engine
+    parser_class, reader_class = load_engine(args.algorithm)
+    if getattr(args, 'workers', None):
+        options['workers'] = args.workers
+    return parser_class(reader_class(args.grammar), **options)
+
+
+def inputs_from(args):
+    '''
+    Inputs to parse: positional arguments, else lines of --file, else lines of stdin
+    '''
+    if args.inputs:
+        lines = args.inputs
+    elif args.file and args.file != '-':
+        with open(args.file, 'r', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+    else:
+        lines = sys.stdin.read().splitlines()
+    for line in lines:
+        text = ''.join(line.split())
+        if text:
+            yield text
+
+
+def command_build(args):
+    from lrcore.engines import parser_states
+    parser = load_parser(args, stats=bool(args.stats), memory=args.memory)
+    if parser.grammar.reduction:
+        print(f"grammar: {parser.grammar.reduction.summary()}")
+    resolved = len(parser.table.resolved)
+    print(f"{args.algorithm}: {len(parser_states(parser))} states, {len(parser.conflicts)} conflicts"
+          + (f", {resolved} resolved by precedence" if resolved else ''))
+    if args.stats:
+        parser.stats.dump_json(sys.stdout if args.stats == '-' else args.stats)
+        if args.stats == '-':
+            print()
+    if args.memory:
+        parser.memory.stop()
+        parser.memory.print_report(parser)
+    return 1 if args.fail_on_conflicts and parser.conflicts else 0
+
+
+def command_parse(args):
+    from lrcore.driver import TableDriver
+    parser = load_parser(args)
+    driver = TableDriver(parser.table, parser.ir, bypass_units=not args.no_bypass)
+    rejected = 0
+    for text in inputs_from(args):
+        tree = None
+        errors = ()
+        if args.trace:
+            accepted = parser.parse_string(text)
+        elif args.recover:
+            errors = driver.parse_all(text, repair=args.repair, max_errors=args.max_errors)
+            accepted = not errors
+        else:
+            accepted, tree = driver.parse(text, tree=args.tree)
+        rejected += not accepted
+        if not args.quiet:
+            print(f"{'accept' if accepted else 'reject'}\t{text}")
+            if tree is not None:
+                print(tree.pretty('  '))
+            for error in errors:
+                print(f"  {error}")
+    return 1 if rejected else 0
+
+
+def state_range(text):
+    '''
+    FIRST[-LAST] as a range of state numbers
+    '''
+    first, _, last = text.partition('-')
+    return range(int(first), int(last or first) + 1)
+
+
+def command_table(args):
+    parser = load_parser(args)
+    if args.format or args.output or args.rows or args.symbols:
+        from lrcore.tableexport import export_table
+        states = state_range(args.rows) if args.rows else None
+        count = export_table(parser, args.output, args.format or 'text', states, args.symbols, args.page_size,
+                             listing=args.states, kernel_only=args.kernel)
+        if args.output:
+            print(f"{count} {'states' if args.states else 'rows'} written to {args.output}")
+        if args.conflicts:
+            parser.table.print_conflicts()
+        return 0
+    if args.states:
+        parser.print_states()
+    parser.print_table()
+    if args.conflicts:
+        parser.table.print_conflicts()
+    return 0
+
+
+def command_codegen(args):
+    from lrcore.codegen import DirectParser
+    parser = load_parser(args)
+    direct = DirectParser(parser.table, parser.ir, args.name)
+    direct.save(args.output)
+    print(f"{args.output}: direct-coded {args.algorithm} parser, function {args.name}(tokens)")
+    return 0
+
+
+def command_compare(args):
+    import json
+    from lrcore.compare import compare, print_matrix
+    records, disagreements = compare(args.grammar, args.algorithms, args.count, args.length, args.invalid, args.seed)
+    print_matrix(records, disagreements)
+    if args.json:
+        report = {'grammar': args.grammar, 'results': records,
+                  'disagreements': [{'input': text, 'accepted': verdicts} for text, verdicts in disagreements]}
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    return 1 if disagreements else 0
+
+
+def command_serve(args):
+    import asyncio
+    from lrcore.server import ParseServer
+    server = ParseServer(args.grammars, args.algorithm or ['lalr'], args.workers, args.pool_threshold)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"serving {', '.join(sorted(server.grammar_ids()))} on {where}", flush=True)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def command_draw(args):
+    parser = load_parser(args)
+    if args.format is None:
+        parser.draw_dfa(args.output, view=args.view, render=args.render)
+        return 0
+    from lrcore.export import export
+    states = state_range(args.states) if args.states else None
+    count = export(parser, args.output, args.format, states, args.around, args.radius, args.kernel)
+    print(f"{count} states written to {args.output}")
+    return 0
+
+
+def build_argument_parser():
+    parser = argparse.ArgumentParser(prog='python -m lrcore', description='LR(0)/SLR(1)/CLR(1)/LALR(1) parsers')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_command(name, function, help_text):
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument('grammar', help='grammar file')
+        command.add_argument('-a', '--algorithm', choices=ALGORITHMS, default='lalr')
+        command.set_defaults(function=function)
+        return command
+
+    build = add_command('build', command_build, 'build the automaton and table, print a summary')
+    build.add_argument('--workers', type=int, help='processes for automaton construction')
+    build.add_argument('--stats', metavar='FILE', help="write phase timings and counters as JSON ('-' for stdout)")
+    build.add_argument('--memory', action='store_true', help='profile memory per construction phase')
+    build.add_argument('--fail-on-conflicts', action='store_true', help='exit with status 1 if the table has conflicts')
+
+    parse = add_command('parse', command_parse, 'parse inputs, one per argument or line')
+    parse.add_argument('inputs', nargs='*', help='strings to parse (default: read lines)')
+    parse.add_argument('-f', '--file', help="read inputs from FILE ('-' for stdin)")
+    parse.add_argument('--trace', action='store_true', help="print the engine's step-by-step trace")
+    parse.add_argument('--tree', action='store_true', help='print the parse tree of accepted inputs')
+    parse.add_argument('--no-bypass', action='store_true', help='perform unit reductions one by one')
+    parse.add_argument('--recover', action='store_true', help='recover from errors and report all of them')
+    parse.add_argument('--repair', action='store_true', help='with --recover, try single-token repairs first')
+    parse.add_argument('--max-errors', type=int, metavar='N', help='with --recover, stop after N errors')
+    parse.add_argument('-q', '--quiet', action='store_true', help='only report through the exit status')
+
+    table = add_command('table', command_table, 'print the parsing table')
+    table.add_argument('--states', action='store_true', help='print the item sets first')
+    table.add_argument('--conflicts', action='store_true', help='list the conflicts and those resolved by precedence')
+    table.add_argument('--format', choices=('text', 'csv', 'jsonl', 'html'),
+                       help='stream the table (with --states: the item sets instead) in this format')
+    table.add_argument('-o', '--output', help='write to FILE instead of stdout')
+    table.add_argument('--rows', metavar='FIRST[-LAST]', help='export only this range of states')
+    table.add_argument('--symbols', nargs='+', metavar='SYMBOL', help='export only these columns')
+    table.add_argument('--kernel', action='store_true', help='with --states, show kernel items only')
+    table.add_argument('--page-size', type=int, default=500, help='rows per HTML page (default 500)')
+
+    codegen = add_command('codegen', command_codegen, 'write a direct-coded Python parser module')
+    codegen.add_argument('-o', '--output', required=True, help='module file to write')
+    codegen.add_argument('--name', default='parse', help='name of the parse function (default parse)')
+
+    draw = add_command('draw', command_draw, 'export the automaton as DOT, or render it to PDF with graphviz')
+    draw.add_argument('-o', '--output', default='dfa_diagram', help='output file (without .pdf when rendering)')
+    draw.add_argument('--render', action='store_true', help='also render OUTPUT.pdf with graphviz')
+    draw.add_argument('--view', action='store_true', help='render OUTPUT.pdf and open it')
+    draw.add_argument('--format', choices=('dot', 'json', 'svg', 'pdf'),
+                      help='stream the automaton to OUTPUT in this format, with the filters below')
+    draw.add_argument('--states', metavar='FIRST[-LAST]', help='export only this range of states')
+    draw.add_argument('--around', type=int, metavar='STATE', help='export only the neighbourhood of STATE')
+    draw.add_argument('--radius', type=int, default=1, help='neighbourhood size in edges (default 1)')
+    draw.add_argument('--kernel', action='store_true', help='show kernel items only')
+
+    compare = subparsers.add_parser('compare', help='build all algorithms on one grammar and compare them')
+    compare.add_argument('grammar', help='grammar file')
+    compare.add_argument('--algorithms', nargs='+', choices=ALGORITHMS, default=list(ALGORITHMS))
+    compare.add_argument('--count', type=int, default=200, help='sample inputs to parse (default 200)')
+    compare.add_argument('--length', type=int, default=16, help='target input length (default 16)')
+    compare.add_argument('--invalid', type=float, default=0.3, help='fraction of mutated inputs (default 0.3)')
+    compare.add_argument('--seed', type=int, default=0)
+    compare.add_argument('--json', metavar='FILE', help='also write the matrix as JSON')
+    compare.set_defaults(function=command_compare)
+
+    serve = subparsers.add_parser('serve', help='answer parse requests over a local socket')
+    serve.add_argument('grammars', nargs='+', help='grammar files; each is known by its file name without extension')
+    serve.add_argument('-a', '--algorithm', choices=ALGORITHMS, action='append',
+                       help='algorithm to build, repeatable; the first is the default (lalr)')
+    serve.add_argument('--host', default='127.0.0.1', help='TCP address to listen on (default 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=7878, help='TCP port (default 7878)')
+    serve.add_argument('--unix', metavar='PATH', help='listen on this Unix socket instead of TCP')
+    serve.add_argument('--workers', type=int, help='processes for long inputs (0: none, default: one per CPU)')
+    serve.add_argument('--pool-threshold', type=int, default=4096, metavar='TOKENS',
+                       help='inputs of at least this many tokens go to the process pool (default 4096)')
+    serve.set_defaults(function=command_serve)
+    return parser
+
+
+def main(argv=None):
+    argument_parser = build_argument_parser()
+    args, extra = argument_parser.parse_known_args(argv)
+    # argparse stops filling a nargs='*' positional at the first option; inputs after it come back here
+    if extra and (args.command != 'parse' or any(value.startswith('-') for value in extra)):
+        argument_parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if extra:
+        args.inputs = args.inputs + extra
+    try:
+        return args.function(args)
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 2
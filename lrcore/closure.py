@@ -0,0 +1,85 @@
+'''
+Memoised closures of LR item kernels.
+
+A state of an LR automaton is the closure of its kernel, so a kernel that is
+reached again from another predecessor does not need a second closure: the
+cache maps each kernel (the frozenset of items GOTO produced) to the closed
+item set computed the first time, and hands back that same object. Equal
+kernels then also give identical states, so the breadth-first build finds
+an already known state with one dict lookup on a hash frozenset has cached.
+
+    cache = ClosureCache(parser.closure, max_size=4096)
+    state = cache.get(kernel)
+    cache.counters()   # {'hits': ..., 'misses': ..., 'evictions': ..., 'entries': ...}
+
+The cache holds at most max_size kernels, DEFAULT_MAX_SIZE unless given,
+and evicts the least recently used first; a kernel seen again after its
+eviction is simply closed again, giving an equal state. max_size=None keeps
+every kernel of the build. Hits, misses and evictions are also counted
+into a BuildStats when one is given, so they add up across incremental
+rebuilds and worker processes like the other counters (lrcore.stats).
+'''
+from collections import OrderedDict
+
+# Kernels kept by default; LR(1) closures of large grammars run to thousands of items each
+DEFAULT_MAX_SIZE = 4096
+
+
+class ClosureCache:
+    def __init__(self, closure, max_size=DEFAULT_MAX_SIZE, stats=None):
+        '''
+        :param closure: function from a kernel to its closed item set
+        :param max_size: kernels to keep, None for no limit
+        :param stats: BuildStats to count hits, misses and evictions into, or None
+        '''
+        self.closure = closure
+        self.max_size = max_size
+        self.stats = stats
+        self.entries = {} if max_size is None else OrderedDict()  # kernel -> closed item set
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, kernel):
+        '''
+        :param kernel: frozenset of items
+        :return: the closure of kernel
+        '''
+        entries = self.entries
+        state = entries.get(kernel)
+        stats = self.stats
+        if state is not None:
+            self.hits += 1
+            if stats is not None:
+                stats.closure_cache_hits += 1
+            if self.max_size is not None:
+                entries.move_to_end(kernel)
+            return state
+        self.misses += 1
+        if stats is not None:
+            stats.closure_cache_misses += 1
+        state = entries[kernel] = self.closure(kernel)
+        if self.max_size is not None and len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+            if stats is not None:
+                stats.closure_cache_evictions += 1
+        return state
+
+    def clear(self):
+        '''
+        Forget every closure, e.g. after the grammar changed; the counters are kept
+        '''
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def counters(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'max_size': self.max_size,
+        }
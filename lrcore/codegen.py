@@ -0,0 +1,205 @@
+'''
+Direct-coded LR parsers: Python source generated from a built parse table.
+
+Every state becomes a function whose shift and reduce decisions are
+hard-coded as comparisons on the lookahead's terminal ID (ir.ids; the
+input is mapped through TOKEN_IDS once per token), so a step costs one call
+and a few integer comparisons instead of a (state, token) dict lookup, a
+tuple unpack and a dispatch on the action kind. GOTO stays a dict per
+nonterminal, indexed by the state uncovered by the reduction. A reduction
+whose lookahead starts a chain of unit reductions (see
+lrcore.driver.unit_chains) uses a GOTO dict that already leads to the end
+of the chain, as the bypass driver does, so those steps are never run. A
+state function returns
+
+    1       the token was shifted, read the next one
+    0       a reduction was made, call the new top state with the same token
+    2       accept
+    None    error (the function falls off its end)
+
+A state whose only action is one reduction of a non-empty production
+reduces without looking at the token (a default reduction, as in yacc):
+the error is then found in the state reached, before the next shift, so
+the language is unchanged. States with a cell %nonassoc made an error
+(table.errors) never reduce by default: that error has to be raised where
+the table raises it, because reducing first could lead to a state that
+shifts the token. The handlers are indexed by state number in a
+list and driven by a short loop; the generated module has no imports and
+can be written to disk and imported without lrcore.
+
+    direct = DirectParser(parser.table, parser.ir)
+    direct.parse('a+a*a')       # -> True
+    direct.save('expr_parser.py')
+'''
+from lrcore.driver import ACCEPTED, REDUCE, SHIFT, TableDriver, unit_chains
+from lrcore.tables import END_MARKER
+
+LOOP = '''
+
+HANDLERS = [{handlers}]
+
+
+def {name}(tokens):
+    {docstring!r}
+    states = [0]
+    handlers = HANDLERS
+    ids = TOKEN_IDS
+    try:
+        for token in tokens:
+            token = ids[token]
+            while True:
+                code = handlers[states[-1]](states, token)
+                if code:
+                    break
+                if code is None:
+                    return False
+        while True:
+            code = handlers[states[-1]](states, {end!r})
+            if code != 0:
+                return code == 2
+    except KeyError:  # a token that is no terminal, or no GOTO entry
+        return False
+'''
+
+
+def _branch(terminals, ids):
+    '''
+    The if line testing the token ID against terminals, their names in a comment
+    '''
+    terminals = sorted(terminals, key=ids.get)
+    if len(terminals) == 1:
+        condition = f"token == {ids[terminals[0]]}"
+    else:
+        condition = f"token in {{{', '.join(str(ids[t]) for t in terminals)}}}"
+    return f"if {condition}:  # {' '.join(terminals)}"
+
+
+def generate_source(table, ir, name='parse'):
+    '''
+    Python source of a direct-coded parser for a ParseTable
+    :param table: ParseTable of any engine (conflicts resolved as in lrcore.driver)
+    :param ir: the engine's CompiledGrammar
+    :param name: name of the parse function, taking a token sequence and returning accepted
+    :return: module source
+    '''
+    driver = TableDriver(table, ir)
+    reductions = driver.reductions
+    chains = unit_chains(table, ir)
+    ids = ir.ids
+    per_state = {}
+    for (state, terminal), action in driver.actions.items():
+        per_state.setdefault(state, []).append((terminal, action))
+    state_count = 1 + max([0] + list(per_state) + [target for target in table.goto.values()])
+    error_states = {state for state, _ in table.errors}
+
+    lines = [f"# Generated by lrcore.codegen from {len(ir.productions)} productions, {state_count} states",
+             '# Do not edit: regenerate from the grammar instead', '']
+    terminal_ids = ', '.join(f"{terminal!r}: {ids[terminal]}" for terminal in ir.terminal_names())
+    lines.append(f"TOKEN_IDS = {{{terminal_ids}}}")
+    gotos = {}
+    for (state, non_terminal), target in table.goto.items():
+        gotos.setdefault(non_terminal, {})[state] = target
+    goto_names = {}  # (nonterminal, entries) -> name of the GOTO dict holding them
+
+    def goto_name(non_terminal, entries):
+        key = (non_terminal, tuple(sorted(entries.items())))
+        if key not in goto_names:
+            goto_names[key] = f"GOTO_{len(goto_names)}"
+            body = ', '.join(f"{state}: {target}" for state, target in key[1])
+            lines.append(f"{goto_names[key]} = {{{body}}}  # {non_terminal}")
+        return goto_names[key]
+
+    plain = {non_terminal: goto_name(non_terminal, gotos[non_terminal]) for non_terminal in sorted(gotos, key=ids.get)}
+
+    def chained(non_terminal, terminal):
+        '''
+        GOTO of non_terminal followed through the unit reductions the table makes on terminal
+        '''
+        entries = {state: chains.get((state, non_terminal, terminal), (target,))[0]
+                   for state, target in gotos.get(non_terminal, {}).items()}
+        return plain.get(non_terminal, '{}') if entries == gotos.get(non_terminal, {}) \
+            else goto_name(non_terminal, entries)
+
+    def reduce_lines(production, goto, indent):
+        lhs, length = reductions[production]
+        body = [f"{indent}# {lhs} -> {' '.join(ir.production_names(production)[1]) or 'ε'}"]
+        if length:
+            body.append(f"{indent}del states[-{length}:]")
+        body.append(f"{indent}states.append({goto}[states[-1]])")
+        body.append(f"{indent}return 0")
+        return body
+
+    def reduce_groups(production, terminals):
+        '''
+        The lookaheads of a reduction grouped by the GOTO dict reached after the unit reductions
+        '''
+        groups = {}
+        for terminal in terminals:
+            groups.setdefault(chained(reductions[production][0], terminal), []).append(terminal)
+        return groups
+
+    bodies = []
+    for state in range(state_count):
+        actions = per_state.get(state, [])
+        body = ['', '', f"def state_{state}(states, token):"]
+        bodies.append(body)
+        shifts = {}
+        reduces = {}
+        accept = []
+        for terminal, (kind, value) in actions:
+            if kind == SHIFT:
+                shifts.setdefault(value, []).append(terminal)
+            elif kind == REDUCE:
+                reduces.setdefault(value, []).append(terminal)
+            elif kind == ACCEPTED:
+                accept.append(terminal)
+        if not actions:
+            body.append('    return None')
+            continue
+        if not shifts and not accept and len(reduces) == 1 and state not in error_states:
+            production, terminals = next(iter(reduces.items()))
+            if reductions[production][1]:
+                # Default reduction; only lookaheads that end unit chains elsewhere are tested
+                default = plain.get(reductions[production][0], '{}')
+                for goto, group in sorted(reduce_groups(production, terminals).items()):
+                    if goto != default:
+                        body.append(f"    {_branch(group, ids)}")
+                        body += reduce_lines(production, goto, '        ')
+                body += reduce_lines(production, default, '    ')
+                continue
+        for target, terminals in sorted(shifts.items()):
+            body += [f"    {_branch(terminals, ids)}", f"        states.append({target})", '        return 1']
+        for production, terminals in sorted(reduces.items()):
+            for goto, group in sorted(reduce_groups(production, terminals).items()):
+                body.append(f"    {_branch(group, ids)}")
+                body += reduce_lines(production, goto, '        ')
+        if accept:
+            body += [f"    {_branch(accept, ids)}", '        return 2']
+
+    for body in bodies:
+        lines += body
+    lines.append(LOOP.format(handlers=', '.join(f"state_{state}" for state in range(state_count)), name=name,
+                             end=ids[END_MARKER], docstring='Parse a token sequence, return whether it is accepted'))
+    return '\n'.join(lines)
+
+
+class DirectParser:
+    def __init__(self, table, ir, name='parse'):
+        '''
+        Generate and compile a direct-coded parser
+        :param table: ParseTable of any engine
+        :param ir: the engine's CompiledGrammar
+        :param name: name of the parse function in the generated module
+        '''
+        self.name = name
+        self.source = generate_source(table, ir, name)
+        self.namespace = {}
+        exec(compile(self.source, f"<lrcore.codegen {name}>", 'exec'), self.namespace)
+        self.parse = self.namespace[name]
+
+    def save(self, path):
+        '''
+        Write the generated module to path
+        '''
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.source)
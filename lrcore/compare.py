@@ -0,0 +1,157 @@
+'''
+Side-by-side comparison of the four algorithms on one grammar.
+
+    python -m lrcore compare GRAMMAR [--algorithms lr0 slr clr lalr] [--count 200] [--length 16]
+
+The grammar file is read once and every engine is built from the same
+ReadGrammar. The LR(0) automaton is built once (lrcore.automaton) and LR(0),
+SLR(1) and LALR(1) all take their tables from it, so their build times are
+FIRST/FOLLOW, lookaheads and table only; the automaton time is printed
+separately. CLR(1) builds its own canonical LR(1) collection. A corpus is generated once
+(lrcore.generate, valid sentences plus a share of mutated ones) and parsed
+by each table through lrcore.driver. The matrix shows states, conflicts,
+cells settled by %left/%right/%nonassoc, filled/total table cells, build
+time and parse throughput.
+
+Conflict-free tables of any of the algorithms recognise exactly the
+language of the grammar, so every conflict-free engine has to agree on
+every input; inputs on which they do not are reported. The weakest
+conflict-free algorithm is the one the grammar needs. A table whose
+conflicts precedence settled is not conflict-free in that sense: the
+declarations choose what it accepts, so it is left out of both the verdict
+and the cross-check, and the weakest such table is named separately.
+'''
+import contextlib
+import os
+import time
+
+from lrcore.automaton import LR0Automaton
+from lrcore.driver import TableDriver
+from lrcore.engines import ENGINES, load_engine, parser_states, table_cells
+from lrcore.generate import SentenceGenerator
+from lrcore.grammar import ReadGrammar
+
+# Weakest first
+STRENGTH = ('lr0', 'slr', 'lalr', 'clr')
+# Algorithms whose tables come from the LR(0) automaton
+SHARED = ('lr0', 'slr', 'lalr')
+
+
+def build_engines(grammar, algorithms, quiet=True):
+    '''
+    Build the engines on one grammar, with one LR(0) automaton for LR(0), SLR(1) and LALR(1)
+    :return: (dict algorithm -> (parser, build seconds), automaton build seconds or None)
+    '''
+    built = {}
+    automaton = automaton_seconds = None
+    with open(os.devnull, 'w') as devnull, \
+            (contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext()):
+        if any(algorithm in SHARED for algorithm in algorithms):
+            start = time.perf_counter()
+            automaton = LR0Automaton(grammar)
+            automaton_seconds = time.perf_counter() - start
+        for algorithm in algorithms:
+            parser_class, _ = load_engine(algorithm)
+            options = {'automaton': automaton} if algorithm in SHARED else {}
+            start = time.perf_counter()
+            parser = parser_class(grammar, **options)
+            built[algorithm] = (parser, time.perf_counter() - start)
+    return built, automaton_seconds
+
+
+def throughput(driver, inputs, repeat=3):
+    '''
+    Parse the inputs repeat times, keeping the fastest pass
+    :return: (accept results per input, tokens per second)
+    '''
+    parse = driver.parse
+    tokens = sum(len(text) for text in inputs)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [parse(text)[0] for text in inputs]
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return results, tokens / best if best else 0.0
+
+
+def compare(grammar_path, algorithms=tuple(ENGINES), count=200, length=16, invalid=0.3, seed=0):
+    '''
+    Build, measure and cross-check the algorithms on one grammar
+    :return: (records in algorithm order, disagreements as (input, {algorithm: accepted}))
+    '''
+    grammar = ReadGrammar(grammar_path)
+    generator = SentenceGenerator(grammar, seed=seed)
+    inputs = [''.join(tokens) for tokens, _ in generator.corpus(count, length, 200, invalid)]
+
+    records = []
+    accepted = {}
+    built, automaton_seconds = build_engines(grammar, algorithms)
+    for algorithm, (parser, seconds) in built.items():
+        filled, total = table_cells(parser)
+        results, tokens_per_second = throughput(TableDriver(parser.table, parser.ir, bypass_units=True), inputs)
+        records.append({
+            'algorithm': algorithm,
+            'states': len(parser_states(parser)),
+            'conflicts': len(parser.table.conflicts),
+            'resolved': len(parser.table.resolved),
+            'filled_cells': filled,
+            'table_cells': total,
+            'build_seconds': seconds,
+            'shared_automaton': algorithm in SHARED,
+            'automaton_seconds': automaton_seconds if algorithm in SHARED else None,
+            'tokens_per_second': tokens_per_second,
+            'accepted': sum(results),
+            'inputs': len(inputs),
+        })
+        if not parser.table.conflicts and not parser.table.resolved:
+            accepted[algorithm] = results
+
+    disagreements = []
+    if len(accepted) > 1:
+        for position, text in enumerate(inputs):
+            verdicts = {algorithm: results[position] for algorithm, results in accepted.items()}
+            if len(set(verdicts.values())) > 1:
+                disagreements.append((text, verdicts))
+    return records, disagreements
+
+
+def weakest_conflict_free(records):
+    '''
+    The weakest algorithm whose table has no conflicts, not even ones precedence settled, or None
+    '''
+    free = {record['algorithm'] for record in records if not record['conflicts'] and not record['resolved']}
+    return next((algorithm for algorithm in STRENGTH if algorithm in free), None)
+
+
+def weakest_resolved(records):
+    '''
+    The weakest algorithm whose table has no conflicts left once precedence settled some, or None
+    '''
+    free = {record['algorithm'] for record in records if not record['conflicts'] and record['resolved']}
+    return next((algorithm for algorithm in STRENGTH if algorithm in free), None)
+
+
+def print_matrix(records, disagreements):
+    print(f"{'algorithm':<10}{'states':>8}{'conflicts':>11}{'resolved':>10}{'cells':>16}{'build ms':>11}"
+          f"{'tok/s':>12}{'accepted':>12}")
+    for record in records:
+        cells = f"{record['filled_cells']}/{record['table_cells']}"
+        build = f"{record['build_seconds'] * 1000:.1f}" + ('*' if record['shared_automaton'] else '')
+        accepted = f"{record['accepted']}/{record['inputs']}"
+        print(f"{record['algorithm']:<10}{record['states']:>8}{record['conflicts']:>11}{record['resolved']:>10}"
+              f"{cells:>16}{build:>11}{record['tokens_per_second']:>12.0f}{accepted:>12}")
+    shared = [record for record in records if record['shared_automaton']]
+    if shared:
+        print(f"* plus the LR(0) automaton, built once in {shared[0]['automaton_seconds'] * 1000:.1f} ms "
+              f"for {', '.join(record['algorithm'] for record in shared)}")
+    weakest = weakest_conflict_free(records)
+    resolved = weakest_resolved(records)
+    none = 'none (every table has conflicts' + (' or cells settled by precedence)' if resolved else ')')
+    print(f"weakest conflict-free algorithm: {weakest or none}")
+    if resolved is not None and (weakest is None or STRENGTH.index(resolved) < STRENGTH.index(weakest)):
+        print(f"weakest with its conflicts settled by precedence: {resolved} "
+              "(left out of the cross-check: the declarations decide what it accepts)")
+    for text, verdicts in disagreements:
+        print(f"DISAGREEMENT on {text!r}: " + ', '.join(f"{algorithm} {'accepts' if verdict else 'rejects'}"
+                                                       for algorithm, verdict in verdicts.items()))
@@ -0,0 +1,512 @@
+'''
+Table-driven LR parse driver shared by the four parsers, with optional
+unit-reduction bypass.
+
+Stratified expression grammars (E -> T, T -> F, ...) make a plain driver
+run a reduce+goto step per level for every operand. The state reached by
+goto(p, X) reduces by a unit production Y -> X on lookahead t only to move
+to goto(p, Y), so the whole chain is fixed by (p, X, t). unit_chains()
+precomputes that final state for every GOTO entry and terminal, and a
+driver created with bypass_units=True jumps straight to it after each
+non-unit reduction. Unit reductions are only skipped, never invented, so the
+language and the point where errors are detected are unchanged, and the
+skipped productions are kept to rebuild the full derivation when a tree is
+requested. A chain never passes a cell whose action precedence chose
+(table.resolved, see lrcore.tables): it stops in that state and the plain
+loop carries out whatever the declarations decided there.
+
+TableDriver.steps() is the same loop as a generator for debuggers and
+visualisers. It yields one plain tuple per step, without formatting:
+
+    (step number, action code, state on top of the stack, input position, argument)
+
+where the argument is the target state of a SHIFT, the production index of a
+REDUCE and None for ACCEPTED and ERROR. A REDUCE whose GOTO entry is missing
+is followed by an ERROR record. print_trace() is one consumer: the text trace
+the engines' parse_string prints. parse() stays a separate tight loop, so the
+plain accept/reject path pays nothing for the records.
+
+A table with conflicts, or built from a cyclic grammar (A -> A), can reduce
+forever without shifting. Every loop here counts the reductions since the
+last shift and treats reaching reduce_limit (states x productions, more
+than any reduction sequence of a terminating parse can use) as an error on
+the current token, so no input makes a caller spin.
+'''
+from lrcore.tables import ACCEPT, END_MARKER
+
+# Action codes of step records
+SHIFT, REDUCE, ACCEPTED, ERROR = 0, 1, 2, 3
+
+
+class Node:
+    __slots__ = ('symbol', 'children', 'production')
+
+    def __init__(self, symbol, children=(), production=None):
+        self.symbol = symbol          # grammar symbol name
+        self.children = children      # child nodes, () for a terminal
+        self.production = production  # production index for a nonterminal, None for a terminal
+
+    def derivation(self):
+        '''
+        Production indices of the leftmost derivation of this subtree
+        '''
+        productions = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.production is not None:
+                productions.append(node.production)
+                stack.extend(reversed(node.children))
+        return productions
+
+    def pretty(self, indent=''):
+        lines = []
+        stack = [(self, indent)]
+        while stack:
+            node, prefix = stack.pop()
+            lines.append(prefix + node.symbol)
+            stack.extend((child, prefix + '  ') for child in reversed(node.children))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        if not self.children:
+            return self.symbol
+        return f"{self.symbol}({' '.join(map(repr, self.children))})"
+
+
+def unit_productions(ir):
+    '''
+    Indices of the unit productions A -> B (B a nonterminal), leaving out production 0
+    '''
+    return {production.index for production in ir.productions[1:]
+            if len(production.rhs) == 1 and not ir.is_terminal(production.rhs[0])}
+
+
+def unit_chains(table, ir):
+    '''
+    Follow chains of unit reductions through the table
+    :return: dict (state, nonterminal, terminal) -> (final state, nonterminal on top,
+             tuple of bypassed production indices, innermost first)
+    '''
+    units = unit_productions(ir)
+    limit = len(ir.names) - ir.terminal_count  # a longer chain would be a unit cycle
+    # Cells settled by %left/%right/%nonassoc are left to the plain driver
+    resolved = {(state, terminal) for state, terminal, *_ in table.resolved}
+    chains = {}
+    for (state, non_terminal), target in table.goto.items():
+        for terminal in table.terminals:
+            symbol, current, chain = non_terminal, target, []
+            action = table.action.get((current, terminal), '')
+            while action.startswith('r') and int(action[1:]) in units and (current, terminal) not in resolved:
+                production = int(action[1:])
+                symbol = ir.names[ir.productions[production].lhs]
+                current = table.goto.get((state, symbol))
+                if current is None or len(chain) == limit:
+                    # Leave it to the plain driver, which fails (or loops) the same way
+                    chain = []
+                    break
+                chain.append(production)
+                action = table.action.get((current, terminal), '')
+            if chain:
+                chains[(state, non_terminal, terminal)] = (current, symbol, tuple(chain))
+    return chains
+
+
+class _TrialStack:
+    '''
+    A state stack as a prefix of a real stack plus states pushed since, for trial parses
+    '''
+    __slots__ = ('base', 'depth', 'pushed')
+
+    def __init__(self, base):
+        self.base = base
+        self.depth = len(base)
+        self.pushed = []
+
+    def top(self):
+        return self.pushed[-1] if self.pushed else self.base[self.depth - 1]
+
+    def pop(self, count):
+        from_pushed = min(count, len(self.pushed))
+        if from_pushed:
+            del self.pushed[-from_pushed:]
+        self.depth -= count - from_pushed
+
+
+class TableDriver:
+    def __init__(self, table, ir, bypass_units=False, stats=None):
+        '''
+        :param table: ParseTable of any engine
+        :param ir: the engine's CompiledGrammar
+        :param bypass_units: skip unit reductions using precomputed chains
+        :param stats: BuildStats receiving shift/reduce counts, or None
+        '''
+        self.table = table
+        self.ir = ir
+        self.stats = stats
+        self.actions = {}
+        for key, action in table.action.items():
+            if action == ACCEPT:
+                self.actions[key] = (ACCEPTED, 0)
+            elif action.startswith('S'):
+                self.actions[key] = (SHIFT, int(action[1:]))
+            else:
+                self.actions[key] = (REDUCE, int(action[1:]))
+        self.reductions = [(ir.names[production.lhs], len(production.rhs)) for production in ir.productions]
+        self.chains = unit_chains(table, ir) if bypass_units else {}
+        # Reductions in a row after which the table is taken to cycle without progress
+        self.reduce_limit = max(1, table.state_count * len(ir.productions))
+        self._expected = None  # per state terminals with an action, built on the first error
+
+    def parse(self, tokens, tree=False):
+        '''
+        Parse a token sequence (a string is read one character per token)
+        :param tree: build and return the parse tree
+        :return: (accepted, tree root or None)
+        '''
+        actions = self.actions
+        goto = self.table.goto
+        chains = self.chains
+        reductions = self.reductions
+        states = [0]
+        values = [] if tree else None
+        shifts = reduces = bypassed = 0
+        tokens = list(tokens) + [END_MARKER]
+        position = 0
+        result = False, None
+        limit = self.reduce_limit
+        in_a_row = 0  # reductions since the last shift
+
+        while True:
+            terminal = tokens[position]
+            entry = actions.get((states[-1], terminal))
+            if entry is None:
+                break
+            kind, value = entry
+            if kind == SHIFT:
+                states.append(value)
+                if tree:
+                    values.append(Node(terminal))
+                position += 1
+                shifts += 1
+                in_a_row = 0
+            elif kind == REDUCE:
+                in_a_row += 1
+                if in_a_row > limit:
+                    break
+                lhs, length = reductions[value]
+                if length:
+                    del states[-length:]
+                if tree:
+                    children = values[-length:] if length else []
+                    if length:
+                        del values[-length:]
+                    node = Node(lhs, children, value)
+                chain = chains.get((states[-1], lhs, terminal)) if chains else None
+                if chain is None:
+                    target = goto.get((states[-1], lhs))
+                    if target is None:
+                        break
+                else:
+                    target, lhs, bypassed_productions = chain
+                    bypassed += len(bypassed_productions)
+                    if tree:
+                        for production in bypassed_productions:
+                            node = Node(reductions[production][0], [node], production)
+                states.append(target)
+                if tree:
+                    values.append(node)
+                reduces += 1
+            else:
+                result = True, (values[-1] if tree else None)
+                break
+
+        if self.stats is not None:
+            self.stats.shifts += shifts
+            self.stats.reduces += reduces
+            self.stats.bypassed_reduces += bypassed
+        return result
+
+    def expected(self, state):
+        '''
+        Terminals with an action in a state, sorted
+        '''
+        if self._expected is None:
+            self._expected = [[] for _ in range(self.table.state_count)]
+            for state_id, terminal in self.actions:
+                self._expected[state_id].append(terminal)
+            for terminals in self._expected:
+                terminals.sort()
+        return self._expected[state]
+
+    def _advance(self, trial, terminal):
+        '''
+        Apply the reductions and the shift (or accept) for one terminal to a trial stack
+        :return: False if the terminal is an error in this configuration
+        '''
+        actions = self.actions
+        goto = self.table.goto
+        reductions = self.reductions
+        for _ in range(self.reduce_limit + 1):
+            entry = actions.get((trial.top(), terminal))
+            if entry is None:
+                return False
+            kind, value = entry
+            if kind != REDUCE:
+                if kind == SHIFT:
+                    trial.pushed.append(value)
+                return True
+            lhs, length = reductions[value]
+            trial.pop(length)
+            target = goto.get((trial.top(), lhs))
+            if target is None:
+                return False
+            trial.pushed.append(target)
+        return False
+
+    def _try_repair(self, states, tokens, position, window):
+        '''
+        Find a single-token repair after which the next window tokens parse without error.
+        Deletion is tried first, then insertion and replacement by each expected terminal,
+        so the cost is bounded by the number of terminals times the window. Trials run on
+        overlays of the stack, so nothing is copied.
+        :return: (repair, position to resume at), with states updated in place, or None
+        '''
+        expected = [t for t in self.expected(states[-1]) if t != END_MARKER]
+        candidates = []
+        if tokens[position] != END_MARKER:
+            candidates.append((('delete', None), None, position + 1))
+        candidates += [(('insert', t), t, position) for t in expected]
+        if tokens[position] != END_MARKER:
+            candidates += [(('replace', t), t, position + 1) for t in expected]
+        for repair, inserted, resume in candidates:
+            trial = _TrialStack(states)
+            if inserted is not None and not self._advance(trial, inserted):
+                continue
+            depth, pushed = trial.depth, list(trial.pushed)
+            if all(self._advance(trial, t) for t in tokens[resume:resume + window]):
+                del states[depth:]
+                states.extend(pushed)
+                return repair, resume
+        return None
+
+    def _acting_depth(self, states, terminal):
+        '''
+        :return: length of the stack prefix whose top state has an action on terminal, 0 if none
+        '''
+        actions = self.actions
+        depth = len(states)
+        while depth and (states[depth - 1], terminal) not in actions:
+            depth -= 1
+        return depth
+
+    def parse_all(self, tokens, sync=None, repair=False, window=3, max_errors=None):
+        '''
+        Parse with error recovery and collect every error in one pass.
+
+        On an error the expected terminals are recorded. With repair=True a single-token
+        deletion, insertion or replacement is tried first (see _try_repair). Otherwise,
+        or if no repair works, the input is skipped up to the next sync terminal and the
+        stack popped to a state that can continue on it (panic mode). If no state on the
+        stack can, that sync terminal is reported as an error too and consumed; parsing
+        resumes on the token after it if a stack state acts on that token, and otherwise
+        skips on to the next sync terminal. Recovery only ever pops the real stack, so a
+        token is never accepted by a state the input did not lead to, and errors further
+        on are still found. Every token is skipped at most once and
+        every state popped at most once, so the whole pass is linear in the input plus a
+        bounded cost per error.
+        :param sync: terminals to resynchronise on, default the grammar's %sync declaration
+        :param repair: try single-token repairs first
+        :param window: tokens a repair must let parse to be accepted
+        :param max_errors: stop after this many errors
+        :return: list of ParseError, empty if the input is accepted as is
+        '''
+        if sync is None:
+            sync = [self.ir.names[symbol] for symbol in self.ir.sync]
+        sync = set(sync) | {END_MARKER}
+        actions = self.actions
+        goto = self.table.goto
+        reductions = self.reductions
+        tokens = list(tokens) + [END_MARKER]
+        states = [0]
+        position = 0
+        errors = []
+        last_error = None
+        limit = self.reduce_limit
+        in_a_row = 0  # reductions since the last shift
+
+        while True:
+            terminal = tokens[position]
+            entry = actions.get((states[-1], terminal))
+            if entry is not None and entry[0] == REDUCE:
+                in_a_row += 1
+                if in_a_row > limit:
+                    entry = None  # a reduce cycle: an error on this token
+            if entry is not None:
+                kind, value = entry
+                if kind == SHIFT:
+                    states.append(value)
+                    position += 1
+                    in_a_row = 0
+                    continue
+                if kind == ACCEPTED:
+                    return errors
+                lhs, length = reductions[value]
+                if length:
+                    del states[-length:]
+                target = goto.get((states[-1], lhs))
+                if target is not None:
+                    states.append(target)
+                    continue
+
+            if last_error == position:
+                # A repair or resynchronisation led straight back here: drop the token
+                if terminal == END_MARKER:
+                    return errors
+                last_error = None
+                position += 1
+                in_a_row = 0
+                continue
+            error = ParseError(position, terminal, list(self.expected(states[-1])))
+            errors.append(error)
+            last_error = position
+            in_a_row = 0
+            if max_errors is not None and len(errors) >= max_errors:
+                return errors
+
+            if repair:
+                repaired = self._try_repair(states, tokens, position, window)
+                if repaired is not None:
+                    error.repair, position = repaired
+                    continue
+
+            # Panic mode: skip to a sync terminal some state on the stack can act on
+            while True:
+                while tokens[position] not in sync:
+                    position += 1
+                terminal = tokens[position]
+                depth = self._acting_depth(states, terminal)
+                if depth:
+                    del states[depth:]
+                    break
+                if terminal == END_MARKER:
+                    return errors
+                # No state on the stack takes the sync terminal, so it is an error as well: count
+                # it, consume it, and resume on the next token only if a stack state acts on that
+                if errors[-1].position != position:
+                    errors.append(ParseError(position, terminal, list(self.expected(states[-1]))))
+                    if max_errors is not None and len(errors) >= max_errors:
+                        return errors
+                position += 1
+                depth = self._acting_depth(states, tokens[position])
+                if depth:
+                    del states[depth:]
+                    break
+            last_error = position  # an error right at the sync terminal drops it silently
+
+    def steps(self, tokens):
+        '''
+        Parse a token sequence one step at a time, without unit bypass
+        :return: generator of (step, action code, state, input position, argument)
+        '''
+        actions = self.actions
+        goto = self.table.goto
+        reductions = self.reductions
+        stats = self.stats
+        states = [0]
+        tokens = list(tokens) + [END_MARKER]
+        position = 0
+        step = 1
+        in_a_row = 0  # reductions since the last shift
+
+        while True:
+            state = states[-1]
+            entry = actions.get((state, tokens[position]))
+            if entry is not None and entry[0] == REDUCE:
+                in_a_row += 1
+                if in_a_row > self.reduce_limit:
+                    entry = None
+            if entry is None:
+                yield step, ERROR, state, position, None
+                return
+            kind, value = entry
+            yield step, kind, state, position, value
+            if kind == SHIFT:
+                states.append(value)
+                position += 1
+                in_a_row = 0
+                if stats is not None:
+                    stats.shifts += 1
+            elif kind == REDUCE:
+                lhs, length = reductions[value]
+                if length:
+                    del states[-length:]
+                target = goto.get((states[-1], lhs))
+                if target is None:
+                    yield step + 1, ERROR, states[-1], position, None
+                    return
+                states.append(target)
+                if stats is not None:
+                    stats.reduces += 1
+            else:
+                return
+            step += 1
+
+
+class ParseError:
+    __slots__ = ('position', 'token', 'expected', 'repair')
+
+    def __init__(self, position, token, expected, repair=None):
+        self.position = position  # index of the offending token
+        self.token = token        # the offending token ('#' at the end of the input)
+        self.expected = expected  # sorted terminals with an action in the state where parsing stopped
+        self.repair = repair      # ('insert', t) | ('delete', None) | ('replace', t), or None after panic mode
+
+    def __str__(self):
+        text = f"position {self.position}: unexpected '{self.token}', expected {', '.join(self.expected) or 'nothing'}"
+        if self.repair is not None:
+            kind, terminal = self.repair
+            text += f" (repaired: {kind}" + (f" '{terminal}')" if terminal is not None else ")")
+        return text
+
+    def __repr__(self):
+        return f"ParseError({self.position}, {self.token!r}, {self.expected!r}, {self.repair!r})"
+
+
+def print_trace(driver, tokens):
+    '''
+    Print the step-by-step trace of a parse (state stack, symbol stack, remaining input, action)
+    :return: True if the input is accepted
+    '''
+    ir = driver.ir
+    tokens = list(tokens) + [END_MARKER]
+    states = [0]
+    symbols = [END_MARKER]
+
+    for step, action, state, position, argument in driver.steps(tokens[:-1]):
+        print(f"Step {step:<4} | State Stack: {str(states):<20} | Symbol Stack: {str(symbols):<30} | "
+              f"Input: {''.join(tokens[position:]):<15} | ", end="")
+        if action == SHIFT:
+            print(f"ACTION: {'S' + str(argument):<10} | SHIFT")
+            states.append(argument)
+            symbols.append(tokens[position])
+        elif action == REDUCE:
+            lhs, rhs = ir.production_names(argument)
+            print(f"ACTION: {'r' + str(argument):<10} | REDUCE by {lhs}->{''.join(rhs)}")
+            if rhs:
+                del states[-len(rhs):]
+                del symbols[-len(rhs):]
+            target = driver.table.goto.get((states[-1], lhs))
+            if target is None:
+                print(f"No GOTO for state {states[-1]} and symbol {lhs}")
+                return False
+            states.append(target)
+            symbols.append(lhs)
+        elif action == ACCEPTED:
+            print(f"ACTION: {ACCEPT:<10} | ACCEPT")
+            return True
+        elif not ir.is_terminal(ir.ids.get(tokens[position], len(ir.names))):
+            print(f"Error: Symbol '{tokens[position]}' not in grammar")
+        else:
+            print("ACTION: None       | No action defined for this state/symbol combination")
+    return False
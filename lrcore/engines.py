@@ -0,0 +1,60 @@
+'''
+Registry of the four parser engines.
+
+Each engine lives in its own script directory and is imported by plain
+module name, so the directory has to be on sys.path first. All engines read
+grammars with lrcore.grammar.ReadGrammar.
+'''
+import importlib
+import os
+import sys
+
+from lrcore.grammar import ReadGrammar
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (directory, module, parser class)
+ENGINES = {
+    'lr0': ('LR0', 'main', 'LR0Parser'),
+    'slr': ('SLR(1)', 'slr_parser', 'SLR1Parser'),
+    'clr': ('CLR(1)', 'clr_parser', 'CLR1Parser'),
+    'lalr': ('LALR(1)', 'lalr_parser', 'LALR1Parser'),
+}
+
+
+def load_engine(name):
+    '''
+    Import an engine by short name
+    :param name: one of ENGINES
+    :return: (parser class, grammar reader class)
+    '''
+    if name not in ENGINES:
+        raise ValueError(f"Unknown algorithm '{name}', expected one of: {', '.join(ENGINES)}")
+    directory, module_name, class_name = ENGINES[name]
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name), ReadGrammar
+
+
+def parser_states(parser):
+    '''
+    The final (table-producing) state list of any engine
+    '''
+    return parser.lalr_states if hasattr(parser, 'lalr_states') else parser.states
+
+
+def table_cells(parser):
+    '''
+    Count the ACTION/GOTO cells of a built table
+    :return: (filled cells, total cells)
+    '''
+    if hasattr(parser, 'states_table'):
+        rows = parser.states_table[1:]
+        filled = sum(1 for row in rows for cell in row[1:] if cell != '')
+        total = len(rows) * (len(parser.states_table[0]) - 1)
+    else:
+        filled = len(parser.action) + len(parser.goto_table)
+        total = len(parser.states) * (len(parser.terminals) + 1 + len(parser.non_terminals))
+    return filled, total
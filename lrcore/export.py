@@ -0,0 +1,189 @@
+'''
+Streaming export of LR automata to DOT, SVG and JSON.
+
+Nodes and edges are written one at a time to an open file (or piped into
+Graphviz's `dot` for SVG/PDF), so nothing proportional to the whole diagram
+is built in memory. State numbers come straight from the engine's state
+list and transition keys; an item set is only mapped to its number through
+a dict built once.
+
+Filters keep large automata readable: a set or range of states, the
+neighbourhood of a state within a number of edges, and kernel items only.
+With LR(1) items the lookaheads of items sharing a core are shown together
+(`A → α • β, a/b`).
+'''
+import json
+import subprocess
+
+from lrcore.engines import parser_states
+from lrcore.grammar import DOT
+
+FORMATS = ('dot', 'json', 'svg', 'pdf')
+
+
+def item_parts(item):
+    '''
+    Normalise an item of any engine
+    :return: (lhs, rhs tuple, dot position, lookahead or None)
+    '''
+    if len(item) == 4:  # LALR(1): (lhs, rhs, dot position, lookahead)
+        return item
+    lhs, rhs = item[0], item[1]  # LR(0)/SLR(1)/CLR(1): the rhs holds the DOT marker
+    dot = rhs.index(DOT)
+    return lhs, rhs[:dot] + rhs[dot + 1:], dot, item[2] if len(item) == 3 else None
+
+
+class Automaton:
+    def __init__(self, parser):
+        '''
+        Numbered view of an engine's final automaton
+        '''
+        self.states = parser_states(parser)
+        self.start_symbol = next(iter(parser.grammar))
+        if hasattr(parser, 'goto_memo'):
+            # LR(0)/SLR(1)/LALR(1): numbered successors straight from the shared automaton's GOTO memo
+            self.successors = parser.automaton.successor_lists()
+            return
+        transitions = parser.transitions
+        self.successors = [[] for _ in self.states]  # per state: (symbol, target)
+        state_ids = None
+        for (from_state, symbol), to_state in transitions.items():
+            if not isinstance(from_state, int):
+                if state_ids is None:
+                    state_ids = {state: i for i, state in enumerate(self.states)}
+                from_state, to_state = state_ids[from_state], state_ids[to_state]
+            self.successors[from_state].append((symbol, to_state))
+
+    def neighbourhood(self, state, radius):
+        '''
+        States within radius edges of state, following edges both ways
+        '''
+        neighbours = [set() for _ in self.states]
+        for from_state, successors in enumerate(self.successors):
+            for _, to_state in successors:
+                neighbours[from_state].add(to_state)
+                neighbours[to_state].add(from_state)
+        selected = {state}
+        frontier = [state]
+        for _ in range(radius):
+            frontier = [n for s in frontier for n in neighbours[s] if n not in selected]
+            selected.update(frontier)
+        return selected
+
+    def select(self, states=None, around=None, radius=1):
+        '''
+        :param states: iterable of state numbers to keep (a range works), or None for all
+        :param around: keep only the neighbourhood of this state
+        :param radius: size of that neighbourhood in edges
+        :return: sorted list of selected state numbers
+        '''
+        selected = set(range(len(self.states))) if states is None else set(states)
+        if around is not None:
+            selected &= self.neighbourhood(around, radius)
+        return sorted(s for s in selected if 0 <= s < len(self.states))
+
+    def items(self, state, kernel_only=False):
+        '''
+        Display lines of a state's items, lookaheads of a shared core merged
+        '''
+        cores = {}
+        for item in self.states[state]:
+            lhs, rhs, dot, lookahead = item_parts(item)
+            if kernel_only and dot == 0 and lhs != self.start_symbol:
+                continue
+            lookaheads = cores.setdefault((lhs, rhs, dot), [])
+            if lookahead is not None:
+                lookaheads.append(lookahead)
+        lines = []
+        for (lhs, rhs, dot), lookaheads in sorted(cores.items()):
+            body = ' '.join(rhs[:dot] + ('•',) + rhs[dot:])
+            lines.append(f"{lhs} → {body}" + (f", {'/'.join(sorted(lookaheads))}" if lookaheads else ''))
+        return lines
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def write_dot(automaton, file, selected, kernel_only=False):
+    file.write('digraph "Parser DFA" {\n')
+    file.write('\trankdir=LR\n\tnode [fontsize=10 shape=box]\n')
+    for state in selected:
+        label = '\\n'.join([f'I{state}'] + [_escape(line) for line in automaton.items(state, kernel_only)])
+        file.write(f'\t{state} [label="{label}"]\n')
+    keep = set(selected)
+    for state in selected:
+        for symbol, target in automaton.successors[state]:
+            if target in keep:
+                file.write(f'\t{state} -> {target} [label="{_escape(symbol)}"]\n')
+    file.write('}\n')
+
+
+def write_json(automaton, file, selected, kernel_only=False):
+    file.write('{"states": [')
+    for position, state in enumerate(selected):
+        record = {'id': state, 'items': automaton.items(state, kernel_only)}
+        file.write((',\n' if position else '\n') + json.dumps(record, ensure_ascii=False))
+    file.write('\n], "edges": [')
+    keep = set(selected)
+    first = True
+    for state in selected:
+        for symbol, target in automaton.successors[state]:
+            if target in keep:
+                file.write(('\n' if first else ',\n') + json.dumps([state, symbol, target], ensure_ascii=False))
+                first = False
+    file.write('\n]}\n')
+
+
+def export(parser, path, fmt='dot', states=None, around=None, radius=1, kernel_only=False):
+    '''
+    Write a parser's automaton to a file
+    :param fmt: 'dot' or 'json' (written directly), 'svg' or 'pdf' (DOT piped through Graphviz's dot)
+    :param states, around, radius: state filters, see Automaton.select
+    :param kernel_only: leave out closure items
+    :return: number of states written
+    '''
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of: {', '.join(FORMATS)}")
+    automaton = Automaton(parser)
+    selected = automaton.select(states, around, radius)
+
+    if fmt in ('dot', 'json'):
+        writer = write_dot if fmt == 'dot' else write_json
+        with open(path, 'w', encoding='utf-8') as file:
+            writer(automaton, file, selected, kernel_only)
+        return len(selected)
+
+    process = _graphviz(['-T' + fmt, '-o', path], stdin=subprocess.PIPE)
+    with process.stdin as pipe:
+        write_dot(automaton, pipe, selected, kernel_only)
+    _wait(process)
+    return len(selected)
+
+
+def _graphviz(arguments, **options):
+    try:
+        return subprocess.Popen(['dot'] + arguments, encoding='utf-8', **options)
+    except FileNotFoundError:
+        raise OSError("Graphviz 'dot' is needed for SVG/PDF output; export to .dot or .json instead")
+
+
+def _wait(process):
+    if process.wait() != 0:
+        raise OSError(f"Graphviz 'dot' failed with status {process.returncode}")
+
+
+def render_dfa(parser, output_file='dfa_diagram', view=True, render=False):
+    '''
+    The engines' draw_dfa: DOT source in output_file, rendered to output_file.pdf with
+    Graphviz only when render or view is set, and opened in a viewer when view is
+    '''
+    export(parser, output_file, 'dot')
+    if not (render or view):
+        print(f"DFA written as DOT to {output_file}")
+        return
+    _wait(_graphviz(['-Tpdf', output_file, '-o', output_file + '.pdf']))
+    if view:
+        from graphviz import view as open_viewer
+        open_viewer(output_file + '.pdf')
+    print(f"DFA diagram saved as {output_file}.pdf")
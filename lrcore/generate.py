@@ -0,0 +1,147 @@
+'''
+Random sentence generation from a grammar.
+
+Sentences are derived leftmost from the start symbol. While the sentence is
+below its size target and the derivation below its depth limit, productions
+are picked at random among the ones that keep growing (those with a
+nonterminal on the right); past either limit every nonterminal is finished
+with its shortest production, so generation always terminates.
+'''
+import random
+
+
+class SentenceGenerator:
+    def __init__(self, grammar, seed=None):
+        '''
+        :param grammar: dict nonterminal -> list of right-hand side tuples, start symbol first;
+            an empty production is an empty tuple, as lrcore.grammar reads ε
+        :param seed: random seed, for reproducible corpora
+        '''
+        self.grammar = grammar
+        self.start_symbol = next(iter(grammar))
+        self.random = random.Random(seed)
+        self.terminals = sorted({symbol for productions in grammar.values() for production in productions
+                                 for symbol in production if symbol not in grammar})
+        self.compute_shortest()
+
+    def compute_shortest(self):
+        '''
+        Compute the shortest terminal yield of every nonterminal and the production achieving it
+        '''
+        self.min_length = {}
+        self.shortest = {}
+        changed = True
+        while changed:
+            changed = False
+            for non_terminal, productions in self.grammar.items():
+                for production in productions:
+                    length = self.yield_length(production)
+                    # Only strict improvements, so the chosen productions never form a cycle
+                    if length is not None and length < self.min_length.get(non_terminal, float('inf')):
+                        self.min_length[non_terminal] = length
+                        self.shortest[non_terminal] = production
+                        changed = True
+
+        if self.start_symbol not in self.min_length:
+            raise ValueError(f"Start symbol '{self.start_symbol}' does not derive any terminal string")
+        # Productions through unproductive nonterminals can never finish
+        self.choices = {}
+        self.finishers = {}
+        for non_terminal, productions in self.grammar.items():
+            productive = [p for p in productions if self.yield_length(p) is not None]
+            growing = [p for p in productive if any(symbol in self.grammar for symbol in p)]
+            self.choices[non_terminal] = growing or productive
+            if non_terminal in self.shortest:
+                # Equally short all-terminal alternatives add variety without risking a cycle
+                shortest = self.shortest[non_terminal]
+                self.finishers[non_terminal] = [shortest] + [
+                    p for p in productive if p != shortest and p not in growing
+                    and self.yield_length(p) == self.min_length[non_terminal]]
+
+    def yield_length(self, production):
+        '''
+        Shortest terminal yield of a right-hand side, None if not known to be productive
+        '''
+        length = 0
+        for symbol in production:
+            if symbol in self.grammar:
+                if symbol not in self.min_length:
+                    return None
+                length += self.min_length[symbol]
+            else:
+                length += 1
+        return length
+
+    def sentence(self, target_length=10, max_depth=50):
+        '''
+        Derive one random sentence
+        :param target_length: number of tokens to aim for
+        :param max_depth: derivation depth after which only shortest productions are used
+        :return: tuple of terminals
+        '''
+        tokens = []
+        stack = [(self.start_symbol, 0)]
+        pending = self.min_length[self.start_symbol]  # shortest yield of what is still on the stack
+
+        while stack:
+            symbol, depth = stack.pop()
+            if symbol not in self.grammar:
+                tokens.append(symbol)
+                pending -= 1
+                continue
+
+            pending -= self.min_length[symbol]
+            if depth >= max_depth or len(tokens) + pending >= target_length:
+                production = self.random.choice(self.finishers[symbol])
+            else:
+                production = self.random.choice(self.choices[symbol])
+
+            for rhs_symbol in reversed(production):
+                stack.append((rhs_symbol, depth + 1))
+                if rhs_symbol in self.grammar:
+                    pending += self.min_length[rhs_symbol]
+                else:
+                    pending += 1
+
+        return tuple(tokens)
+
+    def mutate(self, tokens, edits=1):
+        '''
+        Apply random token edits (delete, insert, substitute, swap) to a sentence.
+        The result is usually, but not necessarily, outside the language.
+        :param tokens: sentence to mutate
+        :param edits: number of edits
+        :return: tuple of terminals
+        '''
+        tokens = list(tokens)
+        for _ in range(edits):
+            kind = self.random.choice(('delete', 'insert', 'substitute', 'swap') if tokens else ('insert',))
+            position = self.random.randrange(len(tokens) + (kind == 'insert')) if tokens else 0
+            if kind == 'delete':
+                del tokens[position]
+            elif kind == 'insert':
+                tokens.insert(position, self.random.choice(self.terminals))
+            elif kind == 'substitute':
+                tokens[position] = self.random.choice(self.terminals)
+            elif len(tokens) > 1:
+                other = position + 1 if position + 1 < len(tokens) else position - 1
+                tokens[position], tokens[other] = tokens[other], tokens[position]
+        return tuple(tokens)
+
+    def corpus(self, count, target_length=10, max_depth=50, invalid_ratio=0.0):
+        '''
+        Generate a list of sentences, a fraction of them mutated
+        :param count: number of sentences
+        :param target_length: size target per sentence
+        :param max_depth: derivation depth limit
+        :param invalid_ratio: fraction of sentences to mutate
+        :return: list of (tokens, mutated)
+        '''
+        sentences = []
+        for _ in range(count):
+            tokens = self.sentence(target_length, max_depth)
+            if self.random.random() < invalid_ratio:
+                sentences.append((self.mutate(tokens), True))
+            else:
+                sentences.append((tokens, False))
+        return sentences
@@ -0,0 +1,144 @@
+'''
+Grammar file loader shared by the four parsers.
+
+A grammar file holds one rule per line, `A -> alpha | beta | ...`; lines
+that are not rules are ignored. A nonterminal name starts with an upper-case
+letter and may continue with letters, digits, underscores and trailing
+primes; every other non-blank character is a one-character terminal, the
+unit parse_string reads its input in. Symbols may be separated by spaces
+but need not be (`E -> aA` is `a A`). `ε` stands for the empty string.
+
+Lines starting with `%` are declarations:
+
+    %sync ; )       terminals error recovery resynchronises on (lrcore.driver)
+    %left + -       precedence and associativity of terminals, yacc style:
+    %right ^        each line binds tighter than the lines above it, and
+    %nonassoc < >   lrcore.tables resolves shift/reduce conflicts with them
+
+The file is streamed line by line and every alternative is tokenized with a
+single compiled regex. Productions are tuples of interned symbols, the empty
+production is (), duplicate productions are dropped, and the grammar is
+augmented with a start symbol that does not clash with any user symbol.
+Useless symbols are then removed, so the parsers only see the live grammar.
+'''
+import re
+import sys
+
+from lrcore.reduce import remove_useless_symbols
+
+EPSILON = 'ε'
+# Position marker inside the right-hand side of an LR item; no symbol is ever empty
+DOT = ''
+
+RULE = re.compile(r"\s*(\w+'*)\s*->(.*)")
+DIRECTIVE = re.compile(r"\s*%(\w+)(.*)")
+SYMBOL = re.compile(r"[A-Z][A-Za-z0-9_]*'*|\S")
+ASSOCIATIVITY = ('left', 'right', 'nonassoc')
+
+
+class ReadGrammar(dict):
+    def __init__(self, grammar_file_path, reduce=True):
+        '''
+        :param grammar_file_path: grammar file to read
+        :param reduce: drop unproductive and unreachable symbols (see lrcore.reduce);
+                       what was dropped is left in self.reduction
+        '''
+        super().__init__()
+        self.file_path = grammar_file_path
+        self.sync = []  # %sync terminals, in declaration order
+        self.precedence = {}  # terminal -> (level, 'left' | 'right' | 'nonassoc'), later lines higher
+        self.translate()
+        self.check_precedence()
+        self.start_symbol = self.add_augmented_production()
+        self.reduction = remove_useless_symbols(self) if reduce else None
+
+    def translate(self):
+        '''
+        Read the rules from the file into {lhs: [production tuples]}, in order of first appearance
+        '''
+        intern = sys.intern
+        tokenize = SYMBOL.findall
+        seen = set()
+        with open(self.file_path, 'r', encoding='utf-8') as file:
+            for line_number, line in enumerate(file, 1):
+                match = RULE.match(line)
+                if match is None:
+                    directive = DIRECTIVE.match(line)
+                    if directive is not None:
+                        self.declare(directive.group(1), tuple(map(intern, tokenize(directive.group(2)))),
+                                     line_number)
+                    continue
+                left = intern(match.group(1))
+                productions = self.setdefault(left, [])
+                for alternative in match.group(2).split('|'):
+                    symbols = tokenize(alternative)
+                    if not symbols:
+                        continue
+                    production = () if symbols == [EPSILON] else tuple(map(intern, symbols))
+                    if (left, production) not in seen:
+                        seen.add((left, production))
+                        productions.append(production)
+
+    def declare(self, directive, symbols, line_number):
+        '''
+        Record a % declaration
+        '''
+        if directive == 'sync':
+            self.sync.extend(symbol for symbol in symbols if symbol not in self.sync)
+        elif directive in ASSOCIATIVITY:
+            level = len({level for level, _ in self.precedence.values()}) + 1
+            for symbol in symbols:
+                if symbol in self.precedence:
+                    raise ValueError(f"{self.file_path}:{line_number}: precedence of '{symbol}' declared twice")
+                self.precedence[symbol] = (level, directive)
+        else:
+            raise ValueError(f"{self.file_path}:{line_number}: unknown declaration '%{directive}'")
+
+    def check_precedence(self):
+        '''
+        Precedence applies to terminals only
+        '''
+        declared = sorted(symbol for symbol in self.precedence if symbol in self)
+        if declared:
+            raise ValueError(f"{self.file_path}: precedence declared for nonterminal {', '.join(declared)}")
+
+    def add_augmented_production(self):
+        '''
+        Put the production S' -> S first, S being the original start symbol; the new
+        start symbol gets as many primes as it takes to be unused
+        :return: the new start symbol
+        '''
+        if not self:
+            raise ValueError(f"No grammar rules found in '{self.file_path}'")
+        original_start_symbol = next(iter(self))
+        symbols = set(self) | self.get_terminals()
+        new_start_symbol = original_start_symbol + "'"
+        while new_start_symbol in symbols:
+            new_start_symbol += "'"
+
+        productions = dict(self)
+        self.clear()
+        self[new_start_symbol] = [(original_start_symbol,)]
+        self.update(productions)
+        return new_start_symbol
+
+    def get_terminals(self):
+        '''
+        Get all terminal symbols in the grammar
+        '''
+        return {symbol for productions in self.values() for production in productions
+                for symbol in production if symbol not in self}
+
+    def get_non_terminals(self):
+        '''
+        Get all non-terminal symbols in the grammar
+        '''
+        return set(self.keys())
+
+
+if __name__ == '__main__':
+    grammar = ReadGrammar(sys.argv[1])
+    if grammar.reduction:
+        print(f"# {grammar.reduction.summary()}")
+    for lhs, productions in grammar.items():
+        print(f"{lhs} -> {' | '.join(' '.join(production) or EPSILON for production in productions)}")
@@ -0,0 +1,470 @@
+'''
+Incremental rebuild of a parser after a grammar edit.
+
+    parser.update_grammar(ReadGrammar('expr.txt'))              # any of the four engines
+    parser.update_grammar(ReadGrammar('expr.txt'), verify=True) # also compare with a full build
+
+The old and new grammars are diffed by left-hand side. Only the FIRST
+entries of nonterminals that can see a changed one through a nullable
+prefix are recomputed, and only the FOLLOW entries fed by an edited
+production, by a changed FIRST set or, transitively, by another such
+FOLLOW entry. Each is a fixpoint over that part of the grammar with every
+other entry held fixed, so the sets equal those of a full computation.
+
+The automaton is rebuilt by the engine's own breadth-first order, but a
+state is only expanded again if it is dirty: some item belongs to an edited
+nonterminal, or a symbol after its dot is edited (or, for LR(1) items, has a
+changed FIRST set). A clean state's closure, and so its GOTO successors,
+cannot have changed, and its old successors are reused by symbol. LR(0),
+SLR(1) and LALR(1) rebuild their shared LR(0) automaton (lrcore.automaton)
+this way, on a copy, and LALR(1) then propagates its lookaheads again.
+
+States are then renumbered so that a state whose kernel (its items with
+the dot moved past a symbol) existed before keeps its old number; new
+states take the numbers left free, in breadth-first order. An edit early in
+the grammar would otherwise shift the numbers of most states, and with them
+nearly every shift and goto cell. Finally the table rows whose transitions or
+reductions differ are rewritten in place (lrcore.tables.patch_table), every
+row with a reduction if the %left, %right or %nonassoc declarations changed.
+Reduce cells name productions by index, so a production added or removed
+also rewrites the rows that reduce by any production after it.
+The numbering is therefore the old one, not the one a full build of the
+edited grammar would give.
+
+With verify=True a parser is built from scratch as well, renumbered the
+same way, and every structure is compared; a difference raises
+AssertionError.
+'''
+from collections import deque
+
+from lrcore.export import item_parts
+from lrcore.grammar import DOT, EPSILON
+from lrcore.ir import CompiledGrammar
+from lrcore.tables import END_MARKER, grammar_precedence, patch_table
+
+
+class Engine:
+    '''
+    Where one engine keeps its sets and automaton
+    '''
+    def __init__(self, first=None, follow=None, epsilon='', with_terminals=False, end_in_terminals=False,
+                 automaton=False, numbered=True, initial_lookahead=None, lr1=False, finish=None, structures=()):
+        self.first = first                      # FIRST attribute, None if the engine has none
+        self.follow = follow                    # FOLLOW attribute
+        self.epsilon = epsilon                  # empty-string marker inside FIRST sets
+        self.with_terminals = with_terminals    # FIRST has {t: {t}} entries for terminals
+        self.end_in_terminals = end_in_terminals  # the terminals attribute includes the end marker
+        self.automaton = automaton              # states live in a shared lrcore.automaton.LR0Automaton
+        self.numbered = numbered                # transitions keyed by state number, not item set
+        self.initial_lookahead = initial_lookahead
+        self.lr1 = lr1                          # closures depend on FIRST sets
+        self.finish = finish                    # method deriving the final states from the automaton
+        self.structures = structures            # attributes verify compares
+
+
+ENGINES = {
+    'LR0Parser': Engine(automaton=True, numbered=False, structures=('states', 'transitions', 'goto_memo')),
+    'SLR1Parser': Engine(first='first', follow='follow', epsilon=EPSILON, automaton=True, numbered=False,
+                         structures=('first', 'follow', 'states', 'transitions', 'goto_memo')),
+    'CLR1Parser': Engine(first='first_sets', follow='follow_sets', with_terminals=True, initial_lookahead='#',
+                         lr1=True, structures=('first_sets', 'follow_sets', 'states', 'transitions')),
+    'LALR1Parser': Engine(end_in_terminals=True, automaton=True, numbered=False, finish='compute_lookaheads',
+                          structures=('states', 'transitions', 'goto_memo', 'lalr_states',
+                                      'lalr_transitions')),
+}
+
+
+class Rebuild:
+    def __init__(self):
+        self.changed = []            # nonterminals whose productions changed, were added or removed
+        self.first_recomputed = 0    # FIRST entries recomputed
+        self.follow_recomputed = 0   # FOLLOW entries recomputed
+        self.states = 0              # states of the new automaton
+        self.expanded = 0            # states whose successors were recomputed
+        self.rows = 0                # table rows rewritten
+
+    def summary(self):
+        return (f"{len(self.changed)} nonterminals changed; FIRST {self.first_recomputed}, "
+                f"FOLLOW {self.follow_recomputed} entries recomputed; {self.expanded}/{self.states} "
+                f"states expanded; {self.rows} table rows rewritten")
+
+
+def changed_non_terminals(old, new):
+    '''
+    Nonterminals whose production lists differ between two grammars, in new-then-old order
+    '''
+    return [lhs for lhs in list(new) + [lhs for lhs in old if lhs not in new] if old.get(lhs) != new.get(lhs)]
+
+
+def nullable_non_terminals(grammar):
+    nullable = set()
+    changed = True
+    while changed:
+        changed = False
+        for lhs, productions in grammar.items():
+            if lhs not in nullable and any(all(symbol in nullable for symbol in production)
+                                           for production in productions):
+                nullable.add(lhs)
+                changed = True
+    return nullable
+
+
+def _first_of(symbols, first, grammar, epsilon):
+    '''
+    FIRST of a symbol string from the nonterminal entries of first
+    :return: (terminals, nullable)
+    '''
+    result = set()
+    for symbol in symbols:
+        if symbol not in grammar:
+            result.add(symbol)
+            return result, False
+        entry = first[symbol]
+        result.update(entry)
+        result.discard(epsilon)
+        if epsilon not in entry:
+            return result, False
+    return result, True
+
+
+def _closure(seeds, edges):
+    '''
+    Everything reachable from seeds through edges (dict symbol -> iterable)
+    '''
+    reached = set(seeds)
+    stack = list(reached)
+    while stack:
+        for target in edges.get(stack.pop(), ()):
+            if target not in reached:
+                reached.add(target)
+                stack.append(target)
+    return reached
+
+
+def update_first(first, old, grammar, changed, epsilon, terminals=None):
+    '''
+    Recompute the FIRST entries the edit can affect, in place
+    :param terminals: the engine's terminal set when FIRST also has {t: {t}} entries, else None
+    :return: (set of nonterminals whose FIRST set changed, number of entries recomputed)
+    '''
+    nullable = nullable_non_terminals(grammar) | {lhs for lhs in old if epsilon in first.get(lhs, ())}
+    # B -> A when A occurs in a production of B behind a possibly nullable prefix
+    dependents = {}
+    for lhs, productions in grammar.items():
+        for production in productions:
+            for symbol in production:
+                if symbol in grammar:
+                    dependents.setdefault(symbol, set()).add(lhs)
+                if symbol not in nullable:
+                    break
+    affected = _closure([lhs for lhs in changed if lhs in grammar], dependents)
+
+    previous = {lhs: first.get(lhs) for lhs in affected}
+    for lhs in old:
+        if lhs not in grammar:
+            previous[lhs] = first.pop(lhs, None)
+    if terminals is not None:
+        for symbol in [symbol for symbol in first if symbol not in grammar and symbol not in terminals]:
+            del first[symbol]
+        for terminal in terminals:
+            first.setdefault(terminal, {terminal})
+    for lhs in affected:
+        first[lhs] = set()
+
+    changed_any = True
+    while changed_any:
+        changed_any = False
+        for lhs in affected:
+            entry = first[lhs]
+            size = len(entry)
+            for production in grammar[lhs]:
+                found, empty = _first_of(production, first, grammar, epsilon)
+                entry |= found
+                if empty:
+                    entry.add(epsilon)
+            changed_any |= len(entry) != size
+    return {lhs for lhs, entry in previous.items() if first.get(lhs) != entry}, len(affected)
+
+
+def update_follow(follow, first, old, grammar, changed, first_changed, epsilon):
+    '''
+    Recompute the FOLLOW entries the edit can affect, in place (with new set objects)
+    :return: number of entries recomputed
+    '''
+    start_symbol = next(iter(grammar))
+    dirty_symbols = set(changed) | first_changed
+    nullable = {lhs for lhs in grammar if epsilon in first[lhs]}
+    seeds = set()
+    for lhs in changed:
+        for source in (old, grammar):
+            for production in source.get(lhs, ()):
+                seeds.update(symbol for symbol in production if symbol in grammar)
+    occurrences = {}  # nonterminal -> (lhs, production, position) of each occurrence
+    feeds = {}        # A -> B when FOLLOW(A) flows into FOLLOW(B)
+    for lhs, productions in grammar.items():
+        for production in productions:
+            later_dirty = False
+            tail_nullable = True
+            for position in range(len(production) - 1, -1, -1):
+                symbol = production[position]
+                if symbol in grammar:
+                    occurrences.setdefault(symbol, []).append((lhs, production, position))
+                    if later_dirty:
+                        seeds.add(symbol)
+                    if tail_nullable:
+                        feeds.setdefault(lhs, set()).add(symbol)
+                later_dirty |= symbol in dirty_symbols
+                tail_nullable &= symbol in nullable
+    if start_symbol in changed:
+        seeds.add(start_symbol)
+    affected = _closure([symbol for symbol in seeds if symbol in grammar], feeds)
+
+    for lhs in old:
+        if lhs not in grammar:
+            follow.pop(lhs, None)
+    for lhs in affected:
+        follow[lhs] = {END_MARKER} if lhs == start_symbol else set()
+
+    changed_any = True
+    while changed_any:
+        changed_any = False
+        for symbol in affected:
+            entry = follow[symbol]
+            size = len(entry)
+            for lhs, production, position in occurrences.get(symbol, ()):
+                found, empty = _first_of(production[position + 1:], first, grammar, epsilon)
+                entry |= found
+                if empty:
+                    entry |= follow[lhs]
+            changed_any |= len(entry) != size
+    return len(affected)
+
+
+def _dirty_state(state, changed, dirty_symbols):
+    for item in state:
+        lhs, rhs, dot, _ = item_parts(item)
+        if lhs in changed:
+            return True
+        for symbol in rhs[dot:]:
+            if symbol in dirty_symbols:
+                return True
+    return False
+
+
+def _kernel(state):
+    return frozenset(item for item in state if item_parts(item)[2] > 0)
+
+
+def stable_numbers(old_states, states):
+    '''
+    Numbers for a new state list that keep the old number of every state whose kernel is unchanged
+    :return: list, per position in states, of its new number; a permutation of range(len(states))
+    '''
+    count = len(states)
+    # Kernels identify states; the initial state is the only one with an empty kernel
+    old_ids = {_kernel(state): number for number, state in enumerate(old_states) if number < count}
+    numbers = [old_ids.get(_kernel(state)) for state in states]
+    taken = set(numbers)
+    free = iter(number for number in range(count) if number not in taken)
+    return [next(free) if number is None else number for number in numbers]
+
+
+def renumber(parser, numbered, numbers):
+    '''
+    Move every state of parser (an engine or an LR0Automaton) to its number in numbers, in place
+    :param numbered: transitions are keyed by state number, not item set
+    '''
+    states = [None] * len(numbers)
+    for position, state in enumerate(parser.states):
+        states[numbers[position]] = state
+    parser.states = states
+    if numbered:
+        parser.transitions = {(numbers[from_state], symbol): numbers[to_state]
+                              for (from_state, symbol), to_state in parser.transitions.items()}
+    if hasattr(parser, 'goto_memo'):
+        parser.goto_memo = {(numbers[from_state], symbol): numbers[to_state]
+                            for (from_state, symbol), to_state in parser.goto_memo.items()}
+
+
+def rebuild_automaton(parser, engine, changed, dirty_symbols, symbols, initial_item):
+    '''
+    Rebuild a state list breadth-first, reusing the successors of clean states, and give
+    every state with an old kernel its old number (stable_numbers)
+    :param parser: the engine, or the LR0Automaton it reads its states from
+    :return: number of states expanded
+    '''
+    old_states = parser.states
+    old_successors = {}
+    for (from_state, symbol), to_state in parser.transitions.items():
+        if engine.numbered:
+            from_state, to_state = old_states[from_state], old_states[to_state]
+        old_successors.setdefault(from_state, {})[symbol] = to_state
+    dirty = {}  # state -> dirty, memoised per item set
+
+    def is_dirty(state):
+        result = dirty.get(state)
+        if result is None:
+            result = dirty[state] = state not in old_successors and state not in old_states_set \
+                or _dirty_state(state, changed, dirty_symbols)
+        return result
+
+    old_states_set = set(old_states)
+    successor = parser.goto
+    initial_state = parser.closure({initial_item})
+    states = [initial_state]
+    state_ids = {initial_state: 0}
+    transitions = {}
+    goto_memo = {} if hasattr(parser, 'goto_memo') else None
+    symbol_ids = parser.ir.ids
+    queue = deque([initial_state])
+    expanded = 0
+
+    while queue:
+        state = queue.popleft()
+        if is_dirty(state):
+            expanded += 1
+            reused = None
+            # GOTO is empty on symbols after no dot
+            next_symbols = set()
+            for item in state:
+                _, rhs, dot, _ = item_parts(item)
+                if dot < len(rhs):
+                    next_symbols.add(rhs[dot])
+        else:
+            reused = old_successors.get(state, {})
+        for symbol in symbols:
+            if reused is None:
+                if symbol not in next_symbols:
+                    continue
+                target = successor(state, symbol)
+                if not target:
+                    continue
+            else:
+                target = reused.get(symbol)
+                if target is None:
+                    continue
+                if is_dirty(target):
+                    target = successor(state, symbol)
+            if target not in state_ids:
+                state_ids[target] = len(states)
+                states.append(target)
+                queue.append(target)
+            if engine.numbered:
+                transitions[(state_ids[state], symbol)] = state_ids[target]
+            else:
+                transitions[(state, symbol)] = target
+            if goto_memo is not None:
+                goto_memo[(state_ids[state], symbol_ids[symbol])] = state_ids[target]
+
+    parser.states = states
+    parser.transitions = transitions
+    if goto_memo is not None:
+        parser.goto_memo = goto_memo
+    renumber(parser, engine.numbered, stable_numbers(old_states, states))
+    return expanded
+
+
+def rebuild(parser, grammar, verify=False):
+    '''
+    Update a built parser to a new grammar, recomputing only what the edit affects
+    :param parser: LR0Parser, SLR1Parser, CLR1Parser or LALR1Parser
+    :param grammar: the edited grammar, a ReadGrammar
+    :param verify: build from scratch too and raise AssertionError on any difference
+    :return: Rebuild describing the work done
+    '''
+    engine = ENGINES[type(parser).__name__]
+    old = parser.grammar
+    report = Rebuild()
+    report.changed = changed_non_terminals(old, grammar)
+    old_inputs = parser.table_inputs()
+
+    parser.grammar = grammar
+    parser.ir = CompiledGrammar(grammar)
+    if hasattr(parser, 'closure_cache'):
+        parser.closure_cache.clear()  # closures under the old productions and FIRST sets
+    if hasattr(parser, 'terminals'):
+        parser.terminals = set(parser.ir.terminal_names()) if engine.end_in_terminals \
+            else set(parser.ir.terminal_names()[1:])
+        parser.non_terminals = set(parser.ir.non_terminal_names())
+
+    first_changed = set()
+    if engine.first is not None:
+        first = getattr(parser, engine.first)
+        terminals = parser.terminals if engine.with_terminals else None
+        first_changed, report.first_recomputed = update_first(first, old, grammar, report.changed,
+                                                              engine.epsilon, terminals)
+        report.follow_recomputed = update_follow(getattr(parser, engine.follow), first, old, grammar,
+                                                 report.changed, first_changed, engine.epsilon)
+
+    start_symbol = next(iter(grammar))
+    changed = set(report.changed)
+    dirty_symbols = changed | first_changed if engine.lr1 else changed
+    symbols = sorted({symbol for productions in grammar.values() for production in productions
+                      for symbol in production})
+    initial_item = (start_symbol, (DOT,) + grammar[start_symbol][0])
+    if engine.initial_lookahead is not None:
+        initial_item += (engine.initial_lookahead,)
+    if engine.automaton:
+        # Rebuild a copy: the old automaton may be shared with parsers of the old grammar
+        parser.automaton = parser.automaton.rebind(grammar, parser.ir)
+        report.expanded = rebuild_automaton(parser.automaton, engine, changed, dirty_symbols, symbols,
+                                            initial_item)
+        parser.compute_closure_goto()  # picks up the rebuilt collection
+    else:
+        report.expanded = rebuild_automaton(parser, engine, changed, dirty_symbols, symbols, initial_item)
+    report.states = len(parser.states)
+    if engine.finish is not None:
+        getattr(parser, engine.finish)()
+
+    terminals, non_terminals, successors, reductions = parser.table_inputs()
+    old_successors, old_reductions = old_inputs[2], old_inputs[3]
+    columns_changed = (terminals, non_terminals) != old_inputs[:2]
+    dirty_rows = [row for row in range(min(len(successors), len(old_successors)))
+                  if successors[row] != old_successors[row] or reductions[row] != old_reductions[row]
+                  or columns_changed and reductions[row]]
+    # patch_table also rewrites every row with a reduction if the precedence declarations changed
+    report.rows = patch_table(parser.table, successors, reductions, terminals, non_terminals, dirty_rows,
+                              parser.stats, grammar_precedence(grammar, parser.ir))
+    _refresh_views(parser)
+
+    if verify:
+        verify_rebuild(parser, engine)
+    return report
+
+
+def _refresh_views(parser):
+    '''
+    Re-derive what the engines keep next to the table
+    '''
+    from lrcore.driver import TableDriver
+    parser.conflicts = parser.table.conflicts
+    parser.driver = TableDriver(parser.table, parser.ir, stats=parser.stats)
+    if hasattr(parser, 'states_table'):
+        parser.states_table = parser.table.grid()
+    if hasattr(parser, 'action'):
+        parser.action = parser.table.action
+        parser.goto_table = parser.table.goto
+
+
+def verify_rebuild(parser, engine):
+    '''
+    Compare an incrementally updated parser with one built from scratch and given its state numbers
+    '''
+    fresh = type(parser)(parser.grammar)
+    numbers = {state: number for number, state in enumerate(parser.states)}
+    if len(numbers) != len(fresh.states) or any(state not in numbers for state in fresh.states):
+        raise AssertionError("incremental rebuild differs from a full build in: states")
+    renumber(fresh.automaton if engine.automaton else fresh, engine.numbered,
+             [numbers[state] for state in fresh.states])
+    if engine.automaton:
+        fresh.compute_closure_goto()  # picks up the renumbered collection
+    if engine.finish is not None:
+        getattr(fresh, engine.finish)()
+    fresh.build_parsing_table()
+    differences = [name for name in engine.structures if getattr(parser, name) != getattr(fresh, name)]
+    for name in ('terminals', 'non_terminals', 'state_count', 'action', 'goto', 'conflicts', 'resolved',
+                 'errors'):
+        if getattr(parser.table, name) != getattr(fresh.table, name):
+            differences.append(f"table.{name}")
+    if differences:
+        raise AssertionError(f"incremental rebuild differs from a full build in: {', '.join(differences)}")
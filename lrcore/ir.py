@@ -0,0 +1,219 @@
+'''
+Compiled grammar: the integer form of a ReadGrammar shared by the parsers.
+
+Symbols are numbered contiguously, terminals first: the end marker '#' is 0,
+the other terminals follow in sorted order, then the nonterminals in grammar
+order, so the augmented start symbol is terminal_count and its production is
+production 0. Whether a symbol is a terminal is a single comparison against
+terminal_count.
+
+Productions are Production records (index, lhs, rhs) whose right-hand side
+is an array of symbol IDs. Symbol names are kept only to translate to and
+from the string form (display, table columns, the ReadGrammar dict).
+
+The engines' item sets keep the string form (lhs, rhs with DOT), but
+closure and GOTO run on IDs: items() numbers every dotted item once per IR,
+giving the ID after its dot, the item with the dot moved past it and the
+FIRST set of what follows, so a closure walks by_lhs over integers instead
+of slicing and scanning name tuples. first_sets() and follow_sets() are
+the fixpoints behind those FIRST sets and the SLR(1) lookaheads, over the
+rhs arrays; first_names() and follow_names() give them by name, in the
+dict form the engines keep and lrcore.incremental updates.
+'''
+from array import array
+
+from lrcore.grammar import DOT
+from lrcore.tables import END_MARKER
+
+
+class Production:
+    __slots__ = ('index', 'lhs', 'rhs')
+
+    def __init__(self, index, lhs, rhs):
+        self.index = index  # position in grammar order
+        self.lhs = lhs      # nonterminal ID
+        self.rhs = rhs      # array('i') of symbol IDs
+
+    def __len__(self):
+        return len(self.rhs)
+
+    def __repr__(self):
+        return f"Production({self.index}, {self.lhs}, {list(self.rhs)})"
+
+
+class CompiledGrammar:
+    def __init__(self, grammar):
+        '''
+        :param grammar: augmented ReadGrammar (dict lhs -> list of rhs tuples, start symbol first)
+        '''
+        non_terminals = list(grammar)
+        terminals = sorted({symbol for productions in grammar.values() for production in productions
+                            for symbol in production if symbol not in grammar} - {END_MARKER})
+
+        self.names = [END_MARKER] + terminals + non_terminals  # symbol ID -> name
+        self.ids = {name: symbol for symbol, name in enumerate(self.names)}
+        self.terminal_count = len(terminals) + 1
+        self.start = self.terminal_count
+
+        self.productions = []  # in grammar order
+        self.by_lhs = [[] for _ in non_terminals]  # nonterminal ID - terminal_count -> its productions
+        self.production_index = {}  # (lhs name, rhs tuple) -> production index
+        ids = self.ids
+        for lhs, productions in grammar.items():
+            lhs_id = ids[lhs]
+            for rhs in productions:
+                production = Production(len(self.productions), lhs_id, array('i', [ids[s] for s in rhs]))
+                self.productions.append(production)
+                self.by_lhs[lhs_id - self.terminal_count].append(production)
+                # A duplicated production keeps its first index
+                self.production_index.setdefault((lhs, tuple(rhs)), production.index)
+
+        # %sync terminals for error recovery, as IDs
+        self.sync = [ids[name] for name in getattr(grammar, 'sync', ()) if name in ids and ids[name] < self.start]
+        self._first = None  # first_sets(), computed on first use
+        self._follow = None  # follow_sets(), computed on first use
+        self._items = None  # items(), computed on first use
+
+    def is_terminal(self, symbol):
+        return symbol < self.terminal_count
+
+    def productions_of(self, non_terminal):
+        '''
+        Productions of a nonterminal ID, in grammar order
+        '''
+        return self.by_lhs[non_terminal - self.terminal_count]
+
+    def first_sets(self):
+        '''
+        FIRST of every symbol, by least fixpoint over the productions
+        :return: (list symbol ID -> frozenset of terminal IDs, list symbol ID -> whether it derives the empty string)
+        '''
+        if self._first is None:
+            first = [{symbol} if symbol < self.terminal_count else set() for symbol in range(len(self.names))]
+            nullable = [False] * len(self.names)
+            changed = True
+            while changed:
+                changed = False
+                for production in self.productions:
+                    entry = first[production.lhs]
+                    size = len(entry)
+                    for symbol in production.rhs:
+                        entry |= first[symbol]
+                        if not nullable[symbol]:
+                            break
+                    else:
+                        if not nullable[production.lhs]:
+                            nullable[production.lhs] = changed = True
+                    if len(entry) != size:
+                        changed = True
+            self._first = [frozenset(entry) for entry in first], nullable
+        return self._first
+
+    def follow_sets(self):
+        '''
+        FOLLOW of every nonterminal, by least fixpoint over the productions; the start symbol's holds '#'
+        :return: list nonterminal ID - terminal_count -> set of terminal IDs
+        '''
+        if self._follow is None:
+            first, nullable = self.first_sets()
+            terminal_count = self.terminal_count
+            follow = [set() for _ in self.by_lhs]
+            follow[0].add(self.ids[END_MARKER])
+            changed = True
+            while changed:
+                changed = False
+                for production in self.productions:
+                    # What can follow the symbol at each position, from the right end
+                    rest = follow[production.lhs - terminal_count]
+                    for symbol in reversed(production.rhs):
+                        if symbol >= terminal_count:
+                            entry = follow[symbol - terminal_count]
+                            size = len(entry)
+                            entry |= rest
+                            if len(entry) != size:
+                                changed = True
+                        rest = first[symbol] | rest if nullable[symbol] else first[symbol]
+            self._follow = follow
+        return self._follow
+
+    def first_names(self, epsilon, symbols):
+        '''
+        FIRST sets by name
+        :param epsilon: marker put in the set of a nullable symbol
+        :param symbols: IDs of the symbols to give an entry
+        :return: dict symbol name -> set of terminal names
+        '''
+        first, nullable = self.first_sets()
+        names = self.names
+        sets = {}
+        for symbol in symbols:
+            entry = sets[names[symbol]] = {names[terminal] for terminal in first[symbol]}
+            if nullable[symbol]:
+                entry.add(epsilon)
+        return sets
+
+    def follow_names(self):
+        '''
+        FOLLOW sets by name
+        :return: dict nonterminal name -> set of terminal names
+        '''
+        names = self.names
+        return {names[self.terminal_count + offset]: {names[terminal] for terminal in entry}
+                for offset, entry in enumerate(self.follow_sets())}
+
+    def items(self):
+        '''
+        Every dotted item of the grammar in the engines' string form
+        :return: (dict (lhs name, rhs names with DOT) -> (symbol ID after the dot, item with the dot moved past it,
+                  FIRST names of the symbols after that one, whether those are all nullable), with None for the
+                  first two in a completed item;
+                  list nonterminal ID - terminal_count -> its items with the dot first)
+        '''
+        if self._items is None:
+            first, nullable = self.first_sets()
+            names = self.names
+            table = {}
+            starts = [[] for _ in self.by_lhs]
+            for production in self.productions:
+                lhs = names[production.lhs]
+                rhs = tuple(names[symbol] for symbol in production.rhs)
+                # FIRST of rhs[dot + 1:], grown from the right end
+                rest, rest_nullable = frozenset(), True
+                advanced = None
+                for dot in range(len(rhs), -1, -1):
+                    item = (lhs, rhs[:dot] + (DOT,) + rhs[dot:])
+                    if dot == len(rhs):
+                        table[item] = (None, None, rest, rest_nullable)
+                    else:
+                        symbol = production.rhs[dot]
+                        table[item] = (symbol, advanced, rest, rest_nullable)
+                        symbol_first = frozenset(names[terminal] for terminal in first[symbol])
+                        if nullable[symbol]:
+                            rest = symbol_first | rest
+                        else:
+                            rest, rest_nullable = symbol_first, False
+                    advanced = item
+                starts[production.lhs - self.terminal_count].append(advanced)
+            self._items = table, starts
+        return self._items
+
+    def terminal_names(self):
+        '''
+        Terminal names including '#', in ID order
+        '''
+        return self.names[:self.terminal_count]
+
+    def non_terminal_names(self):
+        return self.names[self.terminal_count:]
+
+    def production_names(self, index):
+        '''
+        A production in string form
+        :return: (lhs name, rhs tuple of names)
+        '''
+        production = self.productions[index]
+        names = self.names
+        return names[production.lhs], tuple(names[symbol] for symbol in production.rhs)
+
+    def __len__(self):
+        return len(self.names)
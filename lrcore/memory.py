@@ -0,0 +1,157 @@
+'''
+Memory profiling of automaton and table construction, built on tracemalloc.
+
+A parser created with memory=True owns a MemoryProfile in self.memory and
+tracing starts right away. Every @phase method then records the peak traced
+memory during the phase, the memory still retained when it returns, and the
+deep size of the parser structures at that point (states, transitions,
+FIRST/FOLLOW sets, tables). Objects reachable from the grammar are shared by
+everything and are left out of the breakdown. An LALR(1) parser's own
+states and transitions are counted in place of the LR(0) collection they
+are derived from, so its states are not counted twice.
+
+Tracing slows construction down several times; call stop() once the parts
+of interest are built. Allocations in worker processes are not traced.
+'''
+import json
+import sys
+import tracemalloc
+import types
+
+# Parser attributes making up each structure, across the four engines
+STRUCTURES = {
+    'states': ('states', 'lalr_states'),
+    'transitions': ('transitions', 'lalr_transitions'),
+    'first_follow': ('first', 'follow', 'first_sets', 'follow_sets'),
+    'tables': ('table', 'states_table', 'action', 'goto_table'),
+}
+# Attributes counted instead of another one when a parser has both
+SUPERSEDES = {'lalr_states': 'states', 'lalr_transitions': 'transitions'}
+
+
+def deep_size(root, seen):
+    '''
+    Total sys.getsizeof of an object and everything reachable through containers
+    and __slots__ attributes, skipping (and adding to) the ids in seen
+    '''
+    total = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(type(obj), '__slots__'):
+            stack.extend(getattr(obj, name) for name in type(obj).__slots__ if hasattr(obj, name))
+        elif hasattr(obj, '__dict__') and not callable(obj) and not isinstance(obj, types.ModuleType):
+            stack.append(vars(obj))  # plain instances such as a ParseTable
+    return total
+
+
+def structure_attributes(parser, structure):
+    '''
+    The attributes a parser holds making up a structure (values a property derives on demand are not held)
+    '''
+    names = [name for name in STRUCTURES[structure] if name in vars(parser)]
+    superseded = {SUPERSEDES[name] for name in names if name in SUPERSEDES}
+    return [name for name in names if name not in superseded]
+
+
+def structure_sizes(parser):
+    '''
+    Deep size of each parser structure, excluding objects shared with the grammar
+    :return: dict structure -> bytes
+    '''
+    seen = set()
+    deep_size(parser.grammar, seen)
+    sizes = {}
+    for structure in STRUCTURES:
+        sizes[structure] = sum(deep_size(getattr(parser, name), seen)
+                               for name in structure_attributes(parser, structure))
+    return sizes
+
+
+class MemoryProfile:
+    def __init__(self):
+        self.owns_tracing = not tracemalloc.is_tracing()
+        if self.owns_tracing:
+            tracemalloc.start()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        self.phases = {}  # phase name -> {'peak', 'retained', 'delta', 'structures'}
+        self.open_phases = []  # [name, memory at start, peak seen so far] of running phases
+
+    def begin(self, name):
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self.open_phases:
+            # The peak is about to be reset: keep the enclosing phase's peak so far
+            self.open_phases[-1][2] = max(self.open_phases[-1][2], peak)
+        tracemalloc.reset_peak()
+        self.open_phases.append([name, current, current])
+
+    def end(self, name, parser):
+        if not tracemalloc.is_tracing() or not self.open_phases:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        _, start, peak_so_far = self.open_phases.pop()
+        peak = max(peak, peak_so_far)
+        if self.open_phases:
+            self.open_phases[-1][2] = max(self.open_phases[-1][2], peak)
+        self.phases[name] = {
+            'peak': peak - self.baseline,
+            'retained': current - self.baseline,
+            'delta': current - start,
+            'structures': structure_sizes(parser),
+        }
+        # Walking the structures allocates too; keep that out of the next phase
+        tracemalloc.reset_peak()
+
+    def stop(self):
+        '''
+        Stop tracing if this profile started it
+        '''
+        if self.owns_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self, parser):
+        '''
+        Per-phase snapshots plus the current structure breakdown and per-state/per-item sizes
+        '''
+        sizes = structure_sizes(parser)
+        state_lists = [getattr(parser, name) for name in structure_attributes(parser, 'states')]
+        states = sum(len(state_list) for state_list in state_lists)
+        items = sum(len(state) for state_list in state_lists for state in state_list)
+        return {
+            'phases': self.phases,
+            'structures': sizes,
+            'states': states,
+            'items': items,
+            'bytes_per_state': sizes['states'] / states if states else 0,
+            'bytes_per_item': sizes['states'] / items if items else 0,
+        }
+
+    def dump_json(self, parser, path):
+        '''
+        Write report() as JSON to a file path or an open text file
+        '''
+        if hasattr(path, 'write'):
+            json.dump(self.report(parser), path, indent=2)
+        else:
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(self.report(parser), file, indent=2)
+
+    def print_report(self, parser):
+        report = self.report(parser)
+        print(f"{'phase':<24}{'peak':>12}{'retained':>12}{'delta':>12}")
+        for name, snapshot in report['phases'].items():
+            print(f"{name:<24}{snapshot['peak']:>12}{snapshot['retained']:>12}{snapshot['delta']:>12}")
+        print("Structures (bytes): " + ', '.join(f"{name}={size}" for name, size in report['structures'].items()))
+        print(f"{report['states']} states, {report['items']} items: "
+              f"{report['bytes_per_state']:.0f} bytes/state, {report['bytes_per_item']:.0f} bytes/item")
@@ -0,0 +1,110 @@
+'''
+Parallel construction of the canonical item collection.
+
+The sequential builders expand one state at a time from a FIFO queue: they
+compute the GOTO kernels of a state in one pass, look each kernel up in an
+index of the kernels already seen, and close only the new ones. Here each
+round takes a whole BFS frontier through the same two steps in a process
+pool. Workers compute the successor kernels of the frontier states; the
+parent deduplicates them against its kernel index, in frontier and symbol
+order, and numbers the new ones; workers then close just those kernels,
+which become the next frontier. Every kernel is closed once, as in the
+sequential build, and because a FIFO queue also visits states level by
+level, in discovery order, the numbering is exactly the sequential one.
+
+A state is the closure of its kernel and a GOTO kernel never equals the
+start kernel, so equal kernels and equal states are the same thing.
+
+Each worker holds its own copy of the objects the kernel and closure
+functions are methods of. When such an object counts into a BuildStats
+(lrcore.stats), every task sends back how much its counters grew, and
+build_states adds those increments to the parent's BuildStats, so the
+counters after a parallel build cover the work done in the workers.
+'''
+from concurrent.futures import ProcessPoolExecutor
+
+# Per-worker copies of the kernel and closure functions
+_kernels = None
+_closure = None
+
+
+def _init_worker(kernels, closure):
+    global _kernels, _closure
+    _kernels = kernels
+    _closure = closure
+
+
+def _counted(function, argument):
+    '''
+    Call function(argument), measuring the counters of the BuildStats its object holds
+    :return: (result, counter increments or None)
+    '''
+    stats = getattr(getattr(function, '__self__', None), 'stats', None)
+    if stats is None:
+        return function(argument), None
+    before = stats.counters()
+    result = function(argument)
+    return result, {name: value - before[name] for name, value in stats.counters().items()
+                    if value != before[name]}
+
+
+def _expand(state):
+    '''
+    Successor kernels of a state, in symbol order
+    :return: (list of (symbol, kernel frozenset), counter increments or None)
+    '''
+    kernels, counts = _counted(_kernels, state)
+    return [(symbol, frozenset(kernels[symbol])) for symbol in sorted(kernels)], counts
+
+
+def _close(kernel):
+    '''
+    :return: (closed state, counter increments or None)
+    '''
+    return _counted(_closure, kernel)
+
+
+def build_states(initial_state, kernels, closure, workers, stats=None):
+    '''
+    Build the item collection breadth-first, one frontier per round
+    :param initial_state: closure of the start item
+    :param kernels: picklable callable state -> dict symbol -> set of kernel items
+    :param closure: picklable callable kernel frozenset -> closed state
+    :param workers: number of worker processes
+    :param stats: BuildStats receiving dedup hits and the workers' counter increments, or None
+    :return: (states, edges) where edges are (from_index, symbol, to_index) in discovery order
+    '''
+    states = [initial_state]
+    kernel_ids = {}
+    edges = []
+    start = 0  # the frontier is states[start:]
+
+    def add(counts):
+        if counts and stats is not None:
+            stats.add_counters(counts)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(kernels, closure)) as pool:
+        while start < len(states):
+            frontier = states[start:]
+            results = pool.map(_expand, frontier, chunksize=max(1, len(frontier) // (workers * 4)))
+
+            new_kernels = []
+            for from_index, (successors, counts) in enumerate(results, start):
+                add(counts)
+                for symbol, kernel in successors:
+                    to_index = kernel_ids.get(kernel)
+                    if to_index is None:
+                        to_index = kernel_ids[kernel] = len(states) + len(new_kernels)
+                        new_kernels.append(kernel)
+                    elif stats is not None:
+                        stats.dedup_hits += 1
+                    edges.append((from_index, symbol, to_index))
+
+            start = len(states)
+            for state, counts in pool.map(_close, new_kernels,
+                                          chunksize=max(1, len(new_kernels) // (workers * 4))):
+                add(counts)
+                states.append(state)
+
+    return states, edges
@@ -0,0 +1,121 @@
+'''
+Useless-symbol elimination, run by ReadGrammar before any automaton is built.
+
+A nonterminal is useless if it derives no terminal string (unproductive) or
+cannot be reached from the start symbol (unreachable). Productions using an
+unproductive symbol are dropped first, then everything unreachable from the
+start symbol; in that order the result has no useless symbols. Each pass is
+a worklist over symbol occurrences, linear in the size of the grammar.
+'''
+
+
+class Reduction:
+    def __init__(self):
+        self.unproductive = []         # nonterminals deriving no terminal string
+        self.unreachable = []          # productive nonterminals not reachable from the start symbol
+        self.unused_terminals = []     # terminals that only occurred in dropped productions
+        self.removed_productions = []  # (lhs, rhs) in grammar order
+
+    def __bool__(self):
+        return bool(self.removed_productions)
+
+    def summary(self):
+        parts = []
+        for label, symbols in (('unproductive', self.unproductive), ('unreachable', self.unreachable),
+                               ('unused terminals', self.unused_terminals)):
+            if symbols:
+                parts.append(f"{label}: {', '.join(symbols)}")
+        return f"removed {len(self.removed_productions)} productions ({'; '.join(parts)})"
+
+
+def productive_symbols(grammar):
+    '''
+    Nonterminals deriving some terminal string: every production counts its
+    nonterminal occurrences not yet known productive, and a nonterminal becoming
+    productive decrements the counters of the productions using it
+    :return: set of nonterminals
+    '''
+    remaining = {}  # (lhs, production number) -> nonterminal occurrences not yet known productive
+    uses = {}       # nonterminal -> productions it occurs in (once per occurrence)
+    productive = set()
+    worklist = []
+
+    for lhs, productions in grammar.items():
+        for number, production in enumerate(productions):
+            count = 0
+            for symbol in production:
+                if symbol in grammar:
+                    count += 1
+                    uses.setdefault(symbol, []).append((lhs, number))
+            remaining[(lhs, number)] = count
+            if count == 0 and lhs not in productive:
+                productive.add(lhs)
+                worklist.append(lhs)
+
+    while worklist:
+        symbol = worklist.pop()
+        for key in uses.get(symbol, ()):
+            remaining[key] -= 1
+            if remaining[key] == 0 and key[0] not in productive:
+                productive.add(key[0])
+                worklist.append(key[0])
+    return productive
+
+
+def reachable_symbols(grammar, start_symbol):
+    '''
+    Symbols (terminals included) reachable from the start symbol
+    '''
+    reachable = {start_symbol}
+    worklist = [start_symbol]
+    while worklist:
+        for production in grammar.get(worklist.pop(), ()):
+            for symbol in production:
+                if symbol not in reachable:
+                    reachable.add(symbol)
+                    if symbol in grammar:
+                        worklist.append(symbol)
+    return reachable
+
+
+def remove_useless_symbols(grammar):
+    '''
+    Remove unproductive, then unreachable nonterminals and their productions, in place
+    :param grammar: augmented grammar dict (start symbol first)
+    :return: Reduction describing what was dropped
+    '''
+    reduction = Reduction()
+    start_symbol = next(iter(grammar))
+    terminals = {symbol for productions in grammar.values() for production in productions
+                 for symbol in production if symbol not in grammar}
+
+    productive = productive_symbols(grammar)
+    if start_symbol not in productive:
+        raise ValueError(f"Start symbol '{start_symbol}' does not derive any terminal string")
+    reduction.unproductive = [lhs for lhs in grammar if lhs not in productive]
+
+    kept = {}
+    for lhs, productions in grammar.items():
+        if lhs not in productive:
+            reduction.removed_productions.extend((lhs, production) for production in productions)
+            continue
+        kept[lhs] = []
+        for production in productions:
+            if all(symbol in productive or symbol not in grammar for symbol in production):
+                kept[lhs].append(production)
+            else:
+                reduction.removed_productions.append((lhs, production))
+
+    reachable = reachable_symbols(kept, start_symbol)
+    reduction.unreachable = [lhs for lhs in kept if lhs not in reachable]
+    for lhs in reduction.unreachable:
+        reduction.removed_productions.extend((lhs, production) for production in kept.pop(lhs))
+    reduction.unused_terminals = sorted(terminals - reachable)
+
+    if reduction:
+        # Restore grammar order for the removed productions
+        order = {lhs: i for i, lhs in enumerate(grammar)}
+        reduction.removed_productions.sort(key=lambda item: order[item[0]])
+        grammar.clear()
+        grammar.update(kept)
+    return reduction
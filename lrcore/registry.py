@@ -0,0 +1,160 @@
+'''
+In-process registry of compiled parsers for many grammars, bounded in memory.
+
+Parsers are keyed by the SHA-256 of the grammar file's content plus the
+algorithm, so the same grammar under two paths is built once and an edited
+file is a new key. A miss builds the engine, keeps only what parsing needs
+(the ParseTable, the CompiledGrammar and a TableDriver over them) and lets
+the item sets, transitions and FIRST/FOLLOW sets go. Entries are kept in LRU
+order and the least recently used ones are evicted once the estimated size
+of all entries exceeds the byte budget; the entry just built always stays.
+
+    registry = ParserRegistry(budget=64 << 20)
+    registry.get('grammars/expr.txt', 'clr').parse('a+a')
+    registry.counters()   # {'hits': ..., 'misses': ..., 'evictions': ..., 'bytes': ...}
+
+File digests are cached by (mtime, size), so a hit only stats the file.
+'''
+import contextlib
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from lrcore.driver import TableDriver
+from lrcore.engines import load_engine
+from lrcore.memory import deep_size
+
+
+def grammar_digest(path):
+    '''
+    SHA-256 hex digest of a grammar file's content
+    '''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CompiledParser:
+    def __init__(self, parser, algorithm, digest, bypass_units=True):
+        '''
+        The parse-time part of a built engine
+        '''
+        self.algorithm = algorithm
+        self.digest = digest
+        self.table = parser.table
+        self.ir = parser.ir
+        self.driver = TableDriver(self.table, self.ir, bypass_units=bypass_units)
+        self.state_count = self.table.state_count
+        self.conflicts = len(self.table.conflicts)
+        seen = set()
+        self.size = sum(deep_size(part, seen) for part in (self.table, self.ir, self.driver.actions,
+                                                            self.driver.reductions, self.driver.chains,
+                                                            vars(self.table), vars(self.ir)))
+
+    def parse(self, tokens, tree=False):
+        '''
+        :return: accepted, or (accepted, tree root) with tree=True
+        '''
+        accepted, root = self.driver.parse(tokens, tree)
+        return (accepted, root) if tree else accepted
+
+    def parse_all(self, tokens, **options):
+        '''
+        Parse with error recovery, see TableDriver.parse_all
+        '''
+        return self.driver.parse_all(tokens, **options)
+
+
+class ParserRegistry:
+    def __init__(self, budget=64 << 20, bypass_units=True, quiet=True):
+        '''
+        :param budget: estimated bytes the cached parsers may take together
+        :param bypass_units: drivers skip unit reductions
+        :param quiet: silence what the engines print while building
+        '''
+        self.budget = budget
+        self.bypass_units = bypass_units
+        self.quiet = quiet
+        self.entries = OrderedDict()  # (digest, algorithm) -> CompiledParser, least recently used first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.build_seconds = 0.0
+        self._digests = {}  # path -> (mtime_ns, size, digest)
+
+    def digest(self, path):
+        info = os.stat(path)
+        cached = self._digests.get(path)
+        if cached is not None and cached[:2] == (info.st_mtime_ns, info.st_size):
+            return cached[2]
+        digest = grammar_digest(path)
+        self._digests[path] = (info.st_mtime_ns, info.st_size, digest)
+        return digest
+
+    def get(self, path, algorithm='lalr'):
+        '''
+        The compiled parser of a grammar file, built on a miss
+        :return: CompiledParser
+        '''
+        key = (self.digest(path), algorithm)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        entry = self.build(path, algorithm, key[0])
+        self.entries[key] = entry
+        self.bytes += entry.size
+        self.evict()
+        return entry
+
+    def build(self, path, algorithm, digest):
+        parser_class, reader_class = load_engine(algorithm)
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, \
+                (contextlib.redirect_stdout(devnull) if self.quiet else contextlib.nullcontext()):
+            parser = parser_class(reader_class(path))
+        entry = CompiledParser(parser, algorithm, digest, self.bypass_units)
+        self.build_seconds += time.perf_counter() - start
+        return entry
+
+    def evict(self):
+        '''
+        Drop least recently used entries until within budget, keeping the most recent one
+        '''
+        while self.bytes > self.budget and len(self.entries) > 1:
+            _, entry = self.entries.popitem(last=False)
+            self.bytes -= entry.size
+            self.evictions += 1
+
+    def discard(self, path=None, algorithm=None):
+        '''
+        Remove the entries of a grammar file (all algorithms unless one is given), or everything
+        '''
+        digest = None if path is None else self.digest(path)
+        for key in [key for key in self.entries
+                    if (digest is None or key[0] == digest) and (algorithm is None or key[1] == algorithm)]:
+            self.bytes -= self.entries.pop(key).size
+
+    def __contains__(self, key):
+        path, algorithm = key
+        return (self.digest(path), algorithm) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def counters(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'budget': self.budget,
+            'build_seconds': self.build_seconds,
+        }
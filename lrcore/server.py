@@ -0,0 +1,314 @@
+'''
+Parse service: grammars compiled once and kept in memory behind a local socket.
+
+    python -m lrcore serve GRAMMAR [GRAMMAR ...] [-a lalr ...] [--port 7878 | --unix PATH] [--workers N]
+
+Every grammar file is built once per algorithm at startup; its ID is the
+file name without extension. Clients talk over localhost TCP or a Unix
+socket with length-prefixed messages: a 4-byte big-endian payload length,
+then a UTF-8 JSON object. Requests carry a client-chosen id echoed in the
+response:
+
+    {"id": 1, "grammar": "expr", "input": "a+a*a"}
+    {"id": 2, "grammar": "expr", "algorithm": "slr", "input": "a+", "recover": true}
+    {"id": 3, "op": "grammars"}
+
+    {"id": 1, "accepted": true}
+    {"id": 2, "accepted": false, "errors": [{"position": 2, "token": "#", "expected": ["(", "a"], ...}]}
+    {"id": 3, "grammars": {"expr": ["lalr", "slr"]}}
+    {"id": 4, "error": "unknown grammar 'exp'"}
+
+Requests are pipelined: a client may send any number before reading, and
+responses come back as they complete, not necessarily in order. Short
+inputs are parsed directly on the event loop, where a parse is cheaper than
+a round trip to another process; inputs of at least pool_threshold tokens
+go to a process pool whose workers hold their own copies of the tables, so
+a long parse never stalls the other connections. A request that fails
+still gets a response, with an "error" field. SIGTERM stops the server
+and shuts the pool down, so no worker outlives it.
+
+ParseClient is the matching asyncio client (see benchmarks/bench_server.py
+for the load test).
+'''
+import asyncio
+import itertools
+import json
+import os
+import signal
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from lrcore.driver import TableDriver
+from lrcore.engines import load_engine
+
+HEADER = struct.Struct('>I')
+MAX_MESSAGE = 16 << 20  # bytes; larger frames close the connection
+DEFAULT_PORT = 7878
+PIPELINE_DEPTH = 256    # requests in flight per connection before reading pauses
+
+
+def encode_message(message):
+    payload = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    return HEADER.pack(len(payload)) + payload
+
+
+async def read_message(reader):
+    '''
+    Read one framed message
+    :return: the decoded object, or None at a clean end of stream
+    '''
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as error:
+        if error.partial:
+            raise ConnectionError('connection closed inside a message header')
+        return None
+    size, = HEADER.unpack(header)
+    if size > MAX_MESSAGE:
+        raise ValueError(f"message of {size} bytes exceeds the {MAX_MESSAGE} byte limit")
+    return json.loads(await reader.readexactly(size))
+
+
+def parse_request(driver, text, recover):
+    '''
+    Parse one input with a driver
+    :return: response fields
+    '''
+    if not recover:
+        return {'accepted': driver.parse(text)[0]}
+    errors = driver.parse_all(text, repair=True)
+    return {'accepted': not errors,
+            'errors': [{'position': error.position, 'token': error.token, 'expected': error.expected,
+                        'repair': error.repair} for error in errors]}
+
+
+# Per-worker drivers, keyed like ParseServer.drivers
+_drivers = {}
+
+
+def _init_worker(compiled):
+    for key, (table, ir) in compiled.items():
+        _drivers[key] = TableDriver(table, ir, bypass_units=True)
+
+
+def _parse_in_worker(key, text, recover):
+    return parse_request(_drivers[key], text, recover)
+
+
+class ParseServer:
+    def __init__(self, grammars, algorithms=('lalr',), workers=None, pool_threshold=4096):
+        '''
+        Build every grammar with every algorithm
+        :param grammars: grammar file paths; the ID of each is its file name without extension
+        :param algorithms: engines to build, the first being the default of requests naming none
+        :param workers: processes for long inputs (None: one per CPU, 0: parse everything in the loop)
+        :param pool_threshold: token count from which an input goes to the pool
+        '''
+        self.algorithms = list(algorithms)
+        self.pool_threshold = pool_threshold
+        self.parsers = {}  # (grammar ID, algorithm) -> parser
+        self.drivers = {}  # (grammar ID, algorithm) -> TableDriver
+        for path in grammars:
+            grammar_id = os.path.splitext(os.path.basename(path))[0]
+            if any(key[0] == grammar_id for key in self.parsers):
+                raise ValueError(f"Two grammars share the ID '{grammar_id}'")
+            for algorithm in self.algorithms:
+                parser_class, reader_class = load_engine(algorithm)
+                parser = parser_class(reader_class(path))
+                self.parsers[(grammar_id, algorithm)] = parser
+                self.drivers[(grammar_id, algorithm)] = TableDriver(parser.table, parser.ir, bypass_units=True)
+        self.workers = workers
+        self.pool = None
+        self.server = None
+        self.connections = 0
+        self.requests = 0
+        self.pooled = 0
+
+    def grammar_ids(self):
+        '''
+        :return: dict grammar ID -> algorithms built for it
+        '''
+        ids = {}
+        for grammar_id, algorithm in self.parsers:
+            ids.setdefault(grammar_id, []).append(algorithm)
+        return ids
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        '''
+        Start listening on a Unix socket if path is given, else on host:port
+        '''
+        if self.workers != 0:
+            compiled = {key: (parser.table, parser.ir) for key, parser in self.parsers.items()}
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(compiled,))
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, path=path)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    async def serve_forever(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        '''
+        Serve until SIGTERM (or cancellation), then shut the pool down
+        '''
+        await self.start(host, port, path)
+        loop = asyncio.get_running_loop()
+        try:
+            # Without this a terminated server leaves its pool workers running
+            loop.add_signal_handler(signal.SIGTERM, self.server.close)
+        except (NotImplementedError, RuntimeError):  # no signal support, or not the main thread
+            pass
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        except asyncio.CancelledError:
+            if self.server.is_serving():
+                raise  # cancelled from outside, not stopped by the signal
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGTERM)
+            except (NotImplementedError, RuntimeError):
+                pass
+            self.close()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def handle(self, reader, writer):
+        '''
+        Serve one connection: read requests as they come, answer each as soon as it is done
+        '''
+        self.connections += 1
+        lock = asyncio.Lock()
+        slots = asyncio.Semaphore(PIPELINE_DEPTH)
+        tasks = set()
+
+        async def respond(request):
+            try:
+                response = await self.answer(request)
+            except Exception as error:
+                # Every request gets a response, or its client would wait forever
+                request_id = request.get('id') if isinstance(request, dict) else None
+                response = {'id': request_id, 'error': f"{type(error).__name__}: {error}"}
+            finally:
+                slots.release()
+            async with lock:
+                writer.write(encode_message(response))
+                await writer.drain()
+
+        try:
+            while True:
+                try:
+                    request = await read_message(reader)
+                except (ValueError, ConnectionError) as error:
+                    async with lock:
+                        writer.write(encode_message({'id': None, 'error': str(error)}))
+                    break
+                if request is None:
+                    break
+                await slots.acquire()
+                task = asyncio.create_task(respond(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def answer(self, request):
+        '''
+        Compute the response to one request
+        '''
+        if not isinstance(request, dict):
+            return {'id': None, 'error': 'a request must be a JSON object'}
+        request_id = request.get('id')
+        self.requests += 1
+        if request.get('op') == 'grammars':
+            return {'id': request_id, 'grammars': self.grammar_ids()}
+        key = (request.get('grammar'), request.get('algorithm') or self.algorithms[0])
+        text = request.get('input')
+        if key not in self.drivers:
+            return {'id': request_id, 'error': f"unknown grammar '{key[0]}' with algorithm '{key[1]}'"}
+        if not isinstance(text, str):
+            return {'id': request_id, 'error': "'input' must be a string"}
+        recover = bool(request.get('recover'))
+
+        if self.pool is not None and len(text) >= self.pool_threshold:
+            self.pooled += 1
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self.pool, _parse_in_worker, key, text, recover)
+        else:
+            response = parse_request(self.drivers[key], text, recover)
+        response['id'] = request_id
+        return response
+
+
+class ParseClient:
+    def __init__(self, reader, writer):
+        '''
+        Pipelining client; use ParseClient.connect to open one
+        '''
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}  # request id -> future
+        self.ids = itertools.count()
+        self.receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        try:
+            while True:
+                response = await read_message(self.reader)
+                if response is None:
+                    break
+                future = self.pending.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('connection closed by the server'))
+            self.pending.clear()
+
+    async def request(self, **fields):
+        '''
+        Send a request and wait for its response; concurrent calls are pipelined
+        :return: response dict
+        '''
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(encode_message(dict(fields, id=request_id)))
+        await self.writer.drain()
+        return await future
+
+    async def parse(self, grammar, text, algorithm=None, recover=False):
+        fields = {'grammar': grammar, 'input': text, 'recover': recover}
+        if algorithm is not None:
+            fields['algorithm'] = algorithm
+        return await self.request(**fields)
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        await asyncio.gather(self.receiver, return_exceptions=True)
@@ -0,0 +1,100 @@
+'''
+Build and parse instrumentation shared by the four parsers.
+
+A parser created with stats=True owns a BuildStats object in self.stats;
+otherwise self.stats is None. Phase methods are decorated with @phase and
+hot paths bump counters behind an `if stats is not None` check, so a parser
+without stats pays one attribute test per call and nothing else.
+
+Counters of work done inside worker processes (parallel construction) are
+sent back with each result and added up in the parent (lrcore.parallel).
+'''
+import functools
+import json
+import time
+
+COUNTERS = (
+    'closure_calls',            # closure() invocations
+    'closure_iterations',       # items or nonterminals taken off the closure worklist
+    'goto_calls',               # goto() invocations, or kernels() passes over a whole state
+    'dedup_hits',               # successor states that were already in the collection
+    'closure_cache_hits',       # kernels whose closure was cached (lrcore.closure)
+    'closure_cache_misses',     # kernels closed for the first time
+    'closure_cache_evictions',  # kernels dropped by the cache's size cap
+    'table_cells',              # ACTION/GOTO cells written
+    'shifts',                   # shift actions taken while parsing
+    'reduces',                  # reduce actions taken while parsing
+    'bypassed_reduces',         # unit reductions skipped by lrcore.driver's unit bypass
+)
+
+
+class BuildStats:
+    def __init__(self):
+        self.phases = {}  # phase name -> accumulated wall time in seconds
+        self.reset_counters()
+
+    def reset_counters(self):
+        for name in COUNTERS:
+            setattr(self, name, 0)
+
+    def add_counters(self, counts):
+        '''
+        Add counter increments made elsewhere, e.g. in a worker process
+        :param counts: dict counter name -> increment
+        '''
+        for name, value in counts.items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def add_time(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def counters(self):
+        return {name: getattr(self, name) for name in COUNTERS}
+
+    def to_dict(self):
+        '''
+        Structured view: {'phases': {name: seconds}, 'counters': {name: count}}
+        '''
+        return {'phases': dict(self.phases), 'counters': self.counters()}
+
+    def dump_json(self, path):
+        '''
+        Write to_dict() as JSON to a file path or an open text file
+        '''
+        if hasattr(path, 'write'):
+            json.dump(self.to_dict(), path, indent=2)
+        else:
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(self.to_dict(), file, indent=2)
+
+    def __repr__(self):
+        phases = ', '.join(f"{name}={seconds * 1000:.2f}ms" for name, seconds in self.phases.items())
+        counters = ', '.join(f"{name}={value}" for name, value in self.counters().items())
+        return f"BuildStats(phases: {phases}; counters: {counters})"
+
+
+def phase(method):
+    '''
+    Decorator recording the wall time of a parser method as a phase of the same name,
+    and a memory snapshot when the parser has a MemoryProfile (lrcore.memory)
+    '''
+    name = method.__name__
+
+    @functools.wraps(method)
+    def timed(self, *args, **kwargs):
+        stats = self.stats
+        memory = self.memory
+        if stats is None and memory is None:
+            return method(self, *args, **kwargs)
+        if memory is not None:
+            memory.begin(name)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            if stats is not None:
+                stats.add_time(name, time.perf_counter() - start)
+            if memory is not None:
+                memory.end(name, self)
+
+    return timed
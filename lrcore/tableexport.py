@@ -0,0 +1,220 @@
+'''
+Streaming export of ACTION/GOTO tables and state listings to text, CSV,
+JSON Lines and HTML.
+
+    python -m lrcore table GRAMMAR --format csv -o table.csv [--rows 0-99] [--symbols + * E]
+    python -m lrcore table GRAMMAR --states --format jsonl [--rows 10] [--kernel]
+
+Rows are produced one state at a time straight from the ParseTable's action
+and goto dicts, only for the selected states and symbols, and each row is
+formatted with a single join and handed to a buffered writer; nothing of
+the size of the whole table is built. A filter over a few states or columns
+of a table with thousands of states therefore costs only what it shows.
+
+    text    the engines' grid: every cell left-aligned to 10 characters, '|' after each
+    csv     a header row, then one row per state; empty cells are empty fields
+    jsonl   one JSON object per state holding only its non-empty cells
+    html    pages of page_size rows, each its own <table> with the header repeated,
+            so a browser lays out and shows the first page before reading the rest
+
+State listings give the item lines of lrcore.export (lookaheads of a shared
+core merged) in the same four formats.
+'''
+import csv
+import html
+import json
+import sys
+
+from lrcore.export import Automaton
+
+TABLE_FORMATS = ('text', 'csv', 'jsonl', 'html')
+# Characters collected before a write to the underlying file
+BUFFER_SIZE = 1 << 16
+
+
+class BufferedWriter:
+    def __init__(self, file, size=BUFFER_SIZE):
+        '''
+        Collect strings and write them to file in blocks of about size characters
+        '''
+        self.file = file
+        self.size = size
+        self.parts = []
+        self.pending = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.pending += len(text)
+        if self.pending >= self.size:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.file.write(''.join(self.parts))
+            self.parts = []
+            self.pending = 0
+
+
+def select_symbols(table, symbols=None):
+    '''
+    :param symbols: column names to keep, or None for all
+    :return: (terminals, non-terminals) to show, in table order
+    '''
+    if symbols is None:
+        return table.terminals, table.non_terminals
+    wanted = set(symbols)
+    unknown = wanted - set(table.terminals) - set(table.non_terminals)
+    if unknown:
+        raise ValueError(f"Unknown table symbols: {' '.join(sorted(unknown))}")
+    return [t for t in table.terminals if t in wanted], [n for n in table.non_terminals if n in wanted]
+
+
+def select_states(count, states=None):
+    '''
+    :param states: iterable of state numbers (a range works), or None for all
+    :return: the state numbers below count, in order
+    '''
+    if states is None:
+        return range(count)
+    if isinstance(states, range) and states.step == 1:
+        return range(max(states.start, 0), min(states.stop, count))
+    return sorted(s for s in set(states) if 0 <= s < count)
+
+
+def table_rows(table, states=None, symbols=None):
+    '''
+    The selected rows of a table, one at a time
+    :return: (columns, generator of (state, action cells, goto cells)) with '' for empty cells
+    '''
+    terminals, non_terminals = select_symbols(table, symbols)
+    action, goto = table.action, table.goto
+
+    def rows():
+        for state in select_states(table.state_count, states):
+            targets = (goto.get((state, n)) for n in non_terminals)
+            yield (state, [action.get((state, t), '') for t in terminals],
+                   ['' if target is None else str(target) for target in targets])
+
+    return terminals + non_terminals, rows()
+
+
+def _html_page_start(out, page, header):
+    out.write(f'<h2 id="page-{page}">Page {page}</h2>\n<table>\n<tr>'
+              + ''.join(f'<th>{html.escape(str(cell))}</th>' for cell in header) + '</tr>\n')
+
+
+def _html_document(out, title):
+    out.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>' + html.escape(title) + '</title>\n'
+              '<style>table{border-collapse:collapse;font:12px monospace}'
+              'td,th{border:1px solid #bbb;padding:1px 4px}</style></head><body>\n')
+
+
+def write_table(table, file, fmt='text', states=None, symbols=None, page_size=500):
+    '''
+    Stream a ParseTable to an open text file
+    :param fmt: one of TABLE_FORMATS
+    :param states: state numbers to write, or None for all
+    :param symbols: columns to write, or None for all
+    :param page_size: rows per HTML page
+    :return: number of rows written
+    '''
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of: {', '.join(TABLE_FORMATS)}")
+    columns, rows = table_rows(table, states, symbols)
+    out = BufferedWriter(file)
+    written = 0
+    if fmt == 'text':
+        out.write(''.join(f"{cell:<10}|" for cell in ['states'] + columns) + '\n')
+        for state, action_cells, goto_cells in rows:
+            out.write(f"{state:<10}|" + ''.join(f"{cell:<10}|" for cell in action_cells + goto_cells) + '\n')
+            written += 1
+    elif fmt == 'csv':
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(['state'] + columns)
+        for state, action_cells, goto_cells in rows:
+            writer.writerow([state] + action_cells + goto_cells)
+            written += 1
+    elif fmt == 'jsonl':
+        terminals, non_terminals = select_symbols(table, symbols)
+        for state, action_cells, goto_cells in rows:
+            record = {'state': state,
+                      'action': {t: cell for t, cell in zip(terminals, action_cells) if cell},
+                      'goto': {n: int(cell) for n, cell in zip(non_terminals, goto_cells) if cell}}
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            written += 1
+    else:
+        _html_document(out, 'Parsing table')
+        for state, action_cells, goto_cells in rows:
+            if written % page_size == 0:
+                if written:
+                    out.write('</table>\n')
+                _html_page_start(out, written // page_size + 1, ['state'] + columns)
+            out.write(f'<tr><th>{state}</th>'
+                      + ''.join(f'<td>{html.escape(cell)}</td>' for cell in action_cells + goto_cells) + '</tr>\n')
+            written += 1
+        out.write(('</table>\n' if written else '') + '</body></html>\n')
+    out.flush()
+    return written
+
+
+def write_states(parser, file, fmt='text', states=None, kernel_only=False, page_size=500):
+    '''
+    Stream the item sets of an engine's final automaton to an open text file
+    :param fmt: one of TABLE_FORMATS
+    :param states: state numbers to write, or None for all
+    :param kernel_only: leave out closure items
+    :param page_size: states per HTML page
+    :return: number of states written
+    '''
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of: {', '.join(TABLE_FORMATS)}")
+    automaton = Automaton(parser)
+    out = BufferedWriter(file)
+    writer = csv.writer(out, lineterminator='\n')
+    written = 0
+    if fmt == 'csv':
+        writer.writerow(['state', 'item'])
+    elif fmt == 'html':
+        _html_document(out, 'Parser states')
+    for state in select_states(len(automaton.states), states):
+        items = automaton.items(state, kernel_only)
+        if fmt == 'text':
+            out.write(f"State {state}:\n" + ''.join(f"  {item}\n" for item in items))
+        elif fmt == 'csv':
+            writer.writerows([state, item] for item in items)
+        elif fmt == 'jsonl':
+            out.write(json.dumps({'state': state, 'items': items}, ensure_ascii=False) + '\n')
+        else:
+            if written % page_size == 0:
+                if written:
+                    out.write('</table>\n')
+                _html_page_start(out, written // page_size + 1, ['state', 'items'])
+            out.write(f'<tr><th>{state}</th><td>' + '<br>'.join(html.escape(item) for item in items)
+                      + '</td></tr>\n')
+        written += 1
+    if fmt == 'html':
+        out.write(('</table>\n' if written else '') + '</body></html>\n')
+    out.flush()
+    return written
+
+
+def export_table(parser, path=None, fmt='csv', states=None, symbols=None, page_size=500, listing=False,
+                 kernel_only=False):
+    '''
+    Write a parser's table, or with listing=True its item sets, to a file or to stdout
+    :param path: output file, None for stdout
+    :return: number of rows written
+    '''
+    if path is None:
+        file = sys.stdout
+    else:
+        file = open(path, 'w', encoding='utf-8', newline='')
+    try:
+        if listing:
+            return write_states(parser, file, fmt, states, kernel_only, page_size)
+        return write_table(parser.table, file, fmt, states, symbols, page_size)
+    finally:
+        if path is None:
+            file.flush()
+        else:
+            file.close()
@@ -0,0 +1,257 @@
+'''
+ACTION/GOTO table construction shared by the four parsers.
+
+An engine describes each state by its outgoing transitions and by the
+reductions its completed items allow (production index plus lookahead
+terminals: every terminal for LR(0), FOLLOW(A) for SLR(1), the item
+lookaheads for CLR(1)/LALR(1)). build_table makes a single pass over those
+and fills the table directly; the only difference between the engines is
+which lookaheads they supply.
+
+Conflicts are resolved the yacc way. When the grammar declares precedence
+(%left, %right, %nonassoc, see lrcore.grammar), a production takes the
+level of the last terminal in its right-hand side, and a shift/reduce
+conflict between it and a declared terminal goes to the higher level; on
+equal levels %left reduces, %right shifts and %nonassoc leaves the cell
+empty, a syntax error. Such resolutions are expected and are listed in
+table.resolved. Every other conflict is recorded in table.conflicts: shift
+wins over reduce, and of two reductions the production listed first in the
+grammar wins.
+'''
+ACCEPT = 'acc'
+END_MARKER = '#'
+
+
+class ParseTable:
+    def __init__(self, terminals, non_terminals, state_count):
+        self.terminals = list(terminals)          # ACTION columns, in display order
+        self.non_terminals = list(non_terminals)  # GOTO columns, in display order
+        self.state_count = state_count
+        self.action = {}     # (state, terminal) -> 'S<state>' | 'r<production>' | 'acc'
+        self.goto = {}       # (state, non-terminal) -> state
+        self.conflicts = []  # (state, terminal, kept action, dropped action)
+        self.resolved = []   # (state, terminal, kept action, dropped action, reason) settled by precedence
+        self.errors = set()  # (state, terminal) left empty by %nonassoc
+        self.precedence = None  # Precedence the table was built with
+
+    def grid(self):
+        '''
+        The table as rows of cells: a header row ['states', symbols...] and then one
+        row [state, cells...] per state, with '' for empty cells and GOTO targets as strings
+        '''
+        symbols = self.terminals + self.non_terminals
+        rows = [['states'] + symbols]
+        for state in range(self.state_count):
+            row = [state]
+            for terminal in self.terminals:
+                row.append(self.action.get((state, terminal), ''))
+            for non_terminal in self.non_terminals:
+                target = self.goto.get((state, non_terminal))
+                row.append('' if target is None else str(target))
+            rows.append(row)
+        return rows
+
+    def print_conflicts(self):
+        for state, terminal, kept, dropped in self.conflicts:
+            print(f"Conflict in state {state} on '{terminal}': kept {kept}, dropped {dropped}")
+        for state, terminal, kept, dropped, reason in self.resolved:
+            print(f"Resolved in state {state} on '{terminal}' by {reason}: kept {kept or 'error'}, dropped {dropped}")
+
+
+class Precedence:
+    def __init__(self, terminals, productions):
+        '''
+        :param terminals: dict terminal -> (level, associativity), as ReadGrammar.precedence
+        :param productions: per production index, its level or None
+        '''
+        self.terminals = terminals
+        self.productions = productions
+
+    def __eq__(self, other):
+        return isinstance(other, Precedence) and \
+            (self.terminals, self.productions) == (other.terminals, other.productions)
+
+    def resolve(self, production_index, terminal):
+        '''
+        Settle a shift/reduce conflict between reducing a production and shifting a terminal
+        :return: ('reduce' | 'shift' | 'error', reason), or None if either has no precedence
+        '''
+        rule_level = self.productions[production_index]
+        declared = self.terminals.get(terminal)
+        if rule_level is None or declared is None:
+            return None
+        level, associativity = declared
+        if rule_level > level:
+            return 'reduce', 'precedence'
+        if rule_level < level:
+            return 'shift', 'precedence'
+        return {'left': 'reduce', 'right': 'shift', 'nonassoc': 'error'}[associativity], f'%{associativity}'
+
+
+def grammar_precedence(grammar, ir):
+    '''
+    The precedence of a grammar's terminals and productions
+    :param grammar: ReadGrammar
+    :param ir: CompiledGrammar of it
+    :return: Precedence, or None if the grammar declares none
+    '''
+    terminals = getattr(grammar, 'precedence', None)
+    if not terminals:
+        return None
+    names = ir.names
+    productions = []
+    for production in ir.productions:
+        # yacc: the last terminal of the right-hand side, if it has a declared precedence
+        last = next((symbol for symbol in reversed(production.rhs) if ir.is_terminal(symbol)), None)
+        declared = None if last is None else terminals.get(names[last])
+        productions.append(None if declared is None else declared[0])
+    return Precedence(dict(terminals), productions)
+
+
+def group_transitions(transitions, state_count, state_ids=None):
+    '''
+    Regroup a transitions dict {(state, symbol): target} into per-state successor lists
+    :param state_ids: maps state objects to indices when the dict is keyed by item sets
+    :return: list, per state index, of (symbol, target index)
+    '''
+    successors = [[] for _ in range(state_count)]
+    for (from_state, symbol), to_state in transitions.items():
+        if state_ids is not None:
+            from_state, to_state = state_ids[from_state], state_ids[to_state]
+        successors[from_state].append((symbol, to_state))
+    return successors
+
+
+def _set_action(table, state, terminal, action, precedence=None):
+    key = (state, terminal)
+    current = table.action.get(key)
+    if current is None:
+        if key not in table.errors:
+            table.action[key] = action
+        return
+    if current == action:
+        return
+    if precedence is not None and _resolve(table, key, current, action, precedence):
+        return
+    # Shift beats reduce; between reductions the lower production index wins
+    if current.startswith('S') or current == ACCEPT:
+        kept, dropped = current, action
+    elif action.startswith('S') or action == ACCEPT:
+        kept, dropped = action, current
+    elif int(action[1:]) < int(current[1:]):
+        kept, dropped = action, current
+    else:
+        kept, dropped = current, action
+    table.action[key] = kept
+    table.conflicts.append((state, terminal, kept, dropped))
+
+
+def _resolve(table, key, current, action, precedence):
+    '''
+    Settle a shift/reduce conflict by precedence
+    :return: whether it was settled
+    '''
+    if current.startswith('S') and action.startswith('r'):
+        shift, reduce = current, action
+    elif current.startswith('r') and action.startswith('S'):
+        shift, reduce = action, current
+    else:
+        return False
+    outcome = precedence.resolve(int(reduce[1:]), key[1])
+    if outcome is None:
+        return False
+    choice, reason = outcome
+    if choice == 'error':
+        kept, dropped = '', f'{shift}/{reduce}'
+        del table.action[key]
+        table.errors.add(key)
+    else:
+        kept, dropped = (reduce, shift) if choice == 'reduce' else (shift, reduce)
+        table.action[key] = kept
+    table.resolved.append(key + (kept, dropped, reason))
+    return True
+
+
+def _fill_row(table, state, state_successors, state_reductions, terminal_set, precedence=None):
+    for symbol, target in state_successors:
+        if symbol in terminal_set:
+            _set_action(table, state, symbol, f'S{target}', precedence)
+        else:
+            table.goto[(state, symbol)] = target
+
+    for production_index, lookaheads in state_reductions:
+        if production_index == 0:
+            if END_MARKER in lookaheads:
+                _set_action(table, state, END_MARKER, ACCEPT)
+            continue
+        action = f'r{production_index}'
+        # Sorted, so the conflict log does not depend on set iteration order
+        for lookahead in sorted(lookaheads):
+            _set_action(table, state, lookahead, action, precedence)
+
+
+def build_table(successors, reductions, terminals, non_terminals, stats=None, precedence=None):
+    '''
+    Build the ACTION/GOTO table in one pass over each state's transitions and reductions
+    :param successors: per state, list of (symbol, target state)
+    :param reductions: per state, list of (production index, lookahead terminals);
+                       production 0 is the augmented start production and yields accept on '#'
+    :param terminals: ACTION columns in display order, including '#'
+    :param non_terminals: GOTO columns in display order
+    :param stats: BuildStats receiving the number of cells written, or None
+    :param precedence: Precedence resolving shift/reduce conflicts (grammar_precedence), or None
+    :return: ParseTable
+    '''
+    table = ParseTable(terminals, non_terminals, len(successors))
+    table.precedence = precedence
+    terminal_set = set(terminals)
+
+    for state, state_successors in enumerate(successors):
+        _fill_row(table, state, state_successors, reductions[state], terminal_set, precedence)
+
+    if stats is not None:
+        stats.table_cells += len(table.action) + len(table.goto)
+    return table
+
+
+def patch_table(table, successors, reductions, terminals, non_terminals, dirty_rows, stats=None,
+                precedence=None):
+    '''
+    Bring a table built by build_table up to date in place, rewriting only some rows;
+    the result equals build_table on the same arguments provided every row outside
+    dirty_rows (below both state counts) is unchanged
+    :param dirty_rows: states whose transitions or reductions may have changed
+    :return: number of rows rewritten
+    '''
+    old_count = table.state_count
+    new_count = len(successors)
+    rewrite = {row for row in dirty_rows if row < new_count} | set(range(old_count, new_count))
+    if precedence != table.precedence:
+        # Any row with a reduction may resolve its conflicts differently
+        rewrite.update(row for row in range(new_count) if reductions[row])
+        table.precedence = precedence
+    columns = set(table.terminals) | set(terminals)
+    goto_columns = set(table.non_terminals) | set(non_terminals)
+    for row in rewrite | set(range(new_count, old_count)):
+        for terminal in columns:
+            table.action.pop((row, terminal), None)
+        for non_terminal in goto_columns:
+            table.goto.pop((row, non_terminal), None)
+
+    table.terminals = list(terminals)
+    table.non_terminals = list(non_terminals)
+    table.state_count = new_count
+    table.conflicts = [conflict for conflict in table.conflicts
+                       if conflict[0] not in rewrite and conflict[0] < new_count]
+    table.resolved = [entry for entry in table.resolved if entry[0] not in rewrite and entry[0] < new_count]
+    table.errors = {key for key in table.errors if key[0] not in rewrite and key[0] < new_count}
+    terminal_set = set(terminals)
+    for state in sorted(rewrite):
+        _fill_row(table, state, successors[state], reductions[state], terminal_set, precedence)
+    # build_table records conflicts row by row
+    table.conflicts.sort(key=lambda conflict: conflict[0])
+    table.resolved.sort(key=lambda entry: entry[0])
+
+    if stats is not None:
+        stats.table_cells += sum(len(successors[row]) for row in rewrite)
+    return len(rewrite)
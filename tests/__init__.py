@@ -0,0 +1,74 @@
+'''
+Tests for the engines and the shared lrcore package.
+
+    python -m pytest tests
+
+build() constructs an engine with its console output swallowed; corpus()
+gives the benchmark grammars (benchmarks/corpus.py) as files in a directory,
+and sentences() random inputs of a grammar, some of them mutated.
+'''
+import contextlib
+import io
+import os
+import sys
+
+from lrcore.engines import ROOT, load_engine
+from lrcore.generate import SentenceGenerator
+
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+import corpus as benchmark_corpus  # noqa: E402
+
+ALGORITHMS = ('lr0', 'slr', 'clr', 'lalr')
+
+
+def build(algorithm, grammar, **options):
+    '''
+    :param grammar: grammar file path or ReadGrammar
+    :return: the built parser
+    '''
+    parser_class, reader_class = load_engine(algorithm)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if isinstance(grammar, str):
+            grammar = reader_class(grammar)
+        return parser_class(grammar, **options)
+
+
+def corpus(directory, random_sizes=(5, 10)):
+    '''
+    Write the benchmark corpus into directory
+    :return: dict name -> grammar file path
+    '''
+    paths = {}
+    for name, _, text in benchmark_corpus.corpus(levels=(2, 4), random_sizes=random_sizes):
+        path = os.path.join(directory, f"{name}.txt")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        paths[name] = path
+    return paths
+
+
+def grammar_file(directory, text, name='grammar.txt'):
+    '''
+    Write grammar text to a file and return its path
+    '''
+    path = os.path.join(str(directory), name)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(text)
+    return path
+
+
+def sentences(parser, count=40, seed=0, invalid_ratio=0.5):
+    '''
+    :return: list of token tuples of the parser's grammar, about invalid_ratio of them mutated
+    '''
+    generator = SentenceGenerator(parser.grammar, seed)
+    return [tokens for tokens, _ in generator.corpus(count, 8, invalid_ratio=invalid_ratio)]
+
+
+def table_snapshot(parser):
+    '''
+    Everything a built table holds, for comparing two builds
+    '''
+    table = parser.table
+    return (dict(table.action), dict(table.goto), sorted(map(repr, table.conflicts)),
+            sorted(map(repr, table.resolved)), sorted(table.errors))
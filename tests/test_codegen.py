@@ -0,0 +1,33 @@
+import importlib.util
+
+import pytest
+
+from lrcore.codegen import DirectParser
+from tests import ALGORITHMS, build, corpus, grammar_file, sentences
+
+
+@pytest.fixture(scope='module')
+def grammars(tmp_path_factory):
+    return corpus(str(tmp_path_factory.mktemp('corpus')))
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_direct_parser_agrees_with_the_table_driver(grammars, algorithm):
+    for name, path in grammars.items():
+        parser = build(algorithm, path)
+        direct = DirectParser(parser.table, parser.ir)
+        for tokens in sentences(parser, seed=1) + [(), ('?',)]:
+            assert direct.parse(tokens) == parser.driver.parse(tokens)[0], (name, tokens)
+
+
+def test_saved_module_runs_without_lrcore(tmp_path):
+    parser = build('lalr', grammar_file(tmp_path, "E -> E + T | T\nT -> ( E ) | i\n"))
+    path = tmp_path / 'expr_parser.py'
+    DirectParser(parser.table, parser.ir, name='parse_expr').save(str(path))
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert not [line for line in lines if line.startswith(('import ', 'from '))]
+    spec = importlib.util.spec_from_file_location('expr_parser', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert module.parse_expr('(i+i)+i') is True
+    assert module.parse_expr('i+') is False
@@ -0,0 +1,22 @@
+import os
+
+from lrcore.compare import compare, weakest_conflict_free, weakest_resolved
+from lrcore.engines import ROOT
+
+GRAMMARS = os.path.join(ROOT, 'benchmarks', 'grammars')
+
+
+def test_precedence_settled_tables_are_not_conflict_free():
+    records, disagreements = compare(os.path.join(GRAMMARS, 'expr_prec.txt'), count=30)
+    assert all(record['resolved'] and not record['conflicts'] for record in records)
+    assert weakest_conflict_free(records) is None
+    assert weakest_resolved(records) == 'lr0'
+    assert disagreements == []
+
+
+def test_conflict_free_engines_agree():
+    records, disagreements = compare(os.path.join(GRAMMARS, 'json.txt'), count=30)
+    assert weakest_conflict_free(records) == 'lr0'
+    assert weakest_resolved(records) is None
+    assert disagreements == []
+    assert len({record['accepted'] for record in records}) == 1
@@ -0,0 +1,14 @@
+import pytest
+
+from tests import benchmark_corpus
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_grammar_unit_productions_only_descend(seed):
+    for count in (5, 8, 20):
+        for line in benchmark_corpus.random_grammar(count, seed=seed).splitlines():
+            lhs, alternatives = line.split(' -> ')
+            for alternative in alternatives.split(' | '):
+                symbols = alternative.split()
+                if len(symbols) == 1 and symbols[0].startswith('N'):
+                    assert int(symbols[0][1:]) > int(lhs[1:]), line
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from lrcore.driver import ACCEPTED, ERROR, TableDriver
+from lrcore.engines import ROOT
+from tests import ALGORITHMS, build, corpus, grammar_file, sentences
+
+
+@pytest.fixture
+def cyclic_table(tmp_path):
+    '''
+    LR(0) table of S -> A, A -> A | a with the A -> A side of its conflict kept
+    '''
+    parser = build('lr0', grammar_file(tmp_path, "S -> A\nA -> A | a\n"))
+    cycle = parser.ir.production_index[('A', ('A',))]
+    for state, terminal, kept, dropped in parser.table.conflicts:
+        if dropped == f'r{cycle}':
+            parser.table.action[(state, terminal)] = dropped
+    return parser.table, parser.ir
+
+
+@pytest.mark.parametrize('bypass_units', [False, True])
+def test_reduce_cycle_is_rejected(cyclic_table, bypass_units):
+    driver = TableDriver(*cyclic_table, bypass_units=bypass_units)
+    assert driver.parse('a') == (False, None)
+
+
+def test_reduce_cycle_is_an_error_in_every_loop(cyclic_table):
+    driver = TableDriver(*cyclic_table)
+    assert [error.position for error in driver.parse_all('a')] == [1]
+    assert [error.position for error in driver.parse_all('a', repair=True)] == [1]
+    assert list(driver.steps('a'))[-1][1] == ERROR
+
+
+@pytest.fixture(scope='module')
+def mini_c(tmp_path_factory):
+    with open(os.path.join(ROOT, 'benchmarks', 'grammars', 'mini_c.txt'), encoding='utf-8') as file:
+        text = file.read() + '%sync ;\n'
+    return build('lalr', grammar_file(tmp_path_factory.mktemp('mini_c'), text)).driver
+
+
+@pytest.mark.parametrize('text, positions', [
+    ('ti=n;', []),
+    ('ti=+n;ti=(n;', [3, 11]),
+    (';;;;a=a;', [0, 1, 2, 3, 7]),
+    ('ti=+n;;;ti=(n;', [3, 6, 7, 13]),
+    ('ti=n', [4]),
+])
+def test_panic_mode_error_positions(mini_c, text, positions):
+    assert [error.position for error in mini_c.parse_all(text)] == positions
+
+
+def test_panic_mode_reports_expected_terminals(mini_c):
+    errors = mini_c.parse_all('ti=+n;ti=(n;')
+    assert (errors[0].token, errors[0].expected) == ('+', ['!', '(', '-', 'i', 'n'])
+    assert (errors[1].token, errors[1].expected) == (';', [')'])
+
+
+@pytest.fixture(scope='module')
+def grammars(tmp_path_factory):
+    return corpus(str(tmp_path_factory.mktemp('corpus')))
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_unit_bypass_keeps_verdicts_and_derivations(grammars, algorithm):
+    for name, path in grammars.items():
+        parser = build(algorithm, path)
+        plain = TableDriver(parser.table, parser.ir)
+        bypass = TableDriver(parser.table, parser.ir, bypass_units=True)
+        for tokens in sentences(parser):
+            accepted, root = plain.parse(tokens, tree=True)
+            assert bypass.parse(tokens) == (accepted, None), (name, tokens)
+            bypassed, bypass_root = bypass.parse(tokens, tree=True)
+            if accepted:
+                assert bypass_root.derivation() == root.derivation(), (name, tokens)
+            # The step records run the plain loop
+            assert (list(plain.steps(tokens))[-1][1] == ACCEPTED) == accepted, (name, tokens)
+
+
+def test_unit_bypass_skips_the_unit_reductions(tmp_path):
+    parser = build('lalr', grammar_file(tmp_path, "E -> E + T | T\nT -> T * F | F\nF -> ( E ) | i\n"),
+                   stats=True)
+    stats = parser.stats
+    stats.reset_counters()
+    plain = TableDriver(parser.table, parser.ir, stats=stats).parse('i+i*i')
+    plain_counts = stats.counters()
+    stats.reset_counters()
+    bypass = TableDriver(parser.table, parser.ir, bypass_units=True, stats=stats).parse('i+i*i')
+    assert plain == bypass == (True, None)
+    assert plain_counts['shifts'] == stats.shifts == 5
+    # T -> F, E -> T for the first i and T -> F for the second
+    assert plain_counts['reduces'] - stats.reduces == stats.bypassed_reduces == 3
@@ -0,0 +1,29 @@
+import json
+import subprocess
+
+from lrcore.cli import main
+from lrcore.export import export
+from tests import build, grammar_file
+
+EXPRESSION = "E -> E + T | T\nT -> ( E ) | i\n"
+
+
+def test_draw_writes_dot_without_running_graphviz(tmp_path, monkeypatch, capsys):
+    def no_graphviz(*args, **kwargs):
+        raise AssertionError('graphviz started')
+    monkeypatch.setattr(subprocess, 'Popen', no_graphviz)
+    output = tmp_path / 'dfa'
+    assert main(['draw', grammar_file(tmp_path, EXPRESSION), '-o', str(output)]) == 0
+    assert output.read_text(encoding='utf-8').startswith('digraph')
+    assert not (tmp_path / 'dfa.pdf').exists()
+
+
+def test_json_export_matches_the_automaton(tmp_path):
+    parser = build('lalr', grammar_file(tmp_path, EXPRESSION))
+    path = tmp_path / 'dfa.json'
+    count = export(parser, str(path), 'json', around=0, radius=1)
+    data = json.loads(path.read_text(encoding='utf-8'))
+    neighbours = {0} | {target for (state, _), target in parser.automaton.numbered_transitions().items()
+                        if state == 0}
+    assert count == len(neighbours) == len(data['states'])
+    assert all(state in neighbours and target in neighbours for state, _, target in data['edges'])
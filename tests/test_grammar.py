@@ -0,0 +1,48 @@
+import pytest
+
+from lrcore.grammar import ReadGrammar
+from tests import grammar_file
+
+
+def read(tmp_path, text, **options):
+    return ReadGrammar(grammar_file(tmp_path, text), **options)
+
+
+def test_rules_are_tokenized_and_augmented(tmp_path):
+    grammar = read(tmp_path, "S -> aS' | S'\nS' -> ε | b\nnot a rule\nS -> aS'\n")
+    # S' is taken, so the augmented start symbol gets another prime
+    assert grammar.start_symbol == "S''"
+    assert list(grammar) == ["S''", 'S', "S'"]
+    assert grammar['S'] == [('a', "S'"), ("S'",)]
+    assert grammar["S'"] == [(), ('b',)]
+
+
+def test_declarations(tmp_path):
+    grammar = read(tmp_path, "%sync ; )\n%left + -\n%right ^\nE -> E + E | E - E | E ^ E | i ; | ( E )\n")
+    assert grammar.sync == [';', ')']
+    assert grammar.precedence == {'+': (1, 'left'), '-': (1, 'left'), '^': (2, 'right')}
+
+
+@pytest.mark.parametrize('text, message', [
+    ("%prec +\nE -> i\n", "unknown declaration"),
+    ("%left + +\nE -> E + E | i\n", "declared twice"),
+    ("%left E\nE -> i\n", "nonterminal E"),
+    ("no rules here\n", "No grammar rules"),
+    ("S -> A\nA -> a A\n", "does not derive"),
+])
+def test_malformed_grammars_are_rejected(tmp_path, text, message):
+    with pytest.raises(ValueError, match=message):
+        read(tmp_path, text)
+
+
+def test_useless_symbols_are_removed(tmp_path):
+    text = "S -> A | B c | d\nA -> a A\nB -> b\nC -> e\n"
+    grammar = read(tmp_path, text)
+    reduction = grammar.reduction
+    assert reduction.unproductive == ['A']
+    assert reduction.unreachable == ['C']
+    assert reduction.unused_terminals == ['a', 'e']
+    assert reduction.removed_productions == [('S', ('A',)), ('A', ('a', 'A')), ('C', ('e',))]
+    assert dict(grammar) == {"S'": [('S',)], 'S': [('B', 'c'), ('d',)], 'B': [('b',)]}
+    assert read(tmp_path, text, reduce=False).reduction is None
+    assert 'A' in read(tmp_path, text, reduce=False)
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from lrcore.engines import ROOT
+from lrcore.export import item_parts
+from tests import ALGORITHMS, build, grammar_file, table_snapshot
+
+
+@pytest.fixture(scope='module')
+def mini_c_text():
+    with open(os.path.join(ROOT, 'benchmarks', 'grammars', 'mini_c.txt'), encoding='utf-8') as file:
+        return file.read()
+
+
+def kernel_numbers(parser):
+    return {frozenset(item for item in state if item_parts(item)[2] > 0): number
+            for number, state in enumerate(parser.states)}
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_unchanged_states_keep_their_numbers(tmp_path, mini_c_text, algorithm):
+    parser = build(algorithm, grammar_file(tmp_path, mini_c_text, 'old.txt'))
+    before = kernel_numbers(parser)
+    old_inputs = parser.table_inputs()
+    edited = mini_c_text.replace('Args -> Args , Expr | Expr', 'Args -> Args , Expr | Expr | Args ; Expr')
+    grammar = build(algorithm, grammar_file(tmp_path, edited, 'new.txt')).grammar
+
+    # verify=True compares every structure and the table with a renumbered full build
+    report = parser.update_grammar(grammar, verify=True)
+
+    after = kernel_numbers(parser)
+    kept = [kernel for kernel in before if kernel in after]
+    assert kept and all(before[kernel] == after[kernel] for kernel in kept)
+    # Only rows whose transitions or reductions changed, and new rows, are rewritten
+    _, _, successors, reductions = parser.table_inputs()
+    changed = [row for row in range(len(successors)) if row >= len(old_inputs[2])
+               or successors[row] != old_inputs[2][row] or reductions[row] != old_inputs[3][row]]
+    assert report.rows == len(changed) < report.states
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_undoing_an_edit_restores_the_full_build(tmp_path, mini_c_text, algorithm):
+    edited = mini_c_text.replace('Primary -> i | n | ( Expr )', 'Primary -> i | n | ( Expr ) | [ Args ]')
+    original = build(algorithm, grammar_file(tmp_path, mini_c_text, 'old.txt'))
+    parser = build(algorithm, grammar_file(tmp_path, mini_c_text, 'old.txt'))
+    parser.update_grammar(build(algorithm, grammar_file(tmp_path, edited, 'new.txt')).grammar, verify=True)
+    # Undoing the edit brings back every state under its original number
+    parser.update_grammar(original.grammar, verify=True)
+    assert parser.states == original.states
+    assert table_snapshot(parser) == table_snapshot(original)
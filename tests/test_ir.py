@@ -0,0 +1,43 @@
+import pytest
+
+from lrcore.grammar import DOT
+from tests import build, grammar_file
+
+NULLABLE = "S -> A B c\nA -> a | ε\nB -> b | ε\n"
+
+
+@pytest.fixture
+def nullable_grammar(tmp_path):
+    return grammar_file(tmp_path, NULLABLE)
+
+
+def test_first_and_follow_on_ids(nullable_grammar):
+    ir = build('lalr', nullable_grammar).ir
+    first, nullable = ir.first_sets()
+    names = ir.names
+    assert {names[t] for t in first[ir.ids['S']]} == {'a', 'b', 'c'}
+    assert [names[s] for s in range(len(ir)) if nullable[s]] == ['A', 'B']
+    assert ir.follow_names()['A'] == {'b', 'c'}
+    assert ir.follow_names()['B'] == {'c'}
+
+
+@pytest.mark.parametrize('algorithm, first_attribute, epsilon', [
+    ('slr', 'first', 'ε'), ('clr', 'first_sets', ''), ('lalr', 'first', '')])
+def test_engines_read_first_and_follow_from_the_ir(nullable_grammar, algorithm, first_attribute, epsilon):
+    parser = build(algorithm, nullable_grammar)
+    first = getattr(parser, first_attribute)
+    # Terminals reached only behind a nullable prefix are found on every engine
+    assert first['S'] == {'a', 'b', 'c'}
+    assert first['A'] == {'a', epsilon}
+    follow = parser.follow_sets if algorithm == 'clr' else parser.follow
+    assert follow['A'] == {'b', 'c'}
+
+
+def test_item_table_moves_the_dot(nullable_grammar):
+    ir = build('lalr', nullable_grammar).ir
+    table, starts = ir.items()
+    symbol, advanced, rest, rest_nullable = table[('S', (DOT, 'A', 'B', 'c'))]
+    assert ir.names[symbol] == 'A'
+    assert advanced == ('S', ('A', DOT, 'B', 'c'))
+    assert (rest, rest_nullable) == ({'b', 'c'}, False)
+    assert starts[ir.ids['A'] - ir.terminal_count] == [('A', (DOT, 'a')), ('A', (DOT,))]
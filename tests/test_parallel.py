@@ -0,0 +1,27 @@
+import pytest
+
+from lrcore.engines import parser_states
+from tests import ALGORITHMS, build, corpus, table_snapshot
+
+
+@pytest.fixture(scope='module')
+def grammars(tmp_path_factory):
+    return corpus(str(tmp_path_factory.mktemp('corpus')))
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_parallel_build_matches_sequential(grammars, algorithm):
+    for name, path in grammars.items():
+        sequential = build(algorithm, path)
+        parallel = build(algorithm, path, workers=2)
+        assert parser_states(parallel) == parser_states(sequential), name
+        assert table_snapshot(parallel) == table_snapshot(sequential), name
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_parallel_build_closes_each_kernel_once(grammars, algorithm):
+    path = grammars['mini_c']
+    sequential = build(algorithm, path, stats=True).stats
+    parallel = build(algorithm, path, workers=2, stats=True).stats
+    for counter in ('closure_calls', 'closure_iterations', 'dedup_hits'):
+        assert getattr(parallel, counter) == getattr(sequential, counter), counter
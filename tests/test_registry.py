@@ -0,0 +1,39 @@
+from lrcore.registry import ParserRegistry
+from tests import grammar_file
+
+EXPRESSION = "E -> E + T | T\nT -> ( E ) | i\n"
+
+
+def test_builds_once_per_content_and_algorithm(tmp_path):
+    registry = ParserRegistry()
+    path = grammar_file(tmp_path, EXPRESSION)
+    copy = grammar_file(tmp_path, EXPRESSION, 'copy.txt')
+    compiled = registry.get(path)
+    assert registry.get(copy) is compiled
+    assert compiled.parse('i+(i)') is True
+    assert compiled.parse('i+', tree=True) == (False, None)
+    assert [error.position for error in compiled.parse_all('i++i')] == [2]
+    registry.get(path, 'slr')
+    assert (registry.hits, registry.misses, len(registry)) == (1, 2, 2)
+
+    # An edited file is a new key
+    grammar_file(tmp_path, EXPRESSION + "T -> - T\n")
+    assert registry.get(path).parse('-i') is True
+    assert registry.misses == 3
+    registry.discard(copy)
+    assert (copy, 'lalr') not in registry and (copy, 'slr') not in registry and len(registry) == 1
+
+
+def test_evicts_least_recently_used_within_budget(tmp_path):
+    paths = [grammar_file(tmp_path, EXPRESSION + f"T -> {terminal}\n", f"g{terminal}.txt") for terminal in 'abc']
+    probe = ParserRegistry()
+    size = probe.get(paths[0]).size
+    registry = ParserRegistry(budget=int(size * 2.5))
+    registry.get(paths[0])
+    registry.get(paths[1])
+    registry.get(paths[0])  # paths[1] is now the least recently used
+    registry.get(paths[2])
+    assert registry.evictions == 1
+    assert (paths[1], 'lalr') not in registry
+    assert (paths[0], 'lalr') in registry and (paths[2], 'lalr') in registry
+    assert registry.bytes == sum(entry.size for entry in registry.entries.values()) <= registry.budget
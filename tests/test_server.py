@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from lrcore.server import ParseClient, ParseServer
+from tests import grammar_file
+
+EXPRESSION = "E -> E + T | T\nT -> ( E ) | i\n"
+
+
+async def session(server, requests):
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    client = await ParseClient.connect(port=port)
+    try:
+        # Sent together, so they are pipelined on one connection
+        return await asyncio.gather(*(client.request(**request) for request in requests))
+    finally:
+        client.writer.close()
+        server.close()
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_requests_get_their_own_responses(tmp_path, workers):
+    server = ParseServer([grammar_file(tmp_path, EXPRESSION, 'expr.txt')], ['lalr', 'slr'], workers=workers,
+                         pool_threshold=4)
+    responses = asyncio.run(session(server, [
+        {'grammar': 'expr', 'input': 'i+(i)'},
+        {'grammar': 'expr', 'algorithm': 'slr', 'input': 'i+'},
+        {'grammar': 'expr', 'input': 'i++i', 'recover': True},
+        {'op': 'grammars'},
+        {'grammar': 'exp', 'input': 'i'},
+        {'grammar': 'expr', 'input': 7},
+    ]))
+    accepted, rejected, recovered, grammars, unknown, malformed = responses
+    assert accepted['accepted'] is True and rejected['accepted'] is False
+    assert [error['position'] for error in recovered['errors']] == [2]
+    assert grammars['grammars'] == {'expr': ['lalr', 'slr']}
+    assert 'unknown grammar' in unknown['error'] and 'input' in malformed['error']
+    assert server.pooled == (2 if workers else 0)
@@ -0,0 +1,43 @@
+import io
+import json
+
+import pytest
+
+from lrcore.stats import COUNTERS
+from tests import ALGORITHMS, build, grammar_file
+
+EXPRESSION = "E -> E + T | T\nT -> ( E ) | i\n"
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_build_counters_match_the_automaton(tmp_path, algorithm):
+    parser = build(algorithm, grammar_file(tmp_path, EXPRESSION), stats=True)
+    stats = parser.stats
+    states, transitions = len(parser.states), len(parser.transitions)
+    # Every state is closed and expanded once; every other edge leads to a known state
+    assert stats.closure_calls == stats.goto_calls == states
+    assert stats.dedup_hits == transitions - (states - 1)
+    assert stats.table_cells == len(parser.table.action) + len(parser.table.goto)
+    if algorithm == 'clr':
+        assert stats.closure_cache_misses == states - 1
+    assert 'compute_closure_goto' in stats.phases and 'build_parsing_table' in stats.phases
+
+
+def test_parsers_without_stats_count_nothing(tmp_path):
+    parser = build('lalr', grammar_file(tmp_path, EXPRESSION))
+    assert parser.stats is None
+    assert parser.driver.parse('i+i') == (True, None)
+
+
+def test_parse_counters_and_json(tmp_path):
+    parser = build('slr', grammar_file(tmp_path, EXPRESSION), stats=True)
+    stats = parser.stats
+    stats.reset_counters()
+    assert parser.driver.parse('(i)+i') == (True, None)
+    # T -> i, E -> T, T -> ( E ), E -> T, T -> i, E -> E + T
+    assert (stats.shifts, stats.reduces) == (5, 6)
+    out = io.StringIO()
+    stats.dump_json(out)
+    data = json.loads(out.getvalue())
+    assert list(data['counters']) == list(COUNTERS)
+    assert data['counters']['shifts'] == 5 and set(data['phases']) == set(stats.phases)
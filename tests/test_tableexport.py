@@ -0,0 +1,37 @@
+import csv
+import io
+import json
+
+import pytest
+
+from lrcore.tableexport import write_table
+from tests import ALGORITHMS, build, grammar_file
+
+EXPRESSION = "E -> E + T | T\nT -> ( E ) | i\n"
+
+
+@pytest.fixture
+def expression(tmp_path):
+    return grammar_file(tmp_path, EXPRESSION)
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_print_table_streams_through_write_table(expression, algorithm, capsys):
+    parser = build(algorithm, expression)
+    parser.print_table('csv', states=[0, 1], symbols=['i', 'E'])
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0] == ['state', 'i', 'E']
+    assert rows[1] == ['0', parser.table.action[(0, 'i')], str(parser.table.goto[(0, 'E')])]
+    assert [row[0] for row in rows[1:]] == ['0', '1']
+
+
+def test_formats_hold_the_same_cells(expression):
+    parser = build('clr', expression)
+    text = io.StringIO()
+    jsonl = io.StringIO()
+    assert write_table(parser.table, text) == write_table(parser.table, jsonl, 'jsonl') == parser.table.state_count
+    action = {(record['state'], terminal): cell for line in jsonl.getvalue().splitlines()
+              for record in [json.loads(line)] for terminal, cell in record['action'].items()}
+    assert action == parser.table.action
+    header = [cell.strip() for cell in text.getvalue().splitlines()[0].split('|')]
+    assert header[:-1] == ['states'] + parser.table.terminals + parser.table.non_terminals
@@ -0,0 +1,54 @@
+import pytest
+
+from lrcore.tables import build_table, patch_table
+from tests import build, grammar_file
+
+PRECEDENCE = "%left + -\n%left *\n%right ^\n%nonassoc <\nE -> E + E | E - E | E * E | E ^ E | E < E | i\n"
+
+
+def test_conflicts_are_resolved_and_logged():
+    successors = [[('a', 1), ('S', 2)], [], []]
+    # State 1 reduces 2 and 3 on a and b; state 0 shifts a but also reduces 3 on it
+    reductions = [[(3, ('a',))], [(3, ('a', 'b')), (2, ('b',))], [(0, ('#',))]]
+    table = build_table(successors, reductions, ['a', 'b', '#'], ['S'])
+    assert table.action == {(0, 'a'): 'S1', (1, 'a'): 'r3', (1, 'b'): 'r2', (2, '#'): 'acc'}
+    assert table.goto == {(0, 'S'): 2}
+    assert table.conflicts == [(0, 'a', 'S1', 'r3'), (1, 'b', 'r2', 'r3')]
+
+
+def test_patch_table_equals_a_fresh_build():
+    successors = [[('a', 1), ('S', 2)], [], []]
+    reductions = [[], [(1, ('a', '#'))], [(0, ('#',))]]
+    table = build_table(successors, reductions, ['a', '#'], ['S'])
+    successors = [[('a', 1), ('S', 2)], [('a', 3)], [], []]
+    reductions = [[], [(1, ('#',))], [(0, ('#',))], [(2, ('#',))]]
+    assert patch_table(table, successors, reductions, ['a', '#'], ['S'], [1]) == 2
+    fresh = build_table(successors, reductions, ['a', '#'], ['S'])
+    assert (table.action, table.goto, table.conflicts, table.state_count) == \
+        (fresh.action, fresh.goto, fresh.conflicts, fresh.state_count)
+
+
+def bracket(node):
+    if not node.children:
+        return node.symbol
+    if len(node.children) == 1:
+        return bracket(node.children[0])
+    return '(' + ''.join(bracket(child) for child in node.children) + ')'
+
+
+@pytest.mark.parametrize('algorithm', ['slr', 'clr', 'lalr'])
+@pytest.mark.parametrize('text, expected', [
+    ('i+i*i', '(i+(i*i))'),
+    ('i*i+i', '((i*i)+i)'),
+    ('i-i+i', '((i-i)+i)'),
+    ('i^i^i', '(i^(i^i))'),
+    ('i*i^i', '(i*(i^i))'),
+    ('i<i+i', '((i<i)+i)'),
+    ('i<i<i', None),
+])
+def test_precedence_settles_cells_as_declared(tmp_path, algorithm, text, expected):
+    parser = build(algorithm, grammar_file(tmp_path, PRECEDENCE))
+    assert parser.table.conflicts == []
+    assert parser.table.resolved
+    accepted, root = parser.driver.parse(text, tree=True)
+    assert (bracket(root) if accepted else None) == expected